@@ -1,20 +1,26 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import numpy as np
-import requests
-from app_core import analysis
-
-# 선택 기능: AI 해석(요약/헷갈림 설명)
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None
+from app_core import ai, analysis, scan_jobs, scanner
+from app_core.ai_cache import get_ai_cache
+from app_core.cache import StaleWhileRevalidate, shared_cache
+from app_core.levels import MODE_NAMES, all_mode_configs, get_mode_config, position_view
+from app_core.llm import llm_metrics
+from app_core.market import (
+    compute_market_score,
+    compute_market_verdict_scores,
+    fetch_quote_snapshot,
+    load_market_overview,
+    overview_is_usable,
+)
+from app_core.market_history import load_market_history
+from app_core.providers import get_default_provider
+from app_core.rules import DEFAULT_RULES, FIELDS as RULE_FIELDS, RuleError, parse_rules
+from app_core.store import PriceStore, longest_period, slice_period
+from app_core.universe import POPULAR_SYMBOLS, SCAN_CANDIDATES, list_universes, load_universe
 
-import os
-import json
-import re
-import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 
 # =====================================
@@ -247,16 +253,7 @@ KOREAN_TICKER_MAP = {
     "아이쉐어즈비트코인": "IBIT",
 }
 
-POPULAR_SYMBOLS = [
-    "NVDA", "META", "TSLA", "AAPL", "MSFT", "AMZN",
-    "QQQ", "TQQQ", "SOXL", "SPY", "VOO",
-    "COIN", "MSTR", "RIOT", "MARA",
-    "ORCL", "PYPL", "NFLX", "PLTR", "AVGO",
-]
-
-SCAN_CANDIDATES = sorted(set(
-    POPULAR_SYMBOLS + ["NVDA", "AAPL", "MSFT", "AMZN", "META", "GOOGL", "TSLA"]
-))
+DEFAULT_UNIVERSE_LABEL = "기본 후보 (인기 종목)"
 
 def normalize_symbol(user_input: str) -> str:
     name = (user_input or "").strip()
@@ -265,293 +262,53 @@ def normalize_symbol(user_input: str) -> str:
     return name.replace(" ", "").upper()
 
 # =====================================
-# 외부 지표 함수들
+# 외부 지표 함수들 (모든 외부 데이터는 제공자 경유: CHAN_PROVIDER=replay 로 오프라인 재생)
 # =====================================
-def fetch_fgi():
-    url = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        r = requests.get(url, headers=headers, timeout=5)
-        r.raise_for_status()
-        data = r.json()
-        series = data.get("fear_and_greed_historical", {}).get("data", [])
-        if not series:
-            return None
-        last_point = series[-1]
-        return float(last_point.get("y"))
-    except Exception:
-        return None
+market_data = get_default_provider()
+
+@shared_cache.cached("fx")
+def _get_fx_rate(pair: str):
+    return market_data.fx_rate(pair)
 
 def get_usdkrw_rate():
-    try:
-        ticker = yf.Ticker("USDKRW=X")
-        df = ticker.history(period="1d")
-        if df.empty:
-            return 1350.0
-        return float(df["Close"].iloc[-1])
-    except Exception:
-        return 1350.0
+    rate = _get_fx_rate("USDKRW=X")
+    return rate if rate is not None else 1350.0
+
+@shared_cache.cached("intraday")
+def get_intraday_snapshot(symbol: str):
+    """
+    ✅ 장중 데이터는 프리/애프터 포함 1분봉 한 번만 받아서
+    - 5분봉(정규장) 점수와 시외 포함 최근가를 같은 스냅샷에서 파생
+    """
+    return market_data.intraday_bars(symbol, period="2d", interval="1m", prepost=True)
 
 def get_last_extended_price(symbol: str):
     """
     프리/정규/애프터 포함 가장 최근 1분봉 Close를 사용(있으면).
     - "상태 전환" 판정에 사용
     """
-    try:
-        t = yf.Ticker(symbol)
-        df = t.history(period="1d", interval="1m", auto_adjust=False, prepost=True)
-        if df.empty:
-            return None
-        return float(df["Close"].iloc[-1])
-    except Exception:
+    df = get_intraday_snapshot(symbol)
+    if df.empty:
         return None
+    return float(df["Close"].iloc[-1])
 
-def safe_last_change_info(ticker_str: str):
-    try:
-        info = yf.Ticker(ticker_str).info
-        last = info.get("regularMarketPrice")
-        prev = info.get("regularMarketPreviousClose")
-        market_state = info.get("marketState", "")
-        if last is None or prev in (None, 0, 0.0):
-            return None, None, market_state
-        chg_pct = (last - prev) / prev * 100
-        return float(last), float(chg_pct), market_state
-    except Exception:
-        return None, None, ""
+def load_us_market_overview():
+    # ✅ 개요 종목 전체를 한 번에(동시 요청) 조회 → 시세표 하나로 모든 섹션 구성
+    return load_market_overview(market_data)
 
-def get_etf_price_with_prepost(symbol: str, name: str):
-    try:
-        t = yf.Ticker(symbol)
-        info = t.info
-
-        market_state = info.get("marketState", "")
-        prev_close = info.get("regularMarketPreviousClose")
-
-        pre = info.get("preMarketPrice")
-        post = info.get("postMarketPrice")
-        regular = info.get("regularMarketPrice")
-
-        current = None
-        chg_pct = None
-        basis = "기준 불명"
-
-        if market_state == "PRE" and pre is not None:
-            current = pre
-            basis = "프리장 기준"
-            chg_pct = info.get("preMarketChangePercent")
-            if chg_pct is None and prev_close not in (None, 0, 0.0):
-                chg_pct = (pre - prev_close) / prev_close * 100
-        elif market_state == "POST" and post is not None:
-            current = post
-            basis = "애프터장 기준"
-            chg_pct = info.get("postMarketChangePercent")
-            if chg_pct is None and prev_close not in (None, 0, 0.0):
-                chg_pct = (post - prev_close) / prev_close * 100
-        elif regular is not None:
-            current = regular
-            basis = "정규장 기준"
-            chg_pct = info.get("regularMarketChangePercent")
-            if chg_pct is None and prev_close not in (None, 0, 0.0):
-                chg_pct = (regular - prev_close) / prev_close * 100
-
-        if current is None:
-            current = pre or post or regular
-
-        return {
-            "symbol": symbol,
-            "name": name,
-            "current": float(current) if current is not None else None,
-            "basis": basis,
-            "chg_pct": float(chg_pct) if chg_pct is not None else None,
-            "market_state": market_state,
-        }
-    except Exception:
-        return {
-            "symbol": symbol,
-            "name": name,
-            "current": None,
-            "basis": "조회 실패",
-            "chg_pct": None,
-            "market_state": "",
-        }
+@st.cache_resource
+def get_overview_refresher():
+    # ✅ 프로세스 공용: 마지막 정상 스냅샷은 즉시 반환, 60초 지나면 백그라운드 갱신
+    # ✅ 조회 실패는 None으로 흡수되므로 값이 거의 비어 있으면 실패로 보고 이전 스냅샷 유지
+    return StaleWhileRevalidate(load_us_market_overview, max_age=60.0, is_valid=overview_is_usable)
 
-BIGTECH_LIST = [
-    ("NVDA", "NVDA"),
-    ("AAPL", "AAPL"),
-    ("MSFT", "MSFT"),
-    ("AMZN", "AMZN"),
-    ("META", "META"),
-    ("GOOGL", "GOOGL"),
-    ("TSLA", "TSLA"),
-]
-
-SECTOR_ETF_LIST = [
-    ("기술주 (XLK)", "XLK"),
-    ("반도체 (SOXX)", "SOXX"),
-    ("금융 (XLF)", "XLF"),
-    ("헬스케어 (XLV)", "XLV"),
-    ("에너지 (XLE)", "XLE"),
-    ("커뮤니케이션 (XLC)", "XLC"),
-]
-
-@st.cache_data(ttl=60)
 def get_us_market_overview():
-    overview = {}
-
-    nq_last, nq_chg, nq_state = safe_last_change_info("NQ=F")
-    es_last, es_chg, es_state = safe_last_change_info("ES=F")
-    overview["futures"] = {
-        "nasdaq": {"last": nq_last, "chg_pct": nq_chg, "state": nq_state},
-        "sp500": {"last": es_last, "chg_pct": es_chg, "state": es_state},
-    }
-
-    tnx_last, tnx_chg, tnx_state = safe_last_change_info("^TNX")
-    if tnx_last is not None:
-        us10y = tnx_last / 10.0
-        us10y_chg = tnx_chg / 10.0 if tnx_chg is not None else None
-    else:
-        us10y, us10y_chg = None, None
-
-    dxy_last, dxy_chg, dxy_state = safe_last_change_info("DX-Y.NYB")
-
-    overview["rates_fx"] = {
-        "us10y": us10y,
-        "us10y_chg": us10y_chg,
-        "us10y_state": tnx_state,
-        "dxy": dxy_last,
-        "dxy_chg": dxy_chg,
-        "dxy_state": dxy_state,
-    }
-
-    ixic_last, ixic_chg, ixic_state = safe_last_change_info("^IXIC")
-    gspc_last, gspc_chg, gspc_state = safe_last_change_info("^GSPC")
-    overview["indexes"] = {
-        "nasdaq": {"last": ixic_last, "chg_pct": ixic_chg, "state": ixic_state},
-        "sp500": {"last": gspc_last, "chg_pct": gspc_chg, "state": gspc_state},
-    }
-
-    etfs = [
-        get_etf_price_with_prepost("QQQ", "QQQ (나스닥100 ETF)"),
-        get_etf_price_with_prepost("VOO", "VOO (S&P500 ETF)"),
-        get_etf_price_with_prepost("SOXX", "SOXX (반도체 ETF)"),
-    ]
-    overview["etfs"] = etfs
-
-    overview["fgi"] = fetch_fgi()
-
-    bigtech = []
-    score_bt = 0
-    for sym, _ in BIGTECH_LIST:
-        _, chg, _ = safe_last_change_info(sym)
-        if chg is not None:
-            if chg >= 1:
-                score_bt += 1
-            elif chg <= -1:
-                score_bt -= 1
-        bigtech.append({"symbol": sym, "chg": chg})
-    overview["bigtech"] = {"score": score_bt, "items": bigtech}
-
-    sector = []
-    score_sec = 0
-    for label, sym in SECTOR_ETF_LIST:
-        _, chg, _ = safe_last_change_info(sym)
-        if chg is not None:
-            if chg >= 0.8:
-                score_sec += 1
-            elif chg <= -0.8:
-                score_sec -= 1
-        sector.append({"label": label, "symbol": sym, "chg": chg})
-    overview["sector"] = {"score": score_sec, "items": sector}
-
-    return overview
-
-def compute_market_score(overview: dict):
-    if not overview:
-        return 0, "데이터 부족", "실시간 시장 데이터를 불러오지 못했습니다."
-
-    fut = overview.get("futures", {})
-    rf = overview.get("rates_fx", {})
-    etfs = overview.get("etfs", [])
-
-    score = 0
-    details = []
-
-    nas = fut.get("nasdaq", {})
-    nas_chg = nas.get("chg_pct")
-    if nas_chg is not None:
-        if nas_chg >= 1.0:
-            score += 2; details.append(f"나스닥 선물 +{nas_chg:.2f}% (강한 상승)")
-        elif nas_chg >= 0.3:
-            score += 1; details.append(f"나스닥 선물 +{nas_chg:.2f}% (완만한 상승)")
-        elif nas_chg <= -1.0:
-            score -= 2; details.append(f"나스닥 선물 {nas_chg:.2f}% (강한 하락)")
-        elif nas_chg <= -0.3:
-            score -= 1; details.append(f"나스닥 선물 {nas_chg:.2f}% (완만한 하락)")
-
-    us10y = rf.get("us10y")
-    if us10y is not None:
-        if us10y < 4.0:
-            score += 2; details.append(f"미 10년물 {us10y:.2f}% (금리 우호)")
-        elif us10y < 4.2:
-            score += 1; details.append(f"미 10년물 {us10y:.2f}% (무난)")
-        elif us10y > 4.4:
-            score -= 2; details.append(f"미 10년물 {us10y:.2f}% (금리 부담)")
-        else:
-            score -= 1; details.append(f"미 10년물 {us10y:.2f}% (다소 부담)")
-
-    dxy = rf.get("dxy")
-    if dxy is not None:
-        if dxy < 104:
-            score += 1; details.append(f"DXY {dxy:.2f} (달러 약세 → Risk-on 우호)")
-        elif dxy > 106:
-            score -= 1; details.append(f"DXY {dxy:.2f} (달러 강세 → Risk-off 경계)")
-
-    for e in etfs:
-        sym = e.get("symbol")
-        chg = e.get("chg_pct")
-        if chg is None:
-            continue
-        if chg >= 0.5:
-            score += 1; details.append(f"{sym} +{chg:.2f}% (ETF 강세)")
-        elif chg <= -0.5:
-            score -= 1; details.append(f"{sym} {chg:.2f}% (ETF 약세)")
-
-    if score >= 5:
-        label = "🚀 강한 Risk-on (상승장 상단 구간)"
-    elif score >= 2:
-        label = "😊 약한 Risk-on ~ 우상향 기대"
-    elif score >= -1:
-        label = "😐 중립/혼조 (방향 모호)"
-    elif score >= -4:
-        label = "⚠ 약한 Risk-off (조정/변동성 주의)"
-    else:
-        label = "🧨 강한 Risk-off (공포장 가능성)"
-
-    return score, label, " · ".join(details)
+    ov, _ = get_overview_refresher().get()
+    return ov or {}
 
 # =========================================================
 # 시장 판독(점수) + 장 상태 배지
 # =========================================================
-def _clamp(x, lo=0.0, hi=100.0):
-    try:
-        x = float(x)
-    except Exception:
-        return lo
-    return max(lo, min(hi, x))
-
-def score_to_text(score_0_100: float) -> str:
-    s = float(score_0_100)
-    if s >= 70:
-        return "위험선호 우세"
-    elif s >= 65:
-        return "양호"
-    elif s >= 52:
-        return "반등 시도"
-    elif s >= 45:
-        return "추세 불안"
-    else:
-        return "위험회피 우세"
-
 def market_state_badge_from_etfs(etfs: list):
     stt = ""
     if etfs:
@@ -570,259 +327,84 @@ def market_state_badge_from_etfs(etfs: list):
         return f"⚪ 장 상태: {stt}", "chip chip-blue"
     return "⚪ 장 상태: 확인중", "chip chip-blue"
 
-def compute_market_verdict_scores(overview: dict):
-    if not overview:
-        return None
-
-    mkt_score, _, _ = compute_market_score(overview)
-    macro_0_100 = _clamp((mkt_score + 8) / 16 * 100)
-
-    etfs = overview.get("etfs", []) or []
-    etf_chgs = [e.get("chg_pct") for e in etfs if e.get("chg_pct") is not None]
-    if etf_chgs:
-        avg_etf = float(np.mean(etf_chgs))
-        etf_0_100 = _clamp(50 + avg_etf * 20)
-    else:
-        etf_0_100 = 50.0
-
-    idx = overview.get("indexes", {}) or {}
-    ixic = idx.get("nasdaq", {}) or {}
-    gspc = idx.get("sp500", {}) or {}
-    idx_chgs = [v for v in [ixic.get("chg_pct"), gspc.get("chg_pct")] if v is not None]
-    if idx_chgs:
-        avg_idx = float(np.mean(idx_chgs))
-        index_0_100 = _clamp(50 + avg_idx * 20)
-    else:
-        fut = overview.get("futures", {}) or {}
-        nas_f = (fut.get("nasdaq", {}) or {}).get("chg_pct")
-        if nas_f is not None:
-            index_0_100 = _clamp(50 + float(nas_f) * 18)
-        else:
-            index_0_100 = 50.0
-
-    bt = overview.get("bigtech", {}) or {}
-    bt_score = bt.get("score", 0)
-    n = max(1, len(BIGTECH_LIST))
-    leader_0_100 = _clamp(50 + (float(bt_score) / n) * 30)
-
-    line_macro = f"세계지표: {score_to_text(macro_0_100)}"
-
-    etf_text = score_to_text(etf_0_100)
-    if etf_0_100 >= 65:
-        etf_text = f"{etf_text} (정규장 확인 필요)"
-    elif etf_0_100 < 50:
-        etf_text = f"{etf_text} (리스크 경계)"
-    else:
-        etf_text = f"{etf_text} (대기)"
-    line_etf = f"ETF 선행: {etf_text}"
-
-    idx_text = score_to_text(index_0_100)
-    if 52 <= index_0_100 < 60:
-        idx_text = "반등 시도 중이나 추세 불안"
-    elif 45 <= index_0_100 < 52:
-        idx_text = "추세 불안"
-    line_index = f"지수 점수: {idx_text}"
-
-    leader_text = score_to_text(leader_0_100)
-    if 58 <= leader_0_100 < 68:
-        leader_text = "상단 부담"
-    elif 52 <= leader_0_100 < 58:
-        leader_text = "힘 부족"
-    elif leader_0_100 < 52:
-        leader_text = "주도력 상실"
-    elif leader_0_100 >= 68:
-        leader_text = "주도력 확실"
-    line_leader = f"빅테크: {leader_text}"
-
-    if macro_0_100 < 45:
-        conclusion = "신규진입 불리"
-        holder_line = "보유자는 방어적 대응"
-    elif (index_0_100 < 52) or (leader_0_100 < 52):
-        conclusion = "신규진입 신중"
-        holder_line = "보유자는 단기 반등까지만 대응"
-    elif (macro_0_100 >= 60) and (index_0_100 >= 60) and (leader_0_100 >= 58):
-        conclusion = "신규진입 가능"
-        holder_line = "보유자는 추세 추종 가능"
-    else:
-        conclusion = "선별적 접근"
-        holder_line = "보유자는 분할 대응"
-
-    return {
-        "macro": macro_0_100,
-        "etf": etf_0_100,
-        "index": index_0_100,
-        "leader": leader_0_100,
-        "lines": [line_macro, line_etf, line_index, line_leader],
-        "conclusion": conclusion,
-        "holder_line": holder_line,
-    }
-
 # =====================================
 # 가격 데이터 + 지표 (레벨 계산은 일봉)
 # =====================================
-def get_price_data(symbol, period="6mo"):
+price_store = PriceStore(provider=market_data)
+
+# ✅ 세 모드(단타/스윙/장기) 중 가장 긴 구간 하나만 받아 두고 모드별로 잘라 씀
+MODE_HISTORY_PERIOD = longest_period(c["period"] for c in all_mode_configs())
+
+@shared_cache.cached("daily")
+def _get_price_history(symbol, period):
+    """
+    ✅ 로컬 일봉 저장소 경유: 전체 이력은 디스크에, 네트워크는 마지막 봉 이후만
+    """
     if not symbol or symbol.strip() == "":
         return pd.DataFrame()
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval="1d", auto_adjust=False)
+        df = price_store.get_daily(symbol, period)
     except ValueError:
         return pd.DataFrame()
     if df.empty:
+        return pd.DataFrame()
+    return df
+
+def get_price_data(symbol, period="6mo"):
+    fetch_period = longest_period([period, MODE_HISTORY_PERIOD])
+    df = _get_price_history(symbol, fetch_period)
+    if df.empty or period == fetch_period:
         return df
-    return df[["Open", "High", "Low", "Close", "Volume"]].dropna()
+    return slice_period(df, period)
 
-def get_intraday_5m(symbol: str):
-    try:
-        t = yf.Ticker(symbol)
-        df = t.history(period="2d", interval="5m", auto_adjust=False, prepost=False)
-        if df.empty:
-            return pd.DataFrame()
-        return df[["Open", "High", "Low", "Close", "Volume"]].dropna()
-    except Exception:
-        return pd.DataFrame()
+@shared_cache.cached("market_history")
+def get_market_history(period="1y"):
+    """
+    ✅ 시장 점수/판독 히스토리 (개요 종목 일봉 → 날짜별 재계산)
+    """
+    return load_market_history(price_store.get_daily_many, period)
 
-# =====================================
-# AI 해석 유틸 (상태 머신 반영)
-# =====================================
-def _ai_make_cache_key(symbol: str, holding_type: str, mode_name: str, avg_price: float, df_last: pd.Series, market_label: str, state_name: str, live_price: float):
-    payload = {
-        "symbol": symbol,
-        "holding_type": holding_type,
-        "mode": mode_name,
-        "avg_price": round(float(avg_price or 0.0), 4),
-        "live_price": round(float(live_price or 0.0), 4),
-        "close": round(float(df_last.get("Close", 0.0)), 4),
-        "ma20": round(float(df_last.get("MA20", 0.0)), 4),
-        "bbl": round(float(df_last.get("BBL", 0.0)), 4),
-        "bbu": round(float(df_last.get("BBU", 0.0)), 4),
-        "rsi": round(float(df_last.get("RSI14", 0.0)), 4),
-        "macd": round(float(df_last.get("MACD", 0.0)), 4),
-        "macds": round(float(df_last.get("MACD_SIGNAL", 0.0)), 4),
-        "state": state_name,
-        "market": market_label,
-    }
-    s = json.dumps(payload, ensure_ascii=False, sort_keys=True)
-    return hashlib.md5(s.encode("utf-8")).hexdigest()
-
-def _ai_extract_json(text: str):
-    if not text:
-        return None
-    m = re.search(r"\{[\s\S]*\}", text)
-    if not m:
-        return None
-    try:
-        return json.loads(m.group(0))
-    except Exception:
-        return None
+def get_intraday_5m(symbol: str):
+    return analysis.resample_regular_5m(get_intraday_snapshot(symbol))
 
-def ai_summarize_and_explain(
-    symbol: str,
-    holding_type: str,
-    mode_name: str,
-    market_label: str,
-    market_detail: str,
-    live_price: float,
-    day_close: float,
-    avg_price: float,
-    state_name: str,
-    action_text: str,
-    bias_comment: str,
-    gap_comment: str,
-    rr: float,
-    levels: dict,
-    last_row: pd.Series,
-    extra_notes: list,
-    model_name: str = "gpt-4o-mini",
-):
-    if OpenAI is None:
-        return None, "openai 패키지를 찾지 못했습니다. requirements.txt에 openai를 추가했는지 확인하세요."
-    api_key = os.getenv("OPENAI_API_KEY", "").strip()
-    if not api_key:
-        return None, "OPENAI_API_KEY 환경변수가 비어 있습니다. Streamlit Cloud → Settings → Secrets에 설정하세요."
-
-    client = OpenAI(api_key=api_key)
-
-    compact = {
-        "symbol": symbol,
-        "holding_type": holding_type,
-        "mode": mode_name,
-        "market": {"label": market_label, "detail": market_detail},
-        "price_now": live_price,        # ✅ 상태 전환 기준
-        "price_day_close": day_close,    # ✅ 레벨 계산 기준
-        "avg_price": avg_price,
-        "state": state_name,            # ✅ 상태 머신 결과
-        "action": action_text,          # ✅ 앱이 만든 행동지침(가격조건 포함)
-        "rr_ratio": rr,
-        "levels": levels,
-        "indicators": {
-            "MA20": float(last_row["MA20"]),
-            "BBL": float(last_row["BBL"]),
-            "BBU": float(last_row["BBU"]),
-            "RSI14": float(last_row["RSI14"]),
-            "MACD": float(last_row["MACD"]),
-            "MACD_SIGNAL": float(last_row["MACD_SIGNAL"]),
-            "ATR14": float(last_row["ATR14"]),
-        },
-        "notes": extra_notes[:10],
-        "trend_hint": bias_comment,
-        "gap_hint": gap_comment,
-    }
-
-    system = (
-        "너는 '주식 자동판독기'의 해석 도우미다. "
-        "확정 매수/매도 지시를 하지 말고, "
-        "대신 '가격 기준의 조건부 행동지침'을 아주 직관적으로 정리한다. "
-        "영어/전문용어(MA20, MACD 등)는 가능하면 쓰지 말고, 필요하면 '20일선'처럼 한국어로 짧게만 언급한다. "
-        "반드시 JSON만 출력한다."
-    )
+def render_ai_output(slot, ai_out: dict, streaming: bool = False, quick: bool = False):
+    """
+    AI 결과(또는 스트리밍 중인 부분 결과)를 slot(st.empty) 하나에 다시 그림
+    - quick=True: LLM 없이 만든 즉시 해석 (ai.template_interpretation)
+    """
+    one = str(ai_out.get("summary_one_line", "")).strip()
+    blocks = ai_out.get("confusion_explain", [])
+    cursor = " ▌" if streaming else ""
 
-    if holding_type == "보유 중":
-        title2 = "보유자 관점: 지금 유지/축소 판단 포인트"
-        desc2 = "평단/손절선/목표가 기준으로 '지금 어떤 가격에서 무엇을 하면 되는지'를 2~3줄로 정리"
-    else:
-        title2 = "신규진입 관점: 지금 들어가도 되는지 체크"
-        desc2 = "1차/2차 진입가, 진입 실패가(중단), 회복 확인가(재평가 조건)를 가격으로 2~3줄 정리"
-
-    user = (
-        "아래 데이터는 기술적 지표 기반의 요약 데이터다.\n"
-        "반드시 아래 JSON 형태로만 출력해라(키/구조/타입 고정).\n\n"
-        "{\n"
-        "  \"summary_one_line\": \"지금 상태(state) + 현재가(price_now) 기준으로, 딱 한 문장 행동지침(가격조건 포함)\",\n"
-        "  \"confusion_explain\": [\n"
-        "    {\n"
-        "      \"title\": \"지금 가장 안전한 행동(가격 기준)\",\n"
-        "      \"desc\": \"반드시 price_now + 레벨(buy/tp/sl/recover 중 2개 이상)을 직접 숫자로 언급해서, 2~4문장으로 행동지침\"\n"
-        "    },\n"
-        "    {\n"
-        f"      \"title\": \"{title2}\",\n"
-        f"      \"desc\": \"{desc2}. 반드시 숫자 레벨 2개 이상 포함\"\n"
-        "    }\n"
-        "  ]\n"
-        "}\n\n"
-        "제약:\n"
-        "- '지금 사라/팔아라' 같은 확정 지시는 금지.\n"
-        "- 대신 'XX 밑이면 중단/방어', 'YY 위면 확인 후 접근' 같은 조건부 문장으로.\n"
-        "- 한국어 위주. 영어/전문용어는 최소.\n"
-        "- JSON 외 텍스트 출력 금지.\n\n"
-        f"DATA:\n{json.dumps(compact, ensure_ascii=False)}"
-    )
+    with slot.container():
+        if one:
+            st.markdown(
+                f"""
+                <div class="card-soft">
+                  <div class="layer-title-en">{"QUICK READ · 규칙 기반" if quick else "AI SUMMARY"}</div>
+                  <div style="font-size:1.05rem;font-weight:700;line-height:1.35;">{one}{cursor if not blocks else ""}</div>
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
 
-    try:
-        resp = client.chat.completions.create(
-            model=model_name,
-            messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-            temperature=0.15,
-        )
-        text = (resp.choices[0].message.content or "").strip()
-        parsed = _ai_extract_json(text)
-        if parsed and isinstance(parsed.get("summary_one_line"), str) and isinstance(parsed.get("confusion_explain"), list):
-            if len(parsed["confusion_explain"]) >= 2:
-                return parsed, None
-            return None, "AI 응답이 너무 짧습니다(설명 블록 부족)."
-        return None, "AI 응답에서 JSON 파싱 실패 (모델이 형식을 어겼습니다)."
-    except Exception as e:
-        return None, f"AI 호출 실패: {e}"
+        if isinstance(blocks, list) and blocks:
+            blocks = blocks[:2]
+            cols = st.columns(2 if streaming else len(blocks))
+            for i, b in enumerate(blocks):
+                title = str(b.get("title", "")).strip()
+                desc = str(b.get("desc", "")).strip()
+                tail = cursor if i == len(blocks) - 1 else ""
+                with cols[i]:
+                    st.markdown(
+                        f"""
+                        <div class="card-soft-sm">
+                          <div style="font-weight:700;margin-bottom:6px;">{title}</div>
+                          <div class="small-muted" style="line-height:1.45;">{desc}{tail}</div>
+                        </div>
+                        """,
+                        unsafe_allow_html=True,
+                    )
 
 # ✅ AI 버튼: 결과를 닫지 않게 + 스크롤 강제 안 함
 def request_ai_generation(cache_key: str):
@@ -830,327 +412,78 @@ def request_ai_generation(cache_key: str):
     st.session_state["ai_request"] = True
 
 # =====================================
-# 코멘트/판단 함수들
+# 신규 진입 스캐너 (A안: 심플) – 조회/계산 병렬
 # =====================================
-def get_mode_config(mode_name: str):
-    if mode_name == "단타":
-        return {"name": "단타", "period": "3mo", "lookback_short": 10, "lookback_long": 20, "atr_mult": 1.0}
-    elif mode_name == "장기":
-        return {"name": "장기", "period": "1y", "lookback_short": 20, "lookback_long": 60, "atr_mult": 1.6}
-    else:
-        return {"name": "스윙", "period": "6mo", "lookback_short": 15, "lookback_long": 40, "atr_mult": 1.3}
-
-def calc_trend_stops(df: pd.DataFrame, cfg: dict):
-    """
-    ✅ 레벨 계산은 일봉 기반
-    """
-    if df.empty:
-        return None, None
-
-    last = df.iloc[-1]
-    price = float(last["Close"])
-    ma20 = float(last["MA20"])
-    atr = float(last["ATR14"]) if "ATR14" in last and not np.isnan(last["ATR14"]) else None
-
-    recent_short = df.tail(cfg["lookback_short"])
-    recent_long = df.tail(cfg["lookback_long"])
-
-    swing_low = float(recent_short["Low"].min())
-    box_low = float(recent_long["Low"].min())
-
-    candidates = []
-
-    if swing_low < price:
-        candidates.append(swing_low * 0.995)
-
-    if ma20 < price:
-        candidates.append(ma20 * 0.99)
-
-    if box_low < price:
-        candidates.append(box_low * 0.995)
-
-    if atr is not None and atr > 0:
-        atr_stop = price - cfg["atr_mult"] * atr
-        if atr_stop < price:
-            candidates.append(atr_stop)
-
-    if not candidates:
-        sl0 = box_low * 0.985
-        sl1 = box_low * 0.96
-        return sl0, sl1
-
-    sl0 = max(candidates)
-    deep_candidate = min(box_low * 0.985, swing_low * 0.985)
-    sl1 = min(sl0 * 0.97, deep_candidate)
-    return sl0, sl1
-
-def calc_trend_targets(df: pd.DataFrame, cfg: dict):
-    if df.empty:
-        return None, None, None
-
-    last = df.iloc[-1]
-    price = float(last["Close"])
-    bbu = float(last["BBU"])
-    rsi = float(last["RSI14"])
-
-    recent_short = df.tail(cfg["lookback_short"])
-    recent_long = df.tail(cfg["lookback_long"])
-
-    swing_high = float(recent_short["High"].max())
-    box_high = float(recent_long["High"].max())
-
-    base_res = max(swing_high * 0.995, box_high * 0.99)
-    if not np.isnan(bbu):
-        base_res = max(base_res, bbu * 0.98)
-
-    tp1 = price * 1.08 if base_res <= price else base_res
-    tp0 = price + (tp1 - price) * 0.6
-    tp2 = tp1 + (tp1 - price) * 0.7
-
-    if rsi > 70:
-        tp0 = price + (tp1 - price) * 0.5
-        tp2 = tp1 + (tp1 - price) * 0.4
-
-    return tp0, tp1, tp2
-
-def calc_levels(df, last, cfg):
+def scan_new_entry_candidates(cfg: dict, max_results: int = 8, on_progress=None):
     """
-    ✅ 레벨 계산은 일봉 기반
+    ✅ 2단계: 시세 스냅샷 + 마지막 지표값으로 1차 제거 → 생존 종목만 전체 이력 조회/계산
+    ✅ 조회 한 번으로 세 모드 모두 판정 (진행 표시는 cfg 모드 기준)
+    반환: (시장점수, {모드명: 결과}, 단계별 통계)
     """
-    if df.empty:
-        return None, None, None, None, None, None, None
-
-    price = float(last["Close"])
-    ma20 = float(last["MA20"])
-    bbl = float(last["BBL"])
-
-    if price > ma20:
-        buy_low = ma20 * 0.98
-        buy_high = ma20 * 1.01
-    else:
-        buy_low = bbl * 0.98
-        buy_high = bbl * 1.02
-
-    tp0, tp1, tp2 = calc_trend_targets(df, cfg)
-    sl0, sl1 = calc_trend_stops(df, cfg)
-    return buy_low, buy_high, tp0, tp1, tp2, sl0, sl1
-
-# =====================================
-# ✅ 상태 머신: 구조 붕괴면 레벨 무효화 + 회복만 남김
-# =====================================
-def compute_state_and_action(
-    holding_type: str,
-    price_now: float,
-    avg_price: float,
-    levels: dict,
-    last_row: pd.Series
-):
-    buy_low = levels.get("buy_low")
-    buy_high = levels.get("buy_high")
-    tp0 = levels.get("tp0")
-    tp1 = levels.get("tp1")
-    tp2 = levels.get("tp2")
-    sl0 = levels.get("sl0")
-    sl1 = levels.get("sl1")
-
-    # 회복 확인가: "매수밴드 상단 회복" vs "20일선 회복" 중 더 보수적(높은 값)
-    try:
-        ma20 = float(last_row.get("MA20", np.nan))
-    except Exception:
-        ma20 = np.nan
-    recover_candidates = []
-    if buy_high is not None:
-        recover_candidates.append(float(buy_high) * 1.005)
-    if not np.isnan(ma20):
-        recover_candidates.append(float(ma20) * 1.01)
-    recover_level = max(recover_candidates) if recover_candidates else None
-
-    # ✅ 구조 붕괴 판정 (상태 전환은 현재가 기준)
-    structure_broken = False
-    if price_now is not None and sl1 is not None:
-        if price_now < float(sl1) * 0.998:
-            structure_broken = True
-
-    # ---- 구조 붕괴면: 기존 1차/목표 전부 무효화, 회복만 표시 ----
-    if structure_broken:
-        if recover_level is not None:
-            return (
-                "구조 붕괴 → 관망/회복 대기",
-                f"지금은 기존 매수/목표 레벨이 무효화된 구간. (회복 확인: {recover_level:.2f} 위로 복귀하면 다시 시나리오 재계산)",
-                recover_level,
-                "structure_broken",
-            )
-        return (
-            "구조 붕괴 → 관망/회복 대기",
-            "지금은 기존 매수/목표 레벨이 무효화된 구간. (회복 확인가 재계산 필요)",
-            recover_level,
-            "structure_broken",
-        )
-
-    # ---- 신규 진입 ----
-    if holding_type != "보유 중":
-        if price_now is None:
-            return "데이터 부족", "현재가(시외 포함)를 못 불러와서 상태 판정 불가", recover_level, "unknown"
-
-        # 진입 실패(약): sl0 하회 (단, 구조 붕괴는 위에서 처리됨)
-        if sl0 is not None and price_now < float(sl0) * 0.998:
-            return (
-                "진입 실패(중단)",
-                f"진입 가설이 흔들림. 우선 중단/관망. (회복 확인: {recover_level:.2f} 위 복귀 시 재평가)" if recover_level else
-                "진입 가설이 흔들림. 우선 중단/관망. (회복 확인가 재평가 필요)",
-                recover_level,
-                "fail_soft",
-            )
-
-        # 1차 구간 진입
-        if buy_low is not None and price_now <= float(buy_low) * 1.005:
-            if sl0 is not None:
-                return (
-                    "1차 구간 진입",
-                    f"분할 접근 구간. (1차: {buy_low:.2f} 근처 / 중단: {sl0:.2f} 이탈 시)",
-                    recover_level,
-                    "entry_1",
-                )
-            return (
-                "1차 구간 진입",
-                f"분할 접근 구간. (1차: {buy_low:.2f} 근처 / 중단 기준 재설정 필요)",
-                recover_level,
-                "entry_1",
-            )
-
-        if buy_high is not None and price_now <= float(buy_high) * 1.01:
-            return (
-                "접근 대기(근접)",
-                f"아직은 대기. (1차 시작: {buy_low:.2f} ~ {buy_high:.2f} 접근 시 분할)",
-                recover_level,
-                "wait_near",
-            )
-
-        if tp1 is not None and price_now >= float(tp1) * 0.98:
-            return (
-                "상단 구간(추격 경계)",
-                f"상단/저항 근접. 신규진입은 추격보다 확인 우선. (눌림 시: {buy_high:.2f} 근처 재접근)" if buy_high else
-                "상단/저항 근접. 신규진입은 추격보다 확인 우선.",
-                recover_level,
-                "tp_zone",
-            )
-
-        if buy_high is not None and buy_low is not None:
-            return (
-                "대기(접근 전)",
-                f"지금은 접근 전 대기. (1차 시작: {buy_low:.2f} ~ {buy_high:.2f})",
-                recover_level,
-                "wait_far",
-            )
-
-        return ("대기", "지금은 대기(레벨 계산값 부족).", recover_level, "wait")
-
-    # ---- 보유 중 ----
-    else:
-        if price_now is None:
-            return "데이터 부족", "현재가(시외 포함)를 못 불러와서 상태 판정 불가", recover_level, "unknown"
-
-        # 방어(약)
-        if sl0 is not None and price_now < float(sl0) * 0.998:
-            return (
-                "방어 우선",
-                f"방어 우선 구간. (0차 방어선: {sl0:.2f} 근처) 회복하면 유지, 재하락하면 비중조절",
-                recover_level,
-                "hold_def_soft",
-            )
-
-        if tp1 is not None and price_now >= float(tp1) * 0.98:
-            return (
-                "익절 구간",
-                f"익절/부분정리 고려 구간. (1차 목표: {tp1:.2f} 근처) 무리한 추가매수는 비추",
-                recover_level,
-                "hold_tp",
-            )
-
-        if buy_low is not None and price_now >= float(buy_low) * 1.02:
-            return (
-                "유지(추세 유지)",
-                f"유지 중심. (눌림 관심: {buy_low:.2f} ~ {buy_high:.2f}) / 이탈 시 방어: {sl0:.2f}" if (buy_high and sl0) else
-                "유지 중심(레벨 일부 부족).",
-                recover_level,
-                "hold_trend",
-            )
+    ov = get_us_market_overview()
+    market_score, _, _ = compute_market_score(ov)
+    results, stats = scanner.scan_two_stage_modes(
+        _modes_first(cfg), SCAN_CANDIDATES, get_price_data,
+        lambda syms: fetch_quote_snapshot(syms, provider=market_data),
+        max_results=max_results,
+        on_progress=on_progress,
+    )
+    return market_score, results, stats
 
-        if buy_low is not None and sl0 is not None:
-            return (
-                "애매 구간(대기/정리 고민)",
-                f"애매 구간. (눌림 매수는 {buy_low:.2f} 근처부터 / 방어는 {sl0:.2f} 이탈 시)",
-                recover_level,
-                "hold_amb",
-            )
+def scan_universe_candidates(cfg: dict, universe_name: str, max_results: int = 8, on_progress=None):
+    # ✅ 대형 유니버스: 일괄 조회 + 패널 지표 + 벡터화 판정 (메모리 예산 단위 배치)
+    ov = get_us_market_overview()
+    market_score, _, _ = compute_market_score(ov)
+    symbols = load_universe(universe_name)
+    results = scanner.scan_universe_modes(
+        _modes_first(cfg), symbols, price_store.get_daily_many, max_results=max_results,
+        on_progress=on_progress,
+    )
+    return market_score, results
 
-        return ("보유", "보유 중(레벨 계산값 부족).", recover_level, "hold")
+def _modes_first(cfg: dict):
+    # 현재 모드를 맨 앞에 (중간 결과/사전필터 기준), 스크리닝 규칙은 모든 모드에 동일 적용
+    others = [c for c in all_mode_configs() if c["name"] != cfg["name"]]
+    if cfg.get("rules") is not None:
+        others = [{**c, "rules": cfg["rules"]} for c in others]
+    return [cfg] + others
 
 # =====================================
-# 매물대/거래량 관련
-# =====================================
+# 스캐너 상위 종목 AI 해석 미리 생성
 # =====================================
-# 신규 진입 스캐너 (A안: 심플)
-# =====================================
-def scan_new_entry_candidates(cfg: dict, max_results: int = 8):
-    results = []
-    ov = get_us_market_overview()
-    market_score, _, _ = compute_market_score(ov)
+def pregenerate_scan_ai(items: list, cfg: dict, market: tuple, on_progress=None):
+    """
+    ✅ 분석 화면과 같은 입력(신규 진입 검토 · 스캔 모드)으로 캐시 키/프롬프트를 만들어 공용 AI 캐시에 미리 저장
+    - 종목별 준비(일봉·지표·시외 포함 최근가)도 병렬, LLM 호출은 ai.batch_interpret가 동시 실행 수/속도 제한
+    - 반환: ({symbol: 캐시 키}, 통계)
+    """
+    score, label, detail = market
 
-    for sym in SCAN_CANDIDATES:
+    def _prepare(sym):
         df = get_price_data(sym, cfg["period"])
         if df.empty:
-            continue
+            return sym, None
         df = analysis.add_indicators(df)
-        if df.empty or len(df) < max(30, cfg["lookback_long"] + 5):
-            continue
-
+        if df.empty:
+            return sym, None
         last = df.iloc[-1]
-        price_close = float(last["Close"])
-        rsi = float(last["RSI14"])
-
-        buy_low, buy_high, tp0, tp1, tp2, sl0, sl1 = calc_levels(df, last, cfg)
-        if buy_low is None or buy_high is None or tp1 is None:
-            continue
-
-        band_center = (buy_low + buy_high) / 2
-        dist_band_pct = abs(price_close - band_center) / price_close * 100
-
-        if price_close < buy_low * 0.97 or price_close > buy_high * 1.05:
-            continue
-        if rsi > 65:
-            continue
-
-        bias = analysis.short_term_bias(last)
-        score = 0
-        if "상방" in bias:
-            score += 2
-        elif "중립" in bias:
-            score += 1
-
-        score += max(0, 3 - dist_band_pct)
-        score += max(0, 2 - abs(rsi - 50) / 10)
-
-        # 스캐너는 단순 RR 유지
-        sl0_new = buy_low * 0.97
-        rr = analysis.calc_rr_ratio(price_close, tp1, sl0_new)
-
-        results.append({
-            "symbol": sym,
-            "price": price_close,
-            "rsi": rsi,
-            "bias": bias,
-            "dist_band": dist_band_pct,
-            "buy_low": buy_low,
-            "buy_high": buy_high,
-            "tp1": tp1,
-            "sl0": sl0_new,
-            "rr": rr,
-            "score": score,
-        })
-
-    results_sorted = sorted(results, key=lambda x: x["score"], reverse=True)
-    return market_score, results_sorted[:max_results]
+        ext_price = get_last_extended_price(sym)
+        price_now = float(ext_price) if ext_price is not None else float(last["Close"])
+        pos = position_view(df, last, cfg, "신규 진입 검토", price_now, 0.0)
+        return sym, ai.interpretation_request(sym, "신규 진입 검토", cfg["name"], 0.0, df, price_now, pos, score, label, detail)
+
+    symbols = [it["symbol"] for it in items]
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(symbols)))) as ex:
+        prepared = [(sym, req) for sym, req in ex.map(_prepare, symbols) if req is not None]
+
+    stats = ai.batch_interpret(
+        [req for _, req in prepared],
+        get_ai_cache(),
+        model_name=st.session_state.get("ai_model_name", ai.DEFAULT_MODEL),
+        on_progress=on_progress,
+    )
+    return {sym: req[0] for sym, req in prepared}, stats
+
 # =====================================
 # 세션 상태
 # =====================================
@@ -1170,6 +503,10 @@ if "scroll_to_result" not in st.session_state:
     st.session_state["scroll_to_result"] = False
 if "scan_results" not in st.session_state:
     st.session_state["scan_results"] = None
+if "scan_hidden" not in st.session_state:
+    st.session_state["scan_hidden"] = False
+if "scan_ai_keys" not in st.session_state:
+    st.session_state["scan_ai_keys"] = {}
 
 # ✅ 결과 유지용 (AI 클릭 rerun에도 결과 안 닫히게)
 if "show_result" not in st.session_state:
@@ -1178,8 +515,6 @@ if "analysis_params" not in st.session_state:
     st.session_state["analysis_params"] = None
 
 # ✅ AI 캐시/요청 플래그
-if "ai_cache" not in st.session_state:
-    st.session_state["ai_cache"] = {}
 if "ai_request" not in st.session_state:
     st.session_state["ai_request"] = False
 if "ai_request_key" not in st.session_state:
@@ -1192,6 +527,10 @@ if st.session_state.get("pending_symbol"):
     st.session_state["selected_symbol"] = ps
     st.session_state["run_from_side"] = True
     st.session_state["pending_symbol"] = ""
+    # 스캐너에서 온 종목은 신규 진입 검토로 (미리 만든 AI 해석과 같은 캐시 키)
+    _pending_holding = st.session_state.pop("pending_holding_type", None)
+    if _pending_holding:
+        st.session_state["holding_type"] = _pending_holding
 
 # =====================================
 # 레이아웃: 메인 + 사이드
@@ -1235,15 +574,25 @@ with col_main:
 
     # 1) 미국 시장 개요 + 레이어
     with st.expander("🌍 미국 시장 실시간 흐름 (보조지표 + 레이어)", expanded=True):
+        overview_refresher = get_overview_refresher()
         col_btn1, col_btn2 = st.columns([1, 4])
         with col_btn1:
             refresh = st.button("🔄 새로고침", key="refresh_overview")
         if refresh:
-            get_us_market_overview.clear()
+            overview_refresher.refresh_async()
 
+        # ✅ 첫 로드만 기다리고, 이후에는 마지막 스냅샷을 바로 렌더 (갱신은 백그라운드)
         with st.spinner("미국 선물 · 금리 · 달러 · ETF · 레이어 상황 불러오는 중..."):
             ov = get_us_market_overview()
 
+        with col_btn2:
+            ov_age = overview_refresher.age()
+            if ov_age is not None:
+                ov_status = f"⏱ {ov_age:.0f}초 전 데이터"
+                if overview_refresher.refreshing:
+                    ov_status += " · 백그라운드 갱신 중 (다음 화면 갱신 때 반영)"
+                st.caption(ov_status)
+
         score_mkt, label_mkt, detail_mkt = compute_market_score(ov)
 
         fut = ov.get("futures", {})
@@ -1322,6 +671,18 @@ with col_main:
                 unsafe_allow_html=True,
             )
 
+        if st.checkbox("📜 시장 판독 히스토리 (1년)", value=False, key="show_market_history"):
+            hist = get_market_history("1y")
+            if hist.empty:
+                st.caption("히스토리를 계산할 일봉 데이터가 없습니다.")
+            else:
+                st.line_chart(hist[["macro", "etf", "index", "leader"]].rename(
+                    columns={"macro": "Macro", "etf": "ETF", "index": "Index", "leader": "BigTech"}
+                ))
+                counts = hist["conclusion"].value_counts()
+                st.caption(" · ".join(f"{k} {v}일" for k, v in counts.items()))
+                st.caption("※ 과거 값은 일봉 종가 기준 재계산 (ETF는 정규장 종가, 프리/애프터 미반영)")
+
         if detail_mkt:
             st.caption("· " + detail_mkt)
 
@@ -1434,10 +795,10 @@ with col_main:
             "종목 이름/티커 (예: NVDA, 엔비디아, META, TQQQ)",
             key="symbol_input",
         )
-        holding_type = st.radio("보유 상태", ["보유 중", "신규 진입 검토"], horizontal=True)
+        holding_type = st.radio("보유 상태", ["보유 중", "신규 진입 검토"], horizontal=True, key="holding_type")
 
     with col_top2:
-        mode_name = st.selectbox("투자 모드 선택", ["단타", "스윙", "장기"], index=1)
+        mode_name = st.selectbox("투자 모드 선택", MODE_NAMES, index=1)
         commission_pct = st.number_input(
             "왕복 수수료/비용(%) (기본 0.2% 가정)",
             min_value=0.0, max_value=2.0,
@@ -1445,6 +806,7 @@ with col_main:
         )
 
     cfg = get_mode_config(mode_name)
+    scan_cfg = cfg  # 스캐너는 분석 결과와 무관하게 현재 선택된 모드 기준
 
     prefix = (user_symbol or "").strip().upper().replace(" ", "")
     candidates = sorted(set(POPULAR_SYMBOLS + st.session_state["recent_symbols"]))
@@ -1466,9 +828,16 @@ with col_main:
     run_from_side = st.session_state.get("run_from_side", False)
     run = run_click or run_from_side
     st.session_state["run_from_side"] = False
+    # 스캐너 "바로 분석"으로 연 경우 (모드, 종목) → 미리 생성한 AI 해석 키를 찾는 데 사용
+    scan_open = st.session_state.pop("pending_scan_open", None) if run_from_side and not run_click else None
 
     # ✅ run 시점에 결과 유지 파라미터를 저장 (AI rerun에도 결과 유지)
     if run:
+        # ✅ 명시적 분석 요청일 때만 실시간성 데이터(분봉/최근가) 캐시 무효화 → 그 외 rerun은 캐시 사용
+        # ✅ 스캐너에서 연 종목은 무효화하지 않음 (미리 생성한 AI 해석과 같은 최근가 스냅샷 사용)
+        _run_sym = normalize_symbol(user_symbol)
+        if _run_sym and scan_open is None:
+            get_intraday_snapshot.invalidate(_run_sym)
         st.session_state["show_result"] = True
         st.session_state["analysis_params"] = {
             "user_symbol": user_symbol,
@@ -1477,6 +846,7 @@ with col_main:
             "commission_pct": commission_pct,
             "avg_price": float(avg_price or 0.0),
             "shares": int(shares or 0),
+            "scan_open": scan_open,
         }
         st.session_state["scroll_to_result"] = True
 
@@ -1489,40 +859,152 @@ with col_main:
         commission_pct = _p.get("commission_pct", commission_pct)
         avg_price = float(_p.get("avg_price", avg_price or 0.0) or 0.0)
         shares = int(_p.get("shares", shares or 0) or 0)
+        scan_open = _p.get("scan_open")
         cfg = get_mode_config(mode_name)
 
     # 스캐너
     with st.expander("🛰 신규 진입 스캐너 (간단 버전)", expanded=False):
+        universe_options = [DEFAULT_UNIVERSE_LABEL] + list_universes()
+        scan_universe_name = st.selectbox(
+            "스캔 대상 (universes/ 폴더의 구성종목 파일)",
+            universe_options,
+            key="scan_universe",
+        )
+        # ✅ 스크리닝 규칙: 지표 이름으로 쓴 식 → 유니버스 전체에 벡터 연산으로 한 번에 적용
+        scan_rules_text = st.text_area(
+            "스크리닝 규칙 (한 줄에 하나, 모두 만족해야 통과 · 예: RSI14 < 60 and Close > MA20 and ATR14 / Close < 0.04)",
+            value=DEFAULT_RULES.to_text(),
+            key="scan_rules_text",
+            help="사용 가능한 이름: " + ", ".join(RULE_FIELDS) + " · 함수: abs, min, max",
+        )
+        scan_score_text = st.text_input("스코어 식 (통과 종목 정렬 기준)", value=DEFAULT_RULES.score, key="scan_score_text")
+        try:
+            scan_rules = parse_rules(scan_rules_text, scan_score_text)
+        except RuleError as e:
+            st.error(f"규칙 오류: {e}")
+            scan_rules = None
+        if scan_rules is not None:
+            scan_cfg = {**scan_cfg, "rules": scan_rules}
+
+        st.checkbox(
+            "🤖 스캔 후 상위 종목 AI 해석 자동 생성 (🔍 바로 분석 시 즉시 표시)",
+            value=False,
+            key="scan_ai_auto",
+        )
+
         col_s1, col_s2 = st.columns([1, 1])
         with col_s1:
-            scan_click = st.button("📊 스캐너 실행", key="run_scan")
+            scan_click = st.button("📊 스캐너 실행", key="run_scan", disabled=scan_rules is None)
         with col_s2:
             close_scan = st.button("🧹 결과 닫기", key="close_scan")
 
+        scan_universe_key = scan_jobs.DEFAULT_UNIVERSE if scan_universe_name == DEFAULT_UNIVERSE_LABEL else scan_universe_name
+
         if close_scan:
             st.session_state["scan_results"] = None
+            st.session_state["scan_hidden"] = True
             st.success("스캐너 결과를 닫았습니다.")
             st.rerun()
 
         if scan_click:
-            with st.spinner("신규 진입 후보 종목 스캔 중..."):
-                scan_mkt_score, scan_list = scan_new_entry_candidates(cfg)
-            st.session_state["scan_results"] = {"market_score": scan_mkt_score, "items": scan_list}
+            st.session_state["scan_hidden"] = False
+            # ✅ 종목(유니버스는 배치)이 끝날 때마다 상위 k 중간 결과를 바로 표시 + 저장
+            # ✅ 중단 버튼: 누르면 Streamlit이 rerun을 요청 → 다음 진행 표시(st 호출)에서 이 스크립트 실행이 멈추고
+            #    스캐너의 finally가 남은 조회/계산 작업을 취소. 부분 결과는 진행 콜백이 그리기 전에 세션에 저장해 둠
+            st.button("⏹ 스캔 중단", key="cancel_scan")
+            scan_mkt_score, _, _ = compute_market_score(get_us_market_overview())
+            progress_slot = st.empty()
+
+            def _on_scan_progress(items, done, total):
+                st.session_state["scan_results"] = {
+                    "market_score": scan_mkt_score, "by_mode": {scan_cfg["name"]: items}, "stats": None,
+                    "universe": scan_universe_key, "rules": scan_rules, "partial": (done, total),
+                }
+                with progress_slot.container():
+                    st.progress(done / total if total else 1.0, text=f"스캔 중... {done}/{total}")
+                    for it in items:
+                        st.caption(f"{it['symbol']} · 스코어 {it['score']:.1f}")
+
+            scan_stats = None
+            if scan_universe_name == DEFAULT_UNIVERSE_LABEL:
+                scan_mkt_score, scan_by_mode, scan_stats = scan_new_entry_candidates(
+                    scan_cfg, on_progress=_on_scan_progress,
+                )
+            else:
+                scan_mkt_score, scan_by_mode = scan_universe_candidates(
+                    scan_cfg, scan_universe_name, on_progress=_on_scan_progress,
+                )
+            progress_slot.empty()
+            st.session_state["scan_results"] = {
+                "market_score": scan_mkt_score, "by_mode": scan_by_mode, "stats": scan_stats,
+                "universe": scan_universe_key, "rules": scan_rules,
+            }
 
         scan_data = st.session_state.get("scan_results")
+        if scan_data and (scan_data.get("universe") != scan_universe_key or scan_data.get("rules") != scan_rules):
+            scan_data = None
+        if not scan_data and not st.session_state.get("scan_hidden") and scan_rules == DEFAULT_RULES:
+            # ✅ 이 세션에서 직접 돌린 결과가 없으면 정기 스캔 작업(app_core.scan_jobs)의 최신 스냅샷 표시
+            scan_data = scan_jobs.load_latest_snapshot(scan_universe_key)
+            if scan_data:
+                snap_time = datetime.fromtimestamp(scan_data["created_at"]).strftime("%Y-%m-%d %H:%M")
+                snap_age_min = max(0, int((time.time() - scan_data["created_at"]) // 60))
+                st.caption(f"📦 정기 스캔 스냅샷 · {snap_time} ({snap_age_min}분 전) — 최신 값이 필요하면 📊 스캐너 실행")
         if scan_data:
             scan_mkt_score = scan_data["market_score"]
-            scan_list = scan_data["items"]
+            # ✅ 모드를 바꿔도 다시 조회하지 않고 저장된 모드별 결과를 표시
+            scan_list = scan_data["by_mode"].get(scan_cfg["name"])
+            if scan_list is None:
+                st.info(f"'{scan_cfg['name']}' 모드 결과가 없습니다 (중단된 스캔). 스캐너를 다시 실행해 주세요.")
+                scan_list = []
+            else:
+                st.caption(f"'{scan_cfg['name']}' 모드 기준 결과 (투자 모드를 바꾸면 저장된 해당 모드 결과로 전환)")
 
             if scan_mkt_score <= -4:
                 st.warning("시장 점수가 강한 Risk-off 구간입니다. 신규 진입은 특히 보수적으로.")
 
+            scan_partial = scan_data.get("partial")
+            if scan_partial:
+                st.info(f"스캔이 중단되어 {scan_partial[0]}/{scan_partial[1]}개 종목까지의 부분 결과입니다.")
+
+            scan_stats = scan_data.get("stats")
+            if scan_stats:
+                st.caption(
+                    f"⏱ 1단계(시세 사전필터) {scan_stats['universe']}개 중 {scan_stats['stage1_removed']}개 제거"
+                    f" · {scan_stats['stage1_sec']:.2f}초 | "
+                    f"2단계(전체 계산) {scan_stats['stage2_evaluated']}개 중 {scan_stats['stage2_removed']}개 제거"
+                    f" · 변동 없는 종목×모드 {scan_stats.get('stage2_reused', 0)}건 재사용"
+                    f" · {scan_stats['stage2_sec']:.2f}초"
+                )
+
             if not scan_list:
                 st.write("조건을 만족하는 신규 진입 후보 종목이 없습니다.")
             else:
                 st.caption(f"총 **{len(scan_list)}개** 종목이 조건을 만족했습니다.")
                 scan_clicked_symbol = None
 
+                # ✅ 상위 k개 AI 해석을 한꺼번에 (동시 실행 수/속도 제한) → 공용 AI 캐시
+                col_ai1, col_ai2 = st.columns([1, 2])
+                with col_ai1:
+                    scan_ai_k = st.number_input("AI 해석: 상위 k개", min_value=1, max_value=10, value=3, step=1, key="scan_ai_k")
+                with col_ai2:
+                    scan_ai_click = st.button(f"🤖 상위 {scan_ai_k}개 AI 해석 미리 생성", key="scan_ai_batch")
+                if scan_ai_click or (scan_click and st.session_state.get("scan_ai_auto")):
+                    ai_progress = st.empty()
+                    scan_ai_keys, scan_ai_stats = pregenerate_scan_ai(
+                        scan_list[:int(scan_ai_k)], scan_cfg, (score_mkt, label_mkt, detail_mkt),
+                        on_progress=lambda done, total: ai_progress.progress(done / total, text=f"AI 해석 생성 중... {done}/{total}"),
+                    )
+                    ai_progress.empty()
+                    st.session_state["scan_ai_keys"].update({(scan_cfg["name"], k): v for k, v in scan_ai_keys.items()})
+                    st.caption(
+                        f"🤖 AI 해석: 새로 생성 {scan_ai_stats['generated']} · 이미 있음 {scan_ai_stats['cached']}"
+                        f" · 실패 {scan_ai_stats['failed']} · {scan_ai_stats['sec']:.1f}초"
+                    )
+                    for e in scan_ai_stats["errors"][:3]:
+                        st.caption(f"⚠ {e}")
+                scan_ai_cache = get_ai_cache()
+
                 for item in scan_list:
                     sym = item["symbol"]
                     price = item["price"]
@@ -1531,8 +1013,10 @@ with col_main:
                     rr = item.get("rr")
 
                     rr_txt = f"{rr:.2f}:1" if rr is not None else "N/A"
+                    ai_ready = scan_ai_cache.contains(st.session_state["scan_ai_keys"].get((scan_cfg["name"], sym)))
                     st.markdown(
                         f"**{sym}** | 현재가(일봉 종가) **{price:.2f}** | 단기흐름: {bias} | 스코어 **{score_val:.1f}** | 손익비 {rr_txt}"
+                        + (" | 🤖 AI 해석 준비됨" if ai_ready else "")
                     )
                     go = st.button(f"🔍 {sym} 바로 분석", key=f"scan_go_{sym}")
                     if go:
@@ -1540,6 +1024,8 @@ with col_main:
 
                 if scan_clicked_symbol is not None:
                     st.session_state["pending_symbol"] = scan_clicked_symbol
+                    st.session_state["pending_holding_type"] = "신규 진입 검토"
+                    st.session_state["pending_scan_open"] = (scan_cfg["name"], scan_clicked_symbol)
                     st.session_state["scroll_to_result"] = True
                     st.rerun()
 
@@ -1584,35 +1070,15 @@ with col_main:
     profit_pct = (price_now - avg_price) / avg_price * 100 if avg_price > 0 else 0.0
     total_pnl = (price_now - avg_price) * shares if (shares > 0 and avg_price > 0) else 0.0
 
-    buy_low, buy_high, tp0, tp1, tp2, sl0, sl1 = calc_levels(df, last, cfg)
-
-    # ✅ 신규 진입 손절: ATR 기반 보정 (변동성 반영)
-    atr14 = float(last["ATR14"]) if "ATR14" in last and not np.isnan(last["ATR14"]) else None
-    if holding_type == "신규 진입 검토" and buy_low is not None and atr14 is not None and atr14 > 0:
-        sl0 = max(0.01, float(buy_low) - 1.0 * atr14)
-        sl1 = max(0.01, float(buy_low) - 1.8 * atr14)
-    elif holding_type == "신규 진입 검토" and buy_low is not None:
-        # ATR이 없으면 최소한의 fallback
-        sl0 = buy_low * 0.97
-        sl1 = buy_low * 0.94
-
-    levels_dict = {
-        "buy_low": buy_low, "buy_high": buy_high,
-        "tp0": tp0, "tp1": tp1, "tp2": tp2,
-        "sl0": sl0, "sl1": sl1,
-    }
-
-    # ✅ 상태 머신
-    state_name, action_text, recover_level, phase = compute_state_and_action(
-        holding_type=holding_type,
-        price_now=price_now,
-        avg_price=avg_price,
-        levels=levels_dict,
-        last_row=last,
-    )
-
-    # ✅ 구조 붕괴 플래그 (UI에서 레벨 무효화/숨김 처리)
-    structure_broken = ("구조 붕괴" in state_name)
+    pos = position_view(df, last, cfg, holding_type, price_now, avg_price)
+    levels_dict = pos["levels"]
+    buy_low, buy_high = levels_dict["buy_low"], levels_dict["buy_high"]
+    tp0, tp1, tp2 = levels_dict["tp0"], levels_dict["tp1"], levels_dict["tp2"]
+    sl0, sl1 = levels_dict["sl0"], levels_dict["sl1"]
+    atr14 = pos["atr14"]
+    state_name, action_text = pos["state_name"], pos["action_text"]
+    recover_level, phase = pos["recover_level"], pos["phase"]
+    structure_broken = pos["structure_broken"]
 
     rr = analysis.calc_rr_ratio(price_now, tp1, sl0)
 
@@ -1824,11 +1290,21 @@ with col_main:
     st.caption("※ AI는 '확정 매수/매도 지시'가 아니라, 현재가 기준의 '조건부 행동지침'만 제공합니다.")
 
     try:
-        cache_key = _ai_make_cache_key(symbol, holding_type, mode_name, avg_price, last, label_mkt, state_name, price_now)
+        cache_key, ai_kwargs = ai.interpretation_request(
+            symbol, holding_type, mode_name, avg_price, df, price_now, pos, score_mkt, label_mkt, detail_mkt,
+        )
     except Exception:
-        cache_key = None
+        cache_key, ai_kwargs = None, None
+
+    ai_cache = get_ai_cache()
+    # ✅ 스캐너에서 연 종목: 스캔 후 가격/국면이 바뀌어 키가 달라져도 미리 생성한 해석을 바로 표시
+    if cache_key is not None and scan_open == (mode_name, symbol) and holding_type == "신규 진입 검토":
+        cache_key = ai.pick_cache_key(cache_key, st.session_state["scan_ai_keys"].get(scan_open), ai_cache)
+
+    # ✅ LLM 없이 상태 머신 값으로 만든 즉시 해석: 먼저 그려 두고, LLM 답이 오면 교체 (실패/미설정이면 그대로)
+    ai_quick = ai.template_interpretation(ai_kwargs, phase) if ai_kwargs is not None else None
 
-    cached = (cache_key is not None and cache_key in st.session_state.get("ai_cache", {}))
+    cached = ai_cache.contains(cache_key)
     btn_label = "🔁 AI 해석 다시 생성" if cached else "✨ AI 해석 보기"
 
     if cache_key is not None:
@@ -1841,99 +1317,65 @@ with col_main:
     else:
         st.info("AI 캐시 키 생성 실패(데이터 부족).")
 
+    ai_slot = st.empty()
+    if ai_quick is not None and not cached:
+        render_ai_output(ai_slot, ai_quick, quick=True)
+
     if st.session_state.get("ai_request", False) and st.session_state.get("ai_request_key") == cache_key:
         st.session_state["ai_request"] = False
         st.session_state["ai_request_key"] = None
 
-        extra_notes = [
-            f"시장점수: {score_mkt} / label: {label_mkt}",
-            f"현재상태: {state_name}",
-            f"행동지침: {action_text}",
-            f"단기흐름(일봉): {bias_comment}",
-            f"갭: {gap_comment}",
-            f"구조붕괴: {structure_broken}",
-        ]
-
-        if holding_type == "보유 중" and avg_price > 0:
-            extra_notes.append(f"평단 대비(현재가): {(price_now/avg_price-1)*100:+.2f}%")
-        if atr14 is not None:
-            extra_notes.append(f"ATR14: {atr14:.2f}")
-
-        # ✅ 구조 붕괴면 levels도 최소화해서 AI가 헷갈리게 말 못 하게 함
-        levels_for_ai = levels_dict | {"recover": recover_level}
-        if structure_broken:
-            levels_for_ai = {
-                "sl0": levels_dict.get("sl0"),
-                "sl1": levels_dict.get("sl1"),
-                "recover": recover_level,
-            }
-
         with st.spinner("AI 해석 생성 중..."):
-            ai_model_name = st.session_state.get("ai_model_name", "gpt-4o-mini")
-            parsed, err = ai_summarize_and_explain(
-                symbol=symbol,
-                holding_type=holding_type,
-                mode_name=mode_name,
-                market_label=label_mkt,
-                market_detail=detail_mkt,
-                live_price=price_now,
-                day_close=price_close,
-                avg_price=avg_price,
-                state_name=state_name,
-                action_text=action_text,
-                bias_comment=bias_comment,
-                gap_comment=gap_comment,
-                rr=rr if (not structure_broken) else None,
-                levels=levels_for_ai,
-                last_row=last,
-                extra_notes=extra_notes,
+            ai_model_name = st.session_state.get("ai_model_name", ai.DEFAULT_MODEL)
+            # ✅ 스트리밍: 첫 토큰부터 한 줄 요약 → 설명 블록 순으로 바로 그림 (완성본은 아래에서 다시 그림)
+            parsed, err = ai.ai_summarize_and_explain(
+                **ai_kwargs,
                 model_name=ai_model_name,
+                stream=True,
+                on_partial=lambda view: render_ai_output(ai_slot, view, streaming=True),
             )
 
         if parsed:
             if cache_key:
-                st.session_state["ai_cache"][cache_key] = parsed
+                ai_cache.set(cache_key, parsed, model=ai_model_name)
             st.success("AI 해석 생성 완료!")
         else:
             st.error(err or "AI 생성 실패")
 
-    ai_out = None
-    if cache_key and cache_key in st.session_state.get("ai_cache", {}):
-        ai_out = st.session_state["ai_cache"][cache_key]
-
-    if ai_out is not None:
-        one = str(ai_out.get("summary_one_line", "")).strip()
-        blocks = ai_out.get("confusion_explain", [])
-
-        if one:
-            st.markdown(
-                f"""
-                <div class="card-soft">
-                  <div class="layer-title-en">AI SUMMARY</div>
-                  <div style="font-size:1.05rem;font-weight:700;line-height:1.35;">{one}</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
+    ai_out = ai_cache.get(cache_key) if cache_key else None
+    ai_stats = ai_cache.stats()
+    llm_stats = llm_metrics()
+    llm_line = ""
+    if llm_stats["calls"] or llm_stats["errors"]:
+        p50 = llm_stats["latency_p50"]
+        ttft = llm_stats["ttft_p50"]
+        llm_line = (
+            f" · LLM {llm_stats['calls']}회 (오류 {llm_stats['errors']}, 재시도 {llm_stats['retries']})"
+            + (f" · 지연 p50 {p50:.1f}s" if p50 is not None else "")
+            + (f" / 첫 토큰 {ttft:.1f}s" if ttft is not None else "")
+            + f" · 토큰 {llm_stats['prompt_tokens'] + llm_stats['completion_tokens']:,}"
+        )
+    st.caption(
+        f"AI 해석 캐시(공용): {ai_stats['entries']}건 · 적중 {ai_stats['hits']} / 미적중 {ai_stats['misses']}"
+        f" ({ai_stats['hit_rate'] * 100:.0f}%)" + llm_line
+    )
+    key_stats = ai.key_metrics.snapshot()
+    if key_stats["lookups"]:
+        key_line = f"캐시 키: {key_stats['mode']} · 재사용 {key_stats['reuse_rate'] * 100:.0f}%"
+        if key_stats["mode"] != "exact":
+            key_line += (
+                f" (exact 키였다면 {key_stats['exact_reuse_rate'] * 100:.0f}%)"
+                f" · 현재가가 ATR14×{ai.KEY_BUCKETS['price_atr_frac']:g} 안에서 움직이고 상태가 같으면 같은 해석 재사용"
             )
+        st.caption(key_line)
 
-        if isinstance(blocks, list) and blocks:
-            blocks = blocks[:2]
-            cols = st.columns(len(blocks))
-            for i, b in enumerate(blocks):
-                title = str(b.get("title", "")).strip()
-                desc = str(b.get("desc", "")).strip()
-                with cols[i]:
-                    st.markdown(
-                        f"""
-                        <div class="card-soft-sm">
-                          <div style="font-weight:700;margin-bottom:6px;">{title}</div>
-                          <div class="small-muted" style="line-height:1.45;">{desc}</div>
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
+    if ai_out is not None:
+        render_ai_output(ai_slot, ai_out)
+    elif ai_quick is not None:
+        render_ai_output(ai_slot, ai_quick, quick=True)
+        st.caption("※ 위 내용은 상태/레벨로 바로 만든 기본 해석입니다. AI 해석은 버튼을 누를 때만 생성됩니다. (Streamlit Secrets에 OPENAI_API_KEY 필요)")
     else:
-        st.info("AI 해석은 버튼을 누를 때만 생성됩니다. (Streamlit Secrets에 OPENAI_API_KEY 필요)")
+        ai_slot.info("AI 해석은 버튼을 누를 때만 생성됩니다. (Streamlit Secrets에 OPENAI_API_KEY 필요)")
 
     st.subheader("📈 가격/볼린저밴드 차트 (일봉 기반)")
     chart_df = df[["Close", "MA20", "BBL", "BBU"]].tail(120)
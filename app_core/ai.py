@@ -0,0 +1,832 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from app_core import analysis
+from app_core.levels import position_view
+from app_core.llm import LLMTimeout, LLMUnavailable, RateLimiter, get_llm_client
+
+logger = logging.getLogger(__name__)
+
+# =====================================
+# AI 해석 유틸 (상태 머신 반영)
+# - 일반 호출: 응답 전체를 받은 뒤 JSON 파싱
+# - 스트리밍: 토큰이 오는 대로 부분 JSON을 읽어 summary → 설명 블록 순으로 먼저 보여주고, 끝나면 같은 검증
+# - 호출은 프로세스 공용 LLM 클라이언트(app_core.llm: 연결 풀/마감 시간/재시도/동시 호출 상한) 경유
+# - OPENAI_BASE_URL을 지정하면 호환 서버(예: python -m app_core.llm_stub)로 호출
+# =====================================
+AI_TEMPERATURE = 0.15
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# 스캐너 상위 종목 일괄 생성 (동시 실행 수 / 초당 시작 수)
+BATCH_MAX_WORKERS = 4
+BATCH_RATE_PER_SEC = 2.0
+
+
+# ---- 캐시 키 ----
+# exact: 가격/지표를 소수 4자리까지 그대로 해시 (시외 가격이 1틱만 움직여도 새 키)
+# semantic: 해석이 달라지지 않을 만큼의 변화는 같은 키로 (가격류는 ATR14 비례 단위, RSI는 구간)
+#   - 상태(state_name/phase)·모드·보유 여부·시장 라벨은 그대로 → 상태가 바뀌면 항상 새 키
+#   - 설정: CHAN_AI_KEY_MODE=exact|semantic, CHAN_AI_KEY_BUCKETS='{"price_atr_frac": 0.2}' 또는 configure_cache_keys()
+KEY_MODES = ("exact", "semantic")
+DEFAULT_KEY_BUCKETS = {
+    "price_atr_frac": 0.25,   # 현재가/종가/MA20/BB/평단: ATR14 × 0.25 단위
+    "price_rel_frac": 0.005,  # ATR이 없으면: 일봉 종가 × 0.5% 단위
+    "rsi_band": 5.0,          # RSI: 5포인트 구간
+    "macd_atr_frac": 0.1,     # MACD/시그널: ATR14 × 0.1 단위
+}
+
+
+def _key_mode_from_env(text: str) -> str:
+    mode = (text or "semantic").strip().lower()
+    if mode not in KEY_MODES:
+        logger.warning("CHAN_AI_KEY_MODE=%r 는 지원하지 않음 → semantic 사용", text)
+        return "semantic"
+    return mode
+
+
+def _buckets_from_env(text: str) -> dict:
+    """
+    CHAN_AI_KEY_BUCKETS(JSON) → 버킷 설정 (형식/키/값이 잘못되면 경고 후 기본값 – 앱 시작을 막지 않음)
+    """
+    if not (text or "").strip():
+        return dict(DEFAULT_KEY_BUCKETS)
+    try:
+        raw = json.loads(text)
+        if not isinstance(raw, dict):
+            raise ValueError("JSON 객체가 아님")
+        unknown = set(raw) - set(DEFAULT_KEY_BUCKETS)
+        if unknown:
+            raise ValueError(f"알 수 없는 키: {', '.join(sorted(unknown))}")
+        values = {k: float(v) for k, v in raw.items()}
+        if any(not np.isfinite(v) or v <= 0 for v in values.values()):
+            raise ValueError("버킷 폭은 0보다 커야 함")
+    except (TypeError, ValueError) as e:
+        logger.warning("CHAN_AI_KEY_BUCKETS=%r 무시 (%s) → 기본 버킷 사용", text, e)
+        return dict(DEFAULT_KEY_BUCKETS)
+    return {**DEFAULT_KEY_BUCKETS, **values}
+
+
+KEY_MODE = _key_mode_from_env(os.getenv("CHAN_AI_KEY_MODE"))
+KEY_BUCKETS = _buckets_from_env(os.getenv("CHAN_AI_KEY_BUCKETS"))
+
+
+def configure_cache_keys(mode: str = None, **buckets):
+    """
+    키 모드/버킷 폭 변경 (프로세스 전체에 적용)
+    """
+    global KEY_MODE
+    if mode is not None:
+        if mode not in KEY_MODES:
+            raise ValueError(f"지원하지 않는 키 모드: {mode} (가능: {', '.join(KEY_MODES)})")
+        KEY_MODE = mode
+    unknown = set(buckets) - set(DEFAULT_KEY_BUCKETS)
+    if unknown:
+        raise ValueError(f"알 수 없는 버킷 설정: {', '.join(sorted(unknown))}")
+    KEY_BUCKETS.update({k: float(v) for k, v in buckets.items()})
+
+
+def _num(row, name):
+    try:
+        x = float(row.get(name, np.nan))
+    except (TypeError, ValueError):
+        return None
+    return x if np.isfinite(x) else None
+
+
+def _bucket(x, step):
+    if x is None or not step or step <= 0:
+        return None
+    return int(np.floor(x / step + 0.5))
+
+
+def _exact_key(symbol: str, holding_type: str, mode_name: str, avg_price: float, df_last: pd.Series, market_label: str, state_name: str, live_price: float):
+    payload = {
+        "symbol": symbol,
+        "holding_type": holding_type,
+        "mode": mode_name,
+        "avg_price": round(float(avg_price or 0.0), 4),
+        "live_price": round(float(live_price or 0.0), 4),
+        "close": round(float(df_last.get("Close", 0.0)), 4),
+        "ma20": round(float(df_last.get("MA20", 0.0)), 4),
+        "bbl": round(float(df_last.get("BBL", 0.0)), 4),
+        "bbu": round(float(df_last.get("BBU", 0.0)), 4),
+        "rsi": round(float(df_last.get("RSI14", 0.0)), 4),
+        "macd": round(float(df_last.get("MACD", 0.0)), 4),
+        "macds": round(float(df_last.get("MACD_SIGNAL", 0.0)), 4),
+        "state": state_name,
+        "market": market_label,
+    }
+    s = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.md5(s.encode("utf-8")).hexdigest()
+
+
+def _semantic_key(symbol, holding_type, mode_name, avg_price, df_last, market_label, state_name, live_price, phase, buckets):
+    close = _num(df_last, "Close")
+    atr = _num(df_last, "ATR14")
+    if atr is not None and atr > 0:
+        price_step = atr * buckets["price_atr_frac"]
+        macd_step = atr * buckets["macd_atr_frac"]
+    else:
+        # 현재가가 아니라 일봉 종가 기준 → 틱마다 단위가 흔들리지 않도록
+        price_step = (close or 0.0) * buckets["price_rel_frac"]
+        macd_step = price_step
+    macd, macds = _num(df_last, "MACD"), _num(df_last, "MACD_SIGNAL")
+    payload = {
+        "v": "s1",
+        "buckets": sorted(buckets.items()),
+        "symbol": symbol,
+        "holding_type": holding_type,
+        "mode": mode_name,
+        "state": state_name,
+        "phase": phase,
+        "market": market_label,
+        "avg_price": _bucket(float(avg_price or 0.0), price_step) if avg_price else 0,
+        "live_price": _bucket(float(live_price or 0.0), price_step),
+        "close": _bucket(close, price_step),
+        "ma20": _bucket(_num(df_last, "MA20"), price_step),
+        "bbl": _bucket(_num(df_last, "BBL"), price_step),
+        "bbu": _bucket(_num(df_last, "BBU"), price_step),
+        "rsi": _bucket(_num(df_last, "RSI14"), buckets["rsi_band"]),
+        "macd": _bucket(macd, macd_step),
+        "macds": _bucket(macds, macd_step),
+        "macd_above": None if macd is None or macds is None else macd >= macds,
+    }
+    s = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.md5(s.encode("utf-8")).hexdigest()
+
+
+def make_cache_key(
+    symbol: str,
+    holding_type: str,
+    mode_name: str,
+    avg_price: float,
+    df_last: pd.Series,
+    market_label: str,
+    state_name: str,
+    live_price: float,
+    phase: str = None,
+    key_mode: str = None,
+    buckets: dict = None,
+):
+    """
+    AI 캐시 키 (key_mode 기본값은 KEY_MODE, buckets 기본값은 KEY_BUCKETS)
+    """
+    key_mode = key_mode or KEY_MODE
+    if key_mode == "exact":
+        return _exact_key(symbol, holding_type, mode_name, avg_price, df_last, market_label, state_name, live_price)
+    buckets = {**KEY_BUCKETS, **(buckets or {})}
+    return _semantic_key(symbol, holding_type, mode_name, avg_price, df_last, market_label, state_name, live_price, phase, buckets)
+
+
+class KeyMetrics:
+    """
+    같은 요청 흐름을 exact 키였다면 몇 번 재사용했을지와 비교 (최근 window개 키 기준, 스레드 안전)
+    - lookups: 키를 만든 횟수 / repeat_*: 이전에 본 적 있는 키였던 횟수
+    """
+
+    def __init__(self, window: int = 20000):
+        self._lock = threading.Lock()
+        self._seen = {"key": OrderedDict(), "exact": OrderedDict()}
+        self.window = window
+        self.lookups = 0
+        self.repeat = {"key": 0, "exact": 0}
+
+    def _see(self, kind: str, key: str):
+        seen = self._seen[kind]
+        if key in seen:
+            seen.move_to_end(key)
+            self.repeat[kind] += 1
+            return
+        seen[key] = True
+        if len(seen) > self.window:
+            seen.popitem(last=False)
+
+    def observe(self, key: str, exact_key: str):
+        with self._lock:
+            self.lookups += 1
+            self._see("key", key)
+            self._see("exact", exact_key)
+
+    def snapshot(self):
+        with self._lock:
+            n = self.lookups
+            return {
+                "mode": KEY_MODE,
+                "lookups": n,
+                "reuse_rate": self.repeat["key"] / n if n else 0.0,
+                "exact_reuse_rate": self.repeat["exact"] / n if n else 0.0,
+            }
+
+
+key_metrics = KeyMetrics()
+
+
+def extract_json(text: str):
+    if not text:
+        return None
+    m = re.search(r"\{[\s\S]*\}", text)
+    if not m:
+        return None
+    try:
+        return json.loads(m.group(0))
+    except Exception:
+        return None
+
+
+# ---- 스트리밍: 아직 닫히지 않은 JSON에서 지금까지 나온 값만 꺼내기 ----
+def _scan_json(s: str):
+    """
+    s(첫 '{'부터)를 훑어서 (잘라도 되는 위치 목록, 끝 상태) 반환
+    - 자를 위치: ',' 바로 앞 / '{' '[' 바로 뒤 / 값이 끝난 직후 (그 시점의 닫는 괄호 스택과 함께)
+    """
+    stack = []
+    cuts = []
+    in_str = False
+    esc = False
+    for i, ch in enumerate(s):
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+                cuts.append((i + 1, tuple(stack)))
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cuts.append((i + 1, tuple(stack)))
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            cuts.append((i + 1, tuple(stack)))
+            if not stack:
+                return cuts, (i + 1, (), False, False)
+        elif ch == ",":
+            cuts.append((i, tuple(stack)))
+    return cuts, (len(s), tuple(stack), in_str, esc)
+
+
+def partial_json(text: str):
+    """
+    스트리밍 중인 (아직 덜 온) JSON 텍스트 → 지금까지 확정된 부분만 담은 dict (없으면 None)
+    - 열린 문자열 값은 여기까지 온 글자로 닫아서 포함 (설명 문장이 점점 길어지는 효과)
+    - 키 이름이 덜 온 경우 등은 마지막으로 안전한 위치까지 되돌려서 파싱
+    """
+    if not text:
+        return None
+    start = text.find("{")
+    if start < 0:
+        return None
+    s = text[start:]
+    cuts, (end, stack, in_str, esc) = _scan_json(s)
+
+    attempts = []
+    body = s[:end]
+    if in_str:
+        attempts.append(body[:-1] + '"' if esc else body + '"')
+    attempts.append(body)
+    candidates = [a + "".join(reversed(stack)) for a in attempts]
+    candidates += [s[:pos] + "".join(reversed(st)) for pos, st in reversed(cuts)]
+
+    for c in candidates:
+        try:
+            out = json.loads(c)
+        except ValueError:
+            continue
+        if isinstance(out, dict):
+            return out
+    return None
+
+
+def summary_view(partial) -> dict:
+    """
+    (부분) 결과 → 화면에 그릴 수 있는 모양으로 정리: 문자열 summary + {title, desc} 블록 최대 2개
+    """
+    partial = partial if isinstance(partial, dict) else {}
+    one = partial.get("summary_one_line")
+    raw = partial.get("confusion_explain")
+    blocks = []
+    for b in (raw if isinstance(raw, list) else [])[:2]:
+        if isinstance(b, dict):
+            blocks.append({"title": str(b.get("title") or ""), "desc": str(b.get("desc") or "")})
+    return {"summary_one_line": one if isinstance(one, str) else "", "confusion_explain": blocks}
+
+
+def validate_result(parsed):
+    if parsed and isinstance(parsed.get("summary_one_line"), str) and isinstance(parsed.get("confusion_explain"), list):
+        if len(parsed["confusion_explain"]) >= 2:
+            return parsed, None
+        return None, "AI 응답이 너무 짧습니다(설명 블록 부족)."
+    return None, "AI 응답에서 JSON 파싱 실패 (모델이 형식을 어겼습니다)."
+
+
+def _stream_text(client, model_name: str, messages: list, on_partial=None) -> str:
+    """
+    스트리밍 호출 → 전체 텍스트; 화면에 보일 내용이 바뀔 때만 on_partial(view) 호출
+    """
+    parts = []
+    shown = [None]
+
+    def on_delta(delta):
+        parts.append(delta)
+        if on_partial is None:
+            return
+        view = summary_view(partial_json("".join(parts)))
+        if view != shown[0] and (view["summary_one_line"] or view["confusion_explain"]):
+            shown[0] = view
+            on_partial(view)
+
+    return client.chat(messages, model_name, temperature=AI_TEMPERATURE, stream=True, on_delta=on_delta).text
+
+
+def build_messages(
+    symbol: str,
+    holding_type: str,
+    mode_name: str,
+    market_label: str,
+    market_detail: str,
+    live_price: float,
+    day_close: float,
+    avg_price: float,
+    state_name: str,
+    action_text: str,
+    bias_comment: str,
+    gap_comment: str,
+    rr: float,
+    levels: dict,
+    last_row: pd.Series,
+    extra_notes: list,
+):
+    """
+    모델에 보낼 [system, user] 메시지 (스트리밍/일반 호출 공용)
+    """
+
+    compact = {
+        "symbol": symbol,
+        "holding_type": holding_type,
+        "mode": mode_name,
+        "market": {"label": market_label, "detail": market_detail},
+        "price_now": live_price,        # ✅ 상태 전환 기준
+        "price_day_close": day_close,    # ✅ 레벨 계산 기준
+        "avg_price": avg_price,
+        "state": state_name,            # ✅ 상태 머신 결과
+        "action": action_text,          # ✅ 앱이 만든 행동지침(가격조건 포함)
+        "rr_ratio": rr,
+        "levels": levels,
+        "indicators": {
+            "MA20": float(last_row["MA20"]),
+            "BBL": float(last_row["BBL"]),
+            "BBU": float(last_row["BBU"]),
+            "RSI14": float(last_row["RSI14"]),
+            "MACD": float(last_row["MACD"]),
+            "MACD_SIGNAL": float(last_row["MACD_SIGNAL"]),
+            "ATR14": float(last_row["ATR14"]),
+        },
+        "notes": extra_notes[:10],
+        "trend_hint": bias_comment,
+        "gap_hint": gap_comment,
+    }
+
+    system = (
+        "너는 '주식 자동판독기'의 해석 도우미다. "
+        "확정 매수/매도 지시를 하지 말고, "
+        "대신 '가격 기준의 조건부 행동지침'을 아주 직관적으로 정리한다. "
+        "영어/전문용어(MA20, MACD 등)는 가능하면 쓰지 말고, 필요하면 '20일선'처럼 한국어로 짧게만 언급한다. "
+        "반드시 JSON만 출력한다."
+    )
+
+    if holding_type == "보유 중":
+        title2 = "보유자 관점: 지금 유지/축소 판단 포인트"
+        desc2 = "평단/손절선/목표가 기준으로 '지금 어떤 가격에서 무엇을 하면 되는지'를 2~3줄로 정리"
+    else:
+        title2 = "신규진입 관점: 지금 들어가도 되는지 체크"
+        desc2 = "1차/2차 진입가, 진입 실패가(중단), 회복 확인가(재평가 조건)를 가격으로 2~3줄 정리"
+
+    user = (
+        "아래 데이터는 기술적 지표 기반의 요약 데이터다.\n"
+        "반드시 아래 JSON 형태로만 출력해라(키/구조/타입 고정).\n\n"
+        "{\n"
+        "  \"summary_one_line\": \"지금 상태(state) + 현재가(price_now) 기준으로, 딱 한 문장 행동지침(가격조건 포함)\",\n"
+        "  \"confusion_explain\": [\n"
+        "    {\n"
+        "      \"title\": \"지금 가장 안전한 행동(가격 기준)\",\n"
+        "      \"desc\": \"반드시 price_now + 레벨(buy/tp/sl/recover 중 2개 이상)을 직접 숫자로 언급해서, 2~4문장으로 행동지침\"\n"
+        "    },\n"
+        "    {\n"
+        f"      \"title\": \"{title2}\",\n"
+        f"      \"desc\": \"{desc2}. 반드시 숫자 레벨 2개 이상 포함\"\n"
+        "    }\n"
+        "  ]\n"
+        "}\n\n"
+        "제약:\n"
+        "- '지금 사라/팔아라' 같은 확정 지시는 금지.\n"
+        "- 대신 'XX 밑이면 중단/방어', 'YY 위면 확인 후 접근' 같은 조건부 문장으로.\n"
+        "- 한국어 위주. 영어/전문용어는 최소.\n"
+        "- JSON 외 텍스트 출력 금지.\n\n"
+        f"DATA:\n{json.dumps(compact, ensure_ascii=False)}"
+    )
+
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+def ai_summarize_and_explain(
+    symbol: str,
+    holding_type: str,
+    mode_name: str,
+    market_label: str,
+    market_detail: str,
+    live_price: float,
+    day_close: float,
+    avg_price: float,
+    state_name: str,
+    action_text: str,
+    bias_comment: str,
+    gap_comment: str,
+    rr: float,
+    levels: dict,
+    last_row: pd.Series,
+    extra_notes: list,
+    model_name: str = DEFAULT_MODEL,
+    stream: bool = False,
+    on_partial=None,
+):
+    """
+    (결과 dict, 오류 문구) 반환
+    - stream=True: 토큰이 오는 대로 on_partial(부분 결과)를 호출 (summary_one_line → 설명 블록 순서로 채워짐)
+    - 최종 결과는 스트리밍 여부와 관계없이 같은 검증(validate_result)을 거침
+    """
+    api_key = os.getenv("OPENAI_API_KEY", "").strip()
+    if not api_key:
+        return None, "OPENAI_API_KEY 환경변수가 비어 있습니다. Streamlit Cloud → Settings → Secrets에 설정하세요."
+    try:
+        client = get_llm_client(api_key)
+    except LLMUnavailable as e:
+        return None, str(e)
+    messages = build_messages(
+        symbol=symbol,
+        holding_type=holding_type,
+        mode_name=mode_name,
+        market_label=market_label,
+        market_detail=market_detail,
+        live_price=live_price,
+        day_close=day_close,
+        avg_price=avg_price,
+        state_name=state_name,
+        action_text=action_text,
+        bias_comment=bias_comment,
+        gap_comment=gap_comment,
+        rr=rr,
+        levels=levels,
+        last_row=last_row,
+        extra_notes=extra_notes,
+    )
+
+    try:
+        if stream:
+            text = _stream_text(client, model_name, messages, on_partial)
+        else:
+            text = client.chat(messages, model_name, temperature=AI_TEMPERATURE).text
+        return validate_result(extract_json(text))
+    except LLMTimeout as e:
+        return None, str(e)
+    except Exception as e:
+        return None, f"AI 호출 실패: {e}"
+
+
+def interpretation_request(
+    symbol: str,
+    holding_type: str,
+    mode_name: str,
+    avg_price: float,
+    df: pd.DataFrame,
+    price_now: float,
+    pos: dict,
+    market_score: int,
+    market_label: str,
+    market_detail: str,
+):
+    """
+    분석 화면과 같은 입력 → (캐시 키, ai_summarize_and_explain 인자)
+    - df: 지표가 붙은 일봉 / pos: levels.position_view 결과
+    - 분석 화면과 스캐너 일괄 생성이 같은 함수를 써서 같은 키가 나오도록
+    """
+    last = df.iloc[-1]
+    levels = pos["levels"]
+    state_name = pos["state_name"]
+    action_text = pos["action_text"]
+    recover_level = pos["recover_level"]
+    structure_broken = pos["structure_broken"]
+    atr14 = pos["atr14"]
+
+    rr = analysis.calc_rr_ratio(price_now, levels.get("tp1"), levels.get("sl0"))
+    bias_comment = analysis.short_term_bias(last)
+    _, gap_comment = analysis.calc_gap_info(df)
+
+    extra_notes = [
+        f"시장점수: {market_score} / label: {market_label}",
+        f"현재상태: {state_name}",
+        f"행동지침: {action_text}",
+        f"단기흐름(일봉): {bias_comment}",
+        f"갭: {gap_comment}",
+        f"구조붕괴: {structure_broken}",
+    ]
+    if holding_type == "보유 중" and avg_price > 0:
+        extra_notes.append(f"평단 대비(현재가): {(price_now/avg_price-1)*100:+.2f}%")
+    if atr14 is not None:
+        extra_notes.append(f"ATR14: {atr14:.2f}")
+
+    # ✅ 구조 붕괴면 levels도 최소화해서 AI가 헷갈리게 말 못 하게 함
+    levels_for_ai = levels | {"recover": recover_level}
+    if structure_broken:
+        levels_for_ai = {
+            "sl0": levels.get("sl0"),
+            "sl1": levels.get("sl1"),
+            "recover": recover_level,
+        }
+
+    cache_key = make_cache_key(symbol, holding_type, mode_name, avg_price, last, market_label, state_name, price_now, phase=pos["phase"])
+    key_metrics.observe(
+        cache_key,
+        cache_key if KEY_MODE == "exact" else make_cache_key(
+            symbol, holding_type, mode_name, avg_price, last, market_label, state_name, price_now, key_mode="exact",
+        ),
+    )
+    kwargs = dict(
+        symbol=symbol,
+        holding_type=holding_type,
+        mode_name=mode_name,
+        market_label=market_label,
+        market_detail=market_detail,
+        live_price=price_now,
+        day_close=float(last["Close"]),
+        avg_price=avg_price,
+        state_name=state_name,
+        action_text=action_text,
+        bias_comment=bias_comment,
+        gap_comment=gap_comment,
+        rr=rr if (not structure_broken) else None,
+        levels=levels_for_ai,
+        last_row=last,
+        extra_notes=extra_notes,
+    )
+    return cache_key, kwargs
+
+
+def pick_cache_key(live_key: str, stored_key: str, cache) -> str:
+    """
+    스캐너에서 연 종목: 분석 화면이 지금 만든 키 vs 스캔 때 미리 생성한 키 → 쓸 키
+    - 스캔 후 가격 틱/버킷 경계/국면이 바뀌면 키가 달라짐 → 미리 만든 해석이 캐시에 있으면 그 키를 그대로 사용
+    """
+    if stored_key and stored_key != live_key and cache.contains(stored_key):
+        logger.info("스캐너에서 미리 생성한 AI 키 사용 (현재 키와 다름): %s", stored_key)
+        return stored_key
+    return live_key
+
+
+# ---- 즉시 해석 (템플릿, LLM 없이) ----
+# - interpretation_request의 인자(상태/행동지침/레벨)만으로 같은 JSON 모양을 바로 만듦
+# - 화면에 먼저 그려 두고, LLM 답이 오면 교체 (느리거나 실패해도 이 내용은 남음)
+def _p(x):
+    try:
+        x = float(x)
+    except (TypeError, ValueError):
+        return None
+    return f"{x:.2f}" if np.isfinite(x) else None
+
+
+def _join(parts):
+    return " ".join(p for p in parts if p)
+
+
+def _safe_action(phase, price, lv):
+    """
+    phase별 '지금 가장 안전한 행동' 문장 (레벨이 없으면 해당 문장 생략)
+    """
+    bl, bh, tp1 = lv.get("buy_low"), lv.get("buy_high"), lv.get("tp1")
+    sl0, sl1, rec = lv.get("sl0"), lv.get("sl1"), lv.get("recover")
+    band = f"{bl}~{bh}" if bl and bh else None
+    if phase == "structure_broken":
+        return _join([
+            f"현재가({price})가 구조 붕괴선{f' {sl1}' if sl1 else ''} 아래라 기존 매수/목표 가격은 지금 의미가 없습니다.",
+            f"{rec} 위로 돌아오기 전까지는 새로 사거나 늘리지 않고 지켜봅니다." if rec else "회복 확인 전까지는 지켜봅니다.",
+        ])
+    if phase == "fail_soft":
+        return _join([
+            f"현재가({price})가 중단선{f' {sl0}' if sl0 else ''} 아래로 내려와 진입 가설이 흔들린 상태입니다.",
+            f"새로 들어가지 말고 {rec} 위로 다시 올라오는지 먼저 확인합니다." if rec else "새로 들어가지 말고 다시 평가합니다.",
+        ])
+    if phase == "entry_1":
+        return _join([
+            f"현재가({price})는 1차 매수가{f' {bl}' if bl else ''} 근처(또는 아래)입니다.",
+            "한 번에 다 사기보다 나눠서 접근하고,",
+            f"{sl0} 아래로 내려가면 중단합니다." if sl0 else "중단 기준은 따로 정해 둡니다.",
+        ])
+    if phase == "wait_near":
+        return _join([
+            f"현재가({price})는 매수 구간{f'({band})' if band else ''}에 가까워진 상태입니다.",
+            f"{band} 안으로 들어올 때만 나눠서 보고, 그 전에는 기다립니다." if band else "조금 더 내려올 때까지 기다립니다.",
+        ])
+    if phase == "tp_zone":
+        return _join([
+            f"현재가({price})가 1차 목표{f' {tp1}' if tp1 else ''} 근처라 새로 들어가기엔 위쪽입니다.",
+            f"{bh} 근처까지 눌릴 때 다시 봅니다." if bh else "눌림을 확인한 뒤 다시 봅니다.",
+        ])
+    if phase in ("wait_far", "wait"):
+        return _join([
+            f"현재가({price})는 매수 구간{f'({band})' if band else ''}보다 위라 지금은 기다리는 구간입니다.",
+            f"{band}로 내려올 때 나눠서 접근하고, 목표 {tp1}까지 여유가 작으면 추격하지 않습니다." if band and tp1 else "",
+        ])
+    if phase == "hold_def_soft":
+        return _join([
+            f"현재가({price})가 0차 방어선{f' {sl0}' if sl0 else ''} 아래입니다.",
+            f"{rec} 위로 회복하면 유지하고, 다시 밀리면{f' {sl1} 전에' if sl1 else ''} 비중을 줄입니다." if rec else "다시 밀리면 비중을 줄입니다.",
+        ])
+    if phase == "hold_tp":
+        return _join([
+            f"현재가({price})가 1차 목표{f' {tp1}' if tp1 else ''} 근처입니다.",
+            "일부 정리를 고려하고,",
+            f"추가 매수는 {bh} 근처 눌림까지 미룹니다." if bh else "무리한 추가 매수는 피합니다.",
+        ])
+    if phase == "hold_trend":
+        return _join([
+            f"현재가({price})는 추세가 유지되는 자리입니다.",
+            f"{sl0} 위에서는 유지하고," if sl0 else "",
+            f"눌림은 {band}에서 봅니다." if band else "",
+        ])
+    if phase == "hold_amb":
+        return _join([
+            f"현재가({price})는 매수 구간과 방어선 사이의 애매한 자리입니다.",
+            f"{bl} 근처까지는 지켜보고," if bl else "",
+            f"{sl0} 이탈 시 방어합니다." if sl0 else "",
+        ])
+    return None
+
+
+def template_interpretation(request: dict, phase: str = None) -> dict:
+    """
+    interpretation_request의 인자 → ai_summarize_and_explain와 같은 모양의 결과 (LLM 호출 없음)
+    """
+    price = _p(request.get("live_price")) or "-"
+    lv = {k: _p(v) for k, v in (request.get("levels") or {}).items()}
+    state = request.get("state_name") or ""
+    action = (request.get("action_text") or "").strip()
+    held = request.get("holding_type") == "보유 중"
+    rr = request.get("rr")
+
+    one = f"{state} — {action}" if state and action else (action or state)
+
+    first = _safe_action(phase, price, lv) or f"현재가({price}) 기준: {action}"
+
+    if held:
+        title2 = "보유자 관점: 지금 유지/축소 판단 포인트"
+        avg = request.get("avg_price") or 0.0
+        live = request.get("live_price")
+        second = _join([
+            f"평단 {_p(avg)} 대비 {((float(live) / float(avg)) - 1) * 100:+.1f}%." if avg and live else "",
+            f"방어선 {lv['sl0']}" + (f" / 2차 방어 {lv['sl1']}" if lv.get("sl1") else "") + "." if lv.get("sl0") else "",
+            f"1차 목표 {lv['tp1']} 근처에서는 일부 정리를 고려합니다." if lv.get("tp1") else "",
+            f"{lv['recover']} 위 회복 전까지는 늘리지 않습니다." if lv.get("recover") and phase in ("structure_broken", "hold_def_soft") else "",
+        ])
+    else:
+        title2 = "신규진입 관점: 지금 들어가도 되는지 체크"
+        second = _join([
+            f"1차 {lv['buy_low']}~{lv['buy_high']}," if lv.get("buy_low") and lv.get("buy_high") else "",
+            f"중단 {lv['sl0']}," if lv.get("sl0") else "",
+            f"1차 목표 {lv['tp1']}." if lv.get("tp1") else "",
+            f"손익비 {float(rr):.2f}:1." if rr is not None else "",
+            f"회복 확인가 {lv['recover']} 위로 올라오면 다시 계산합니다." if lv.get("recover") else "",
+        ])
+
+    return {
+        "summary_one_line": one,
+        "confusion_explain": [
+            {"title": "지금 가장 안전한 행동(가격 기준)", "desc": first},
+            {"title": title2, "desc": second or "레벨 계산값이 부족해 가격 기준을 더 정리하기 어렵습니다."},
+        ],
+    }
+
+
+def batch_interpret(
+    requests,
+    cache,
+    model_name: str = DEFAULT_MODEL,
+    max_workers: int = BATCH_MAX_WORKERS,
+    rate_per_sec: float = BATCH_RATE_PER_SEC,
+    on_progress=None,
+):
+    """
+    [(캐시 키, 인자)] → 캐시에 없는 것만 동시에 생성해서 cache에 저장
+    - 동시 실행은 max_workers (LLM 클라이언트의 동시 호출 상한도 함께 적용), 시작 간격은 rate_per_sec
+    - on_progress(done, total): 호출한 스레드에서 실행
+    - 반환: {"requested", "cached", "generated", "failed", "errors", "sec"}
+    """
+    t0 = time.perf_counter()
+    requests = list(dict((k, kw) for k, kw in requests if k).items())
+    todo = [(k, kw) for k, kw in requests if not cache.contains(k)]
+    stats = {"requested": len(requests), "cached": len(requests) - len(todo), "generated": 0, "failed": 0, "errors": [], "sec": 0.0}
+    if not todo:
+        return stats
+
+    limiter = RateLimiter(rate_per_sec)
+
+    def _one(item):
+        key, kwargs = item
+        limiter.wait()
+        parsed, err = ai_summarize_and_explain(**kwargs, model_name=model_name)
+        if parsed:
+            cache.set(key, parsed, model=model_name)
+        return kwargs["symbol"], parsed is not None, err
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo)))) as ex:
+        futures = [ex.submit(_one, item) for item in todo]
+        for fut in as_completed(futures):
+            sym, ok, err = fut.result()
+            done += 1
+            if ok:
+                stats["generated"] += 1
+            else:
+                stats["failed"] += 1
+                stats["errors"].append(f"{sym}: {err}")
+            if on_progress is not None:
+                on_progress(done, len(todo))
+    stats["sec"] = time.perf_counter() - t0
+    return stats
+
+
+def replay_key_reuse(
+    df: pd.DataFrame,
+    live_prices,
+    cfg: dict,
+    holding_type: str = "신규 진입 검토",
+    symbol: str = "",
+    market_label: str = "",
+    buckets: dict = None,
+):
+    """
+    지표가 붙은 일봉 + 시외 포함 최근가 흐름(예: 1분봉 종가) → 키 모드별 재사용률 비교
+    - 가격이 바뀔 때마다 분석 화면을 다시 연다고 가정 (상태 판정도 가격마다 다시)
+    """
+    last = df.iloc[-1]
+    keys = {"exact": [], "semantic": []}
+    for price in live_prices:
+        price = float(price)
+        pos = position_view(df, last, cfg, holding_type, price, 0.0)
+        for mode in keys:
+            keys[mode].append(make_cache_key(
+                symbol, holding_type, cfg["name"], 0.0, last, market_label, pos["state_name"], price,
+                phase=pos["phase"], key_mode=mode, buckets=buckets,
+            ))
+    n = len(keys["exact"])
+    out = {"ticks": n}
+    for mode, ks in keys.items():
+        distinct = len(set(ks))
+        out[f"{mode}_keys"] = distinct
+        out[f"{mode}_reuse_rate"] = (n - distinct) / n if n else 0.0
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app_core.levels import get_mode_config
+    from app_core.providers import get_default_provider
+    from app_core.store import PriceStore
+
+    parser = argparse.ArgumentParser(description="AI 캐시 키 모드별 재사용률 (최근 1분봉 가격 흐름 재생)")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--mode", default="스윙", help="단타 / 스윙 / 장기")
+    parser.add_argument("--holding", default="신규 진입 검토")
+    parser.add_argument("--bucket", action="append", default=[], metavar="NAME=VALUE", help="예: price_atr_frac=0.2")
+    args = parser.parse_args()
+
+    cfg = get_mode_config(args.mode)
+    buckets = {k.strip(): float(v) for k, v in (b.split("=", 1) for b in args.bucket)}
+    store = PriceStore()
+    provider = get_default_provider()
+    for sym in args.symbols:
+        sym = sym.upper()
+        daily = store.get_daily(sym, cfg["period"])
+        daily = analysis.add_indicators(daily) if not daily.empty else daily
+        ticks = provider.intraday_bars(sym, period="2d", interval="1m", prepost=True)
+        if daily.empty or ticks.empty:
+            print(f"{sym}: 데이터 없음")
+            continue
+        r = replay_key_reuse(daily, ticks["Close"].dropna().to_numpy(), cfg, args.holding, symbol=sym, buckets=buckets)
+        print(
+            f"{sym}: {r['ticks']}틱 · exact 키 {r['exact_keys']}개 (재사용 {r['exact_reuse_rate']:.0%})"
+            f" · semantic 키 {r['semantic_keys']}개 (재사용 {r['semantic_reuse_rate']:.0%})"
+        )
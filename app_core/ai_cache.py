@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app_core.store import DEFAULT_STORE_DIR
+
+# =====================================
+# AI 해석 영구 캐시 (SQLite 파일 1개, 모든 세션/프로세스 공유)
+# - 키: _ai_make_cache_key (종목·모드·상태·가격·지표를 해시한 값)
+# - TTL 지나면 miss, 항목 수 상한을 넘으면 마지막 사용 시각이 오래된 것부터 방출(LRU)
+# - 새로고침/다른 사용자도 같은 요청이면 LLM 호출 없이 바로 반환
+# =====================================
+DEFAULT_AI_CACHE_PATH = os.getenv("CHAN_AI_CACHE_PATH", os.path.join(DEFAULT_STORE_DIR, "ai_cache.sqlite3"))
+DEFAULT_AI_TTL = float(os.getenv("CHAN_AI_CACHE_TTL", 12 * 3600))
+DEFAULT_AI_MAX_ENTRIES = int(os.getenv("CHAN_AI_CACHE_MAX_ENTRIES", 5000))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    model TEXT,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ai_cache_last_access ON ai_cache (last_access);
+"""
+
+
+class PersistentAICache:
+    """
+    get/set/invalidate/stats는 스레드 안전 (연결은 스레드마다 하나)
+    - 값은 JSON 직렬화 가능한 dict (AI가 돌려준 파싱 결과)
+    - hits/misses/evictions는 이 프로세스 기준, entries/bytes는 파일 기준
+    """
+
+    def __init__(self, path: str = DEFAULT_AI_CACHE_PATH, ttl: float = DEFAULT_AI_TTL, max_entries: int = DEFAULT_AI_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            if self.path != ":memory:":
+                # 여러 프로세스(앱 여러 개)가 읽는 동안에도 쓰기 가능
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, attr: str, n: int = 1):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + n)
+
+    def get(self, key: str):
+        """
+        값 또는 None (만료/없음/깨진 값은 None)
+        """
+        if not key:
+            return None
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at FROM ai_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        value, expires_at = row
+        if expires_at < now:
+            conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+        try:
+            out = json.loads(value)
+        except ValueError:
+            conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+        conn.execute("UPDATE ai_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        self._count("hits")
+        return out
+
+    def contains(self, key: str) -> bool:
+        """
+        hit/miss 통계에 넣지 않는 존재 확인 (버튼 문구 등)
+        """
+        if not key:
+            return False
+        row = self._conn().execute(
+            "SELECT 1 FROM ai_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def set(self, key: str, value, model: str = None, ttl: float = None):
+        if not key or value is None:
+            return
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        text = json.dumps(value, ensure_ascii=False)
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO ai_cache (key, value, model, created_at, expires_at, last_access, hits) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (key, text, model, now, now + ttl, now),
+        )
+        self._evict(conn, now)
+
+    def _evict(self, conn, now: float):
+        cur = conn.execute("DELETE FROM ai_cache WHERE expires_at < ?", (now,))
+        expired = cur.rowcount
+        (n,) = conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()
+        over = n - self.max_entries
+        lru = 0
+        if over > 0:
+            cur = conn.execute(
+                "DELETE FROM ai_cache WHERE key IN (SELECT key FROM ai_cache ORDER BY last_access LIMIT ?)",
+                (over,),
+            )
+            lru = cur.rowcount
+        if expired or lru:
+            self._count("evictions", max(expired, 0) + max(lru, 0))
+
+    def invalidate(self, key: str = None) -> int:
+        """
+        key 하나 (없으면 전체) 삭제 → 삭제 건수
+        """
+        conn = self._conn()
+        if key is None:
+            cur = conn.execute("DELETE FROM ai_cache")
+        else:
+            cur = conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+        return cur.rowcount
+
+    def stats(self):
+        n, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM ai_cache").fetchone()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": n,
+                "bytes": size,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_default_cache = None
+_default_guard = threading.Lock()
+
+
+def get_ai_cache() -> PersistentAICache:
+    """
+    프로세스 공용 인스턴스 (첫 호출 때 파일 생성)
+    """
+    global _default_cache
+    with _default_guard:
+        if _default_cache is None:
+            _default_cache = PersistentAICache()
+        return _default_cache
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI 해석 영구 캐시 상태 확인/비우기")
+    parser.add_argument("--path", default=DEFAULT_AI_CACHE_PATH)
+    parser.add_argument("--clear", action="store_true", help="전체 삭제")
+    args = parser.parse_args()
+
+    cache = PersistentAICache(args.path)
+    if args.clear:
+        print(f"deleted {cache.invalidate()} entries")
+    print(json.dumps(cache.stats(), ensure_ascii=False, indent=2))
@@ -75,6 +75,20 @@ def calc_rr_ratio(price, tp, sl):
     return reward / risk
 
 
+BIAS_UP = "단기 상방 우세 (며칠 내 상승 압력이 상대적으로 큼)"
+BIAS_DOWN = "단기 하방 우세 (며칠 내 조정/하락 압력이 큼)"
+BIAS_NEUTRAL = "단기 중립~혼조 (방향성이 뚜렷하지 않음)"
+
+
+def bias_label(score):
+    if score >= 3:
+        return BIAS_UP
+    elif score <= -3:
+        return BIAS_DOWN
+    else:
+        return BIAS_NEUTRAL
+
+
 def short_term_bias(last_row):
     price = float(last_row["Close"])
     ma5 = float(last_row["MA5"])
@@ -96,12 +110,7 @@ def short_term_bias(last_row):
     if k > d and k > 50: score += 1
     elif k < d and k < 50: score -= 1
 
-    if score >= 3:
-        return "단기 상방 우세 (며칠 내 상승 압력이 상대적으로 큼)"
-    elif score <= -3:
-        return "단기 하방 우세 (며칠 내 조정/하락 압력이 큼)"
-    else:
-        return "단기 중립~혼조 (방향성이 뚜렷하지 않음)"
+    return bias_label(score)
 
 
 def get_volume_profile(df: pd.DataFrame, bins: int = 5):
@@ -139,6 +148,25 @@ def get_heavy_days(df: pd.DataFrame, n: int = 3):
     return res
 
 
+def resample_regular_5m(df_1m: pd.DataFrame):
+    """
+    프리/애프터 포함 1분봉 → 정규장(09:30~16:00, 거래소 시간) 5분봉
+    """
+    if df_1m.empty:
+        return df_1m
+    regular = df_1m.between_time("09:30", "15:59")
+    if regular.empty:
+        return regular
+    df_5m = regular.resample("5min").agg({
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+        "Volume": "sum",
+    })
+    return df_5m.dropna(subset=["Close"])
+
+
 def get_intraday_5m_score(df_5m: pd.DataFrame):
     if df_5m.empty:
         return None, "5분봉 데이터 부족"
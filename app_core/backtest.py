@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+
+from app_core.levels import level_param
+from app_core.panel import _rolling, add_indicators_panel, valid_mask
+
+# =====================================
+# 상태 머신 백테스트 (compute_state_and_action + calc_levels를 과거 전체 일자에 재생)
+# - 지표는 패널로 종목당 한 번만 계산 (지표가 모두 과거 봉만 쓰므로 t일 값 = t일까지의 이력으로 계산한 값)
+# - 레벨/국면은 (T, N) 배열 연산으로 모든 날짜를 한 번에 → 날짜마다 add_indicators를 다시 돌리지 않음
+# =====================================
+HOLDING_NEW = "신규 진입 검토"
+HOLDING_HELD = "보유 중"
+
+PHASES = [
+    "structure_broken", "fail_soft", "entry_1", "wait_near", "tp_zone", "wait_far", "wait",
+    "hold_def_soft", "hold_tp", "hold_trend", "hold_amb", "hold",
+]
+NO_PHASE = -1
+
+TARGETS = ["tp0", "tp1", "tp2"]
+STOPS = ["sl0", "sl1"]
+
+
+def level_arrays(panel: dict, cfg: dict, holding_type: str = HOLDING_NEW):
+    """
+    calc_levels (+ 앱의 신규 진입 ATR 손절 보정) 을 모든 날짜에 대해 (T, N) 배열로
+    - 반환 dict: buy_low, buy_high, tp0, tp1, tp2, sl0, sl1, recover_level, ready(레벨 계산 가능 여부)
+    """
+    close = panel["Close"]
+    high = panel["High"]
+    low = panel["Low"]
+    ma20 = panel["MA20"]
+    bbl = panel["BBL"]
+    bbu = panel["BBU"]
+    rsi = panel["RSI14"]
+    atr = panel["ATR14"]
+    ls, ll = cfg["lookback_short"], cfg["lookback_long"]
+
+    valid = valid_mask(panel)
+    # df.tail(lookback)이 유효 봉으로 꽉 찬 날만 (초기 구간 제외)
+    ready = valid & (_rolling(valid.astype(float), max(ls, ll), "min") == 1.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        above = close > ma20
+        buy_low = np.where(above, ma20 * 0.98, bbl * 0.98)
+        buy_high = np.where(above, ma20 * 1.01, bbl * 1.02)
+
+        # calc_trend_targets
+        swing_high = _rolling(high, ls, "max")
+        box_high = _rolling(high, ll, "max")
+        base_res = np.maximum(swing_high * level_param(cfg, "res_swing_mult"), box_high * level_param(cfg, "res_box_mult"))
+        base_res = np.where(np.isnan(bbu), base_res, np.maximum(base_res, bbu * level_param(cfg, "res_bbu_mult")))
+        tp1 = np.where(base_res <= close, close * level_param(cfg, "breakout_mult"), base_res)
+        hot = rsi > 70
+        tp0 = close + (tp1 - close) * np.where(hot, 0.5, level_param(cfg, "tp0_frac"))
+        tp2 = tp1 + (tp1 - close) * np.where(hot, 0.4, level_param(cfg, "tp2_ext"))
+
+        # calc_trend_stops: 후보 중 최댓값 (후보가 없으면 박스 하단 기준)
+        swing_low = _rolling(low, ls, "min")
+        box_low = _rolling(low, ll, "min")
+        atr_ok = ~np.isnan(atr) & (atr > 0)
+        atr_stop = close - cfg["atr_mult"] * atr
+        cands = np.stack([
+            np.where(swing_low < close, swing_low * level_param(cfg, "sl_swing_mult"), -np.inf),
+            np.where(ma20 < close, ma20 * level_param(cfg, "sl_ma20_mult"), -np.inf),
+            np.where(box_low < close, box_low * level_param(cfg, "sl_box_mult"), -np.inf),
+            np.where(atr_ok & (atr_stop < close), atr_stop, -np.inf),
+        ])
+        best = cands.max(axis=0)
+        has_cand = np.isfinite(best)
+        sl0 = np.where(has_cand, best, box_low * 0.985)
+        deep_mult = level_param(cfg, "sl1_deep_mult")
+        deep = np.minimum(box_low * deep_mult, swing_low * deep_mult)
+        sl1 = np.where(has_cand, np.minimum(sl0 * level_param(cfg, "sl1_ratio"), deep), box_low * 0.96)
+
+        if holding_type != HOLDING_HELD:
+            sl0 = np.where(atr_ok, np.maximum(0.01, buy_low - 1.0 * atr), buy_low * 0.97)
+            sl1 = np.where(atr_ok, np.maximum(0.01, buy_low - 1.8 * atr), buy_low * 0.94)
+
+        recover_level = np.fmax(buy_high * 1.005, ma20 * 1.01)
+
+    return {
+        "buy_low": buy_low, "buy_high": buy_high,
+        "tp0": tp0, "tp1": tp1, "tp2": tp2,
+        "sl0": sl0, "sl1": sl1,
+        "recover_level": recover_level,
+        "ready": ready,
+    }
+
+
+def phase_codes(price, levels: dict, holding_type: str = HOLDING_NEW):
+    """
+    compute_state_and_action의 phase 판정을 배열로 (조건 순서 그대로) → PHASES 인덱스, 판정 불가 NO_PHASE
+    """
+    code = {p: i for i, p in enumerate(PHASES)}
+    with np.errstate(invalid="ignore"):
+        broken = price < levels["sl1"] * 0.998
+        below_sl0 = price < levels["sl0"] * 0.998
+        if holding_type != HOLDING_HELD:
+            conds = [
+                broken,
+                below_sl0,
+                price <= levels["buy_low"] * 1.005,
+                price <= levels["buy_high"] * 1.01,
+                price >= levels["tp1"] * 0.98,
+            ]
+            names = ["structure_broken", "fail_soft", "entry_1", "wait_near", "tp_zone"]
+            default = code["wait_far"]
+        else:
+            conds = [
+                broken,
+                below_sl0,
+                price >= levels["tp1"] * 0.98,
+                price >= levels["buy_low"] * 1.02,
+            ]
+            names = ["structure_broken", "hold_def_soft", "hold_tp", "hold_trend"]
+            default = code["hold_amb"]
+    out = np.select(conds, [code[n] for n in names], default=default)
+    return np.where(levels["ready"], out, NO_PHASE)
+
+
+def _first_hit(path, level, direction: str):
+    """
+    path: (H, E) 이후 H일 고가/저가, level: (E,) → 처음 닿은 날(1..H), 없으면 H+1
+    """
+    H = path.shape[0]
+    with np.errstate(invalid="ignore"):
+        hit = path >= level if direction == "up" else path <= level
+    first = np.argmax(hit, axis=0) + 1
+    return np.where(hit.any(axis=0), first, H + 1)
+
+
+def _forward_window(arr, t_idx, n_idx, horizon: int):
+    # (H, E): 이벤트마다 t+1 ~ t+horizon (배열 끝을 넘으면 NaN)
+    T = arr.shape[0]
+    steps = t_idx[None, :] + np.arange(1, horizon + 1)[:, None]
+    inside = steps < T
+    out = np.full(steps.shape, np.nan)
+    out[inside] = arr[steps[inside], np.broadcast_to(n_idx, steps.shape)[inside]]
+    return out
+
+
+def run_backtest(
+    frames: dict,
+    cfg: dict,
+    holding_type: str = HOLDING_NEW,
+    entry_phase: str = "entry_1",
+    horizon: int = 20,
+    hold_days=(1, 5, 10, 20),
+):
+    """
+    {symbol: OHLCV DataFrame} (수년치 일봉) → 백테스트 요약 dict
+    - phase_stats: 국면별 일수 + 그 날 종가 기준 hold_days 후 수익률(평균/중앙값/승률)
+    - transitions: 전날 국면 → 오늘 국면 횟수 (행=from, 열=to, 같은 국면 유지는 대각선)
+    - hits: entry_phase에 '새로 진입한 날' 종가로 들어갔다고 보고, 그날 레벨 기준
+            horizon일 안에 tp0/tp1/tp2·sl0/sl1에 닿은 비율 + 손절보다 목표에 먼저 닿은 비율
+    - returns: 같은 진입 이벤트의 hold_days 보유 수익률
+    """
+    return backtest_panel(add_indicators_panel(frames), cfg, holding_type, entry_phase, horizon, hold_days)
+
+
+def backtest_panel(
+    panel: dict,
+    cfg: dict,
+    holding_type: str = HOLDING_NEW,
+    entry_phase: str = "entry_1",
+    horizon: int = 20,
+    hold_days=(1, 5, 10, 20),
+):
+    """
+    run_backtest의 본체 (지표가 계산된 panel을 받음 → 여러 cfg가 같은 panel을 공유)
+    """
+    if not panel["symbols"]:
+        return {"symbols": [], "events": 0, "phase_stats": pd.DataFrame(), "transitions": pd.DataFrame(),
+                "hits": pd.DataFrame(), "returns": pd.DataFrame()}
+
+    close = panel["Close"]
+    levels = level_arrays(panel, cfg, holding_type)
+    phases = phase_codes(close, levels, holding_type)
+    T, N = close.shape
+    used = [p for p in PHASES if (phases == PHASES.index(p)).any()]
+
+    # 국면별 보유 수익률
+    fwd = {}
+    for h in hold_days:
+        shifted = np.full_like(close, np.nan)
+        if h < T:
+            shifted[:-h] = close[h:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fwd[h] = shifted / close - 1
+    rows = []
+    for p in used:
+        m = phases == PHASES.index(p)
+        row = {"phase": p, "days": int(m.sum())}
+        for h in hold_days:
+            r = fwd[h][m]
+            r = r[~np.isnan(r)]
+            row[f"ret{h}d_mean"] = float(r.mean()) if r.size else np.nan
+            row[f"ret{h}d_median"] = float(np.median(r)) if r.size else np.nan
+            row[f"win{h}d"] = float((r > 0).mean()) if r.size else np.nan
+        rows.append(row)
+    phase_stats = pd.DataFrame(rows).set_index("phase") if rows else pd.DataFrame()
+
+    # 국면 전환 (둘 다 판정된 연속 이틀만)
+    prev, cur = phases[:-1], phases[1:]
+    both = (prev != NO_PHASE) & (cur != NO_PHASE)
+    K = len(PHASES)
+    counts = np.bincount(prev[both] * K + cur[both], minlength=K * K).reshape(K, K)
+    idx = [PHASES.index(p) for p in used]
+    transitions = pd.DataFrame(counts[np.ix_(idx, idx)], index=used, columns=used)
+
+    # 진입 이벤트: entry_phase로 새로 바뀐 날
+    target = PHASES.index(entry_phase)
+    start = np.zeros_like(phases, dtype=bool)
+    start[1:] = (phases[1:] == target) & (phases[:-1] != target) & (phases[:-1] != NO_PHASE)
+    t_idx, n_idx = np.nonzero(start)
+    events = len(t_idx)
+
+    hits = pd.DataFrame()
+    returns = pd.DataFrame()
+    if events:
+        high_path = _forward_window(panel["High"], t_idx, n_idx, horizon)
+        low_path = _forward_window(panel["Low"], t_idx, n_idx, horizon)
+        first = {}
+        for name in TARGETS:
+            first[name] = _first_hit(high_path, levels[name][t_idx, n_idx], "up")
+        for name in STOPS:
+            first[name] = _first_hit(low_path, levels[name][t_idx, n_idx], "down")
+        hit_rows = []
+        for name in TARGETS + STOPS:
+            row = {"level": name, "hit_rate": float((first[name] <= horizon).mean())}
+            if name in TARGETS:
+                # 같은 날 목표/손절 모두 닿으면 손절 먼저로 (보수적)
+                row["before_sl0"] = float(((first[name] <= horizon) & (first[name] < first["sl0"])).mean())
+                row["before_sl1"] = float(((first[name] <= horizon) & (first[name] < first["sl1"])).mean())
+            row["avg_days"] = float(first[name][first[name] <= horizon].mean()) if (first[name] <= horizon).any() else np.nan
+            hit_rows.append(row)
+        hits = pd.DataFrame(hit_rows).set_index("level")
+
+        ret_rows = []
+        for h in hold_days:
+            r = fwd[h][t_idx, n_idx]
+            r = r[~np.isnan(r)]
+            ret_rows.append({
+                "days": h,
+                "n": int(r.size),
+                "mean": float(r.mean()) if r.size else np.nan,
+                "median": float(np.median(r)) if r.size else np.nan,
+                "win_rate": float((r > 0).mean()) if r.size else np.nan,
+            })
+        returns = pd.DataFrame(ret_rows).set_index("days")
+
+    return {
+        "symbols": panel["symbols"],
+        "mode": cfg["name"],
+        "holding_type": holding_type,
+        "entry_phase": entry_phase,
+        "horizon": horizon,
+        "events": events,
+        "phase_stats": phase_stats,
+        "transitions": transitions,
+        "hits": hits,
+        "returns": returns,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app_core.levels import get_mode_config
+    from app_core.store import PriceStore
+    from app_core.universe import load_universe
+
+    parser = argparse.ArgumentParser(description="상태 머신(compute_state_and_action) 과거 재생 백테스트")
+    parser.add_argument("symbols", nargs="+", help="티커 또는 @유니버스이름 (예: @popular)")
+    parser.add_argument("--mode", default="스윙", help="단타 / 스윙 / 장기")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--holding", default=HOLDING_NEW, choices=[HOLDING_NEW, HOLDING_HELD])
+    parser.add_argument("--entry-phase", default="entry_1", choices=PHASES)
+    parser.add_argument("--horizon", type=int, default=20)
+    args = parser.parse_args()
+
+    syms = []
+    for s in args.symbols:
+        syms += load_universe(s[1:]) if s.startswith("@") else [s.upper()]
+    frames = PriceStore().get_daily_many(syms, args.period)
+    report = run_backtest(
+        frames, get_mode_config(args.mode),
+        holding_type=args.holding, entry_phase=args.entry_phase, horizon=args.horizon,
+    )
+
+    pd.set_option("display.width", 200)
+    print(f"{len(report['symbols'])} symbols · {report['mode']} · {report['holding_type']} · events({report['entry_phase']}): {report['events']}")
+    for key in ("phase_stats", "transitions", "hits", "returns"):
+        print(f"\n[{key}]")
+        print(report[key].round(4).to_string() if not report[key].empty else "(없음)")
@@ -0,0 +1,248 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# =====================================
+# 프로세스 공용 TTL + LRU 캐시 (모든 Streamlit 세션이 공유)
+# =====================================
+DEFAULT_TTLS = {
+    "daily": 300.0,       # 일봉: 마지막 봉만 바뀌므로 5분
+    "intraday": 30.0,     # 1분봉 스냅샷 (5분봉 점수 + 시외 포함 최근가 공용)
+    "fx": 600.0,          # 환율
+    "last_indicators": 86400.0,  # 스캐너 1단계 사전필터용 마지막 지표값
+    "scan_results": 86400.0,     # 스캐너 종목×모드별 (데이터 지문, 판정 결과) – 증분 재스캔
+    "market_history": 3600.0,    # 시장 판독 히스토리 (일봉 종가 기준이라 1시간)
+}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _estimate_size(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    return sys.getsizeof(value)
+
+
+def _copy_out(value):
+    # add_indicators 등이 DataFrame을 제자리 수정하므로 캐시 원본은 보호
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return value
+
+
+class TTLCache:
+    """
+    namespace(데이터 종류)별 TTL + 전체 메모리 상한(LRU 방출).
+    - get/set/invalidate는 스레드 안전
+    - 빈 DataFrame/None은 저장하지 않음 (일시적 조회 실패를 오래 붙잡지 않도록)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttls: dict = None):
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _drop(self, full_key):
+        _, _, size = self._data.pop(full_key)
+        self._bytes -= size
+
+    def get(self, namespace: str, key):
+        """
+        (hit 여부, 값) 반환
+        """
+        full_key = (namespace, key)
+        with self._lock:
+            entry = self._data.get(full_key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, expires_at, _ = entry
+            if expires_at < time.monotonic():
+                self._drop(full_key)
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(full_key)
+            self.hits += 1
+        return True, _copy_out(value)
+
+    def set(self, namespace: str, key, value, ttl: float = None):
+        if value is None or (isinstance(value, pd.DataFrame) and value.empty):
+            return
+        ttl = self.ttls.get(namespace, 60.0) if ttl is None else ttl
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        full_key = (namespace, key)
+        with self._lock:
+            if full_key in self._data:
+                self._drop(full_key)
+            self._data[full_key] = (_copy_out(value), time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str = None, key=None):
+        """
+        namespace/key 지정 범위만 삭제 (둘 다 없으면 전체)
+        - key가 tuple이 아니면 그 값으로 시작하는 키(보통 symbol)를 모두 삭제
+        """
+        with self._lock:
+            targets = []
+            for ns, k in self._data:
+                if namespace is not None and ns != namespace:
+                    continue
+                if key is not None:
+                    if k != key and not (isinstance(k, tuple) and k and k[0] == key):
+                        continue
+                targets.append((ns, k))
+            for full_key in targets:
+                self._drop(full_key)
+            return len(targets)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def cached(self, namespace: str, ttl: float = None):
+        """
+        함수 인자(위치 인자 tuple)를 키로 쓰는 데코레이터
+        """
+
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args):
+                hit, value = self.get(namespace, args)
+                if hit:
+                    return value
+                value = fn(*args)
+                self.set(namespace, args, value, ttl=ttl)
+                return value
+
+            def invalidate(*args):
+                if not args:
+                    return self.invalidate(namespace)
+                return self.invalidate(namespace, args[0] if len(args) == 1 else args)
+
+            wrapper.invalidate = invalidate
+            return wrapper
+
+        return deco
+
+
+shared_cache = TTLCache()
+
+
+# =====================================
+# stale-while-revalidate 스냅샷 (마지막 정상값 즉시 반환 + 백그라운드 갱신)
+# =====================================
+class StaleWhileRevalidate:
+    """
+    loader() 결과를 1개 보관.
+    - get(): 값이 있으면 나이와 상관없이 즉시 반환, max_age 초과 시 백그라운드 갱신 시작
+    - 값이 한 번도 없을 때만 호출 스레드에서 직접 로드 (동시 호출은 1번만 로드)
+    - 백그라운드 로드 실패(예외 또는 is_valid(값)이 False) 시 기존 값 유지, last_error에 기록
+    - 첫 로드가 is_valid를 통과하지 못하면 그 값이라도 보관 (호출마다 동기 로드를 반복하지 않도록) → 다음 갱신에서 교체
+    """
+
+    def __init__(self, loader, max_age: float = 60.0, is_valid=None):
+        self.loader = loader
+        self.max_age = max_age
+        self.is_valid = is_valid
+        self._value = None
+        self._fetched_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.last_error = None
+
+    def _load_locked(self):
+        try:
+            value = self.loader()
+        except Exception as e:
+            self.last_error = e
+            return
+        if self.is_valid is not None and not self.is_valid(value):
+            with self._lock:
+                self.last_error = ValueError("loader 결과가 유효하지 않음 → 이전 값 유지")
+                if self._fetched_at is not None:
+                    return
+                self._value = value
+                self._fetched_at = time.time()
+            return
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.time()
+            self.last_error = None
+
+    def _load(self):
+        with self._load_lock:
+            self._load_locked()
+
+    def _run_refresh(self):
+        try:
+            self._load()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._run_refresh, name="swr-refresh", daemon=True).start()
+        return True
+
+    def get(self):
+        """
+        (값, 받아온 시각(epoch)) 반환
+        """
+        with self._lock:
+            value, fetched_at = self._value, self._fetched_at
+        if fetched_at is None:
+            with self._load_lock:
+                with self._lock:
+                    value, fetched_at = self._value, self._fetched_at
+                if fetched_at is None:
+                    self._load_locked()
+                    with self._lock:
+                        value, fetched_at = self._value, self._fetched_at
+            return value, fetched_at
+        if time.time() - fetched_at > self.max_age:
+            self.refresh_async()
+        return value, fetched_at
+
+    @property
+    def refreshing(self) -> bool:
+        with self._lock:
+            return self._refreshing
+
+    def age(self):
+        with self._lock:
+            if self._fetched_at is None:
+                return None
+            return time.time() - self._fetched_at
@@ -0,0 +1,240 @@
+import copy
+import math
+from collections import deque
+
+import pandas as pd
+
+# =====================================
+# 증분(스트리밍) 지표 엔진
+# - analysis.add_indicators와 같은 컬럼/정의를 봉 1개당 O(1)로 갱신
+# =====================================
+INDICATOR_COLUMNS = [
+    "MA5", "MA20", "BBL", "BBU", "MACD", "MACD_SIGNAL",
+    "STOCH_K", "STOCH_D", "RSI14", "MA50", "ATR14",
+]
+
+NAN = float("nan")
+
+
+class _RollingSum:
+    """
+    고정 창 이동 합/제곱합 (부동소수 누적 오차는 주기적으로 재계산해서 제거)
+    """
+
+    RESYNC_EVERY = 1000
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._since_resync = 0
+
+    def push(self, x: float):
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        self._since_resync += 1
+        if self._since_resync >= self.RESYNC_EVERY:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+            self._since_resync = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        return self.total / self.window if self.full else NAN
+
+    def std(self) -> float:
+        # pandas rolling().std()와 같은 표본표준편차(ddof=1)
+        if not self.full:
+            return NAN
+        n = self.window
+        var = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class _RollingExtreme:
+    """
+    단조 deque로 최근 window개 최소/최대
+    """
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = window
+        self.is_max = is_max
+        self.items = deque()
+        self.count = 0
+
+    def push(self, x: float):
+        i = self.count
+        self.count += 1
+        if self.is_max:
+            while self.items and self.items[-1][1] <= x:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] >= x:
+                self.items.pop()
+        self.items.append((i, x))
+        while self.items[0][0] <= i - self.window:
+            self.items.popleft()
+
+    def value(self) -> float:
+        return self.items[0][1] if self.count >= self.window else NAN
+
+
+class _Ema:
+    # pandas ewm(adjust=False)와 동일: 첫 유효값으로 시작
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value = NAN
+
+    def push(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class IndicatorEngine:
+    """
+    과거 일봉으로 seed한 뒤 새 봉마다 update(bar) → 지표 dict.
+    - peek(bar): 상태를 바꾸지 않고 미완성 봉(장중 가격)의 지표만 계산
+    - 초기 구간(창이 덜 찬 구간)은 add_indicators처럼 NaN
+    """
+
+    def __init__(self):
+        self.ma5 = _RollingSum(5)
+        self.ma20 = _RollingSum(20)
+        self.ma50 = _RollingSum(50)
+        self.ema12 = _Ema(2 / (12 + 1))
+        self.ema26 = _Ema(2 / (26 + 1))
+        self.macd_signal = _Ema(2 / (9 + 1))
+        self.low14 = _RollingExtreme(14, is_max=False)
+        self.high14 = _RollingExtreme(14, is_max=True)
+        self.stoch_k = _RollingSum(3)
+        self.rsi_up = _Ema(1 / 14)
+        self.rsi_down = _Ema(1 / 14)
+        self.tr14 = _RollingSum(14)
+        self.prev_close = None
+        self.n_bars = 0
+        self.last = None
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame):
+        eng = cls()
+        eng.seed(df)
+        return eng
+
+    def seed(self, df: pd.DataFrame):
+        for o, h, l, c, v in zip(df["Open"], df["High"], df["Low"], df["Close"], df["Volume"]):
+            self.update({"Open": o, "High": h, "Low": l, "Close": c, "Volume": v})
+        return self
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def peek(self, bar: dict) -> dict:
+        return self.copy().update(bar)
+
+    def update(self, bar: dict) -> dict:
+        close = float(bar["Close"])
+        high = float(bar["High"])
+        low = float(bar["Low"])
+
+        self.ma5.push(close)
+        self.ma20.push(close)
+        self.ma50.push(close)
+
+        ma20 = self.ma20.mean()
+        std20 = self.ma20.std()
+
+        macd = self.ema12.push(close) - self.ema26.push(close)
+        macd_signal = self.macd_signal.push(macd)
+
+        self.low14.push(low)
+        self.high14.push(high)
+        low14 = self.low14.value()
+        high14 = self.high14.value()
+        if math.isnan(low14) or high14 == low14:
+            stoch_k = NAN
+        else:
+            stoch_k = (close - low14) / (high14 - low14) * 100
+        if math.isnan(stoch_k):
+            # rolling(3).mean()은 창 안에 NaN이 있으면 NaN
+            self.stoch_k = _RollingSum(3)
+            stoch_d = NAN
+        else:
+            self.stoch_k.push(stoch_k)
+            stoch_d = self.stoch_k.mean()
+
+        if self.prev_close is None:
+            up = down = NAN
+            tr = high - low
+        else:
+            delta = close - self.prev_close
+            up = self.rsi_up.push(max(delta, 0.0))
+            down = self.rsi_down.push(max(-delta, 0.0))
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        if math.isnan(up) or math.isnan(down) or (up == 0 and down == 0):
+            rsi = NAN
+        elif down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + up / down))
+
+        self.tr14.push(tr)
+        self.prev_close = close
+        self.n_bars += 1
+
+        row = {
+            "Open": float(bar["Open"]),
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": float(bar["Volume"]),
+            "MA5": self.ma5.mean(),
+            "MA20": ma20,
+            "BBL": ma20 - 2 * std20,
+            "BBU": ma20 + 2 * std20,
+            "MACD": macd,
+            "MACD_SIGNAL": macd_signal,
+            "STOCH_K": stoch_k,
+            "STOCH_D": stoch_d,
+            "RSI14": rsi,
+            "MA50": self.ma50.mean(),
+            "ATR14": self.tr14.mean(),
+        }
+        self.last = row
+        return row
+
+    @property
+    def ready(self) -> bool:
+        return self.last is not None and not any(math.isnan(self.last[c]) for c in INDICATOR_COLUMNS)
+
+    def last_row(self, name=None) -> pd.Series:
+        """
+        analysis.short_term_bias / calc_levels 등에 그대로 넘길 수 있는 Series
+        """
+        return pd.Series(self.last, name=name)
+
+
+def add_indicators_incremental(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    엔진으로 전체 프레임을 계산 (add_indicators와 같은 결과, dropna 포함) – 검증/비교용
+    """
+    eng = IndicatorEngine()
+    rows = [
+        eng.update({"Open": o, "High": h, "Low": l, "Close": c, "Volume": v})
+        for o, h, l, c, v in zip(df["Open"], df["High"], df["Low"], df["Close"], df["Volume"])
+    ]
+    out = pd.DataFrame(rows, index=df.index)
+    return out.dropna()
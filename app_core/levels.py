@@ -0,0 +1,335 @@
+import numpy as np
+import pandas as pd
+
+# =====================================
+# 코멘트/판단 함수들
+# =====================================
+def get_mode_config(mode_name: str):
+    if mode_name == "단타":
+        return {"name": "단타", "period": "3mo", "lookback_short": 10, "lookback_long": 20, "atr_mult": 1.0}
+    elif mode_name == "장기":
+        return {"name": "장기", "period": "1y", "lookback_short": 20, "lookback_long": 60, "atr_mult": 1.6}
+    else:
+        return {"name": "스윙", "period": "6mo", "lookback_short": 15, "lookback_long": 40, "atr_mult": 1.3}
+
+
+MODE_NAMES = ["단타", "스윙", "장기"]
+
+# 레벨 계산 배수 (cfg에 같은 키가 있으면 그 값 사용 → 파라미터 스윕용)
+LEVEL_DEFAULTS = {
+    # calc_trend_targets
+    "res_swing_mult": 0.995,   # 단기 고점 저항 버퍼
+    "res_box_mult": 0.99,      # 박스 고점 저항 버퍼
+    "res_bbu_mult": 0.98,      # 볼린저 상단 저항 버퍼
+    "breakout_mult": 1.08,     # 저항 돌파 상태일 때 1차 목표
+    "tp0_frac": 0.6,           # tp0 = 현재가 + (tp1 - 현재가) × tp0_frac
+    "tp2_ext": 0.7,            # tp2 = tp1 + (tp1 - 현재가) × tp2_ext
+    # calc_trend_stops
+    "sl_swing_mult": 0.995,
+    "sl_ma20_mult": 0.99,
+    "sl_box_mult": 0.995,
+    "sl1_ratio": 0.97,         # sl1 ≤ sl0 × sl1_ratio
+    "sl1_deep_mult": 0.985,    # sl1 ≤ 저점 × sl1_deep_mult
+}
+
+
+def level_param(cfg: dict, name: str) -> float:
+    return cfg.get(name, LEVEL_DEFAULTS[name])
+
+
+def all_mode_configs():
+    return [get_mode_config(m) for m in MODE_NAMES]
+
+
+def calc_trend_stops(df: pd.DataFrame, cfg: dict):
+    """
+    ✅ 레벨 계산은 일봉 기반
+    """
+    if df.empty:
+        return None, None
+
+    last = df.iloc[-1]
+    price = float(last["Close"])
+    ma20 = float(last["MA20"])
+    atr = float(last["ATR14"]) if "ATR14" in last and not np.isnan(last["ATR14"]) else None
+
+    recent_short = df.tail(cfg["lookback_short"])
+    recent_long = df.tail(cfg["lookback_long"])
+
+    swing_low = float(recent_short["Low"].min())
+    box_low = float(recent_long["Low"].min())
+
+    candidates = []
+
+    if swing_low < price:
+        candidates.append(swing_low * level_param(cfg, "sl_swing_mult"))
+
+    if ma20 < price:
+        candidates.append(ma20 * level_param(cfg, "sl_ma20_mult"))
+
+    if box_low < price:
+        candidates.append(box_low * level_param(cfg, "sl_box_mult"))
+
+    if atr is not None and atr > 0:
+        atr_stop = price - cfg["atr_mult"] * atr
+        if atr_stop < price:
+            candidates.append(atr_stop)
+
+    if not candidates:
+        sl0 = box_low * 0.985
+        sl1 = box_low * 0.96
+        return sl0, sl1
+
+    sl0 = max(candidates)
+    deep = level_param(cfg, "sl1_deep_mult")
+    deep_candidate = min(box_low * deep, swing_low * deep)
+    sl1 = min(sl0 * level_param(cfg, "sl1_ratio"), deep_candidate)
+    return sl0, sl1
+
+
+def calc_trend_targets(df: pd.DataFrame, cfg: dict):
+    if df.empty:
+        return None, None, None
+
+    last = df.iloc[-1]
+    price = float(last["Close"])
+    bbu = float(last["BBU"])
+    rsi = float(last["RSI14"])
+
+    recent_short = df.tail(cfg["lookback_short"])
+    recent_long = df.tail(cfg["lookback_long"])
+
+    swing_high = float(recent_short["High"].max())
+    box_high = float(recent_long["High"].max())
+
+    base_res = max(swing_high * level_param(cfg, "res_swing_mult"), box_high * level_param(cfg, "res_box_mult"))
+    if not np.isnan(bbu):
+        base_res = max(base_res, bbu * level_param(cfg, "res_bbu_mult"))
+
+    tp1 = price * level_param(cfg, "breakout_mult") if base_res <= price else base_res
+    tp0 = price + (tp1 - price) * level_param(cfg, "tp0_frac")
+    tp2 = tp1 + (tp1 - price) * level_param(cfg, "tp2_ext")
+
+    if rsi > 70:
+        tp0 = price + (tp1 - price) * 0.5
+        tp2 = tp1 + (tp1 - price) * 0.4
+
+    return tp0, tp1, tp2
+
+
+def calc_levels(df, last, cfg):
+    """
+    ✅ 레벨 계산은 일봉 기반
+    """
+    if df.empty:
+        return None, None, None, None, None, None, None
+
+    price = float(last["Close"])
+    ma20 = float(last["MA20"])
+    bbl = float(last["BBL"])
+
+    if price > ma20:
+        buy_low = ma20 * 0.98
+        buy_high = ma20 * 1.01
+    else:
+        buy_low = bbl * 0.98
+        buy_high = bbl * 1.02
+
+    tp0, tp1, tp2 = calc_trend_targets(df, cfg)
+    sl0, sl1 = calc_trend_stops(df, cfg)
+    return buy_low, buy_high, tp0, tp1, tp2, sl0, sl1
+
+
+def position_view(df: pd.DataFrame, last, cfg: dict, holding_type: str, price_now: float, avg_price: float = 0.0):
+    """
+    분석 화면의 레벨 + 상태 판정 한 번에 (AI 일괄 생성도 같은 값을 쓰도록)
+    - 신규 진입 검토면 손절을 ATR 기반으로 보정
+    """
+    buy_low, buy_high, tp0, tp1, tp2, sl0, sl1 = calc_levels(df, last, cfg)
+
+    # ✅ 신규 진입 손절: ATR 기반 보정 (변동성 반영)
+    atr14 = float(last["ATR14"]) if "ATR14" in last and not np.isnan(last["ATR14"]) else None
+    if holding_type == "신규 진입 검토" and buy_low is not None and atr14 is not None and atr14 > 0:
+        sl0 = max(0.01, float(buy_low) - 1.0 * atr14)
+        sl1 = max(0.01, float(buy_low) - 1.8 * atr14)
+    elif holding_type == "신규 진입 검토" and buy_low is not None:
+        # ATR이 없으면 최소한의 fallback
+        sl0 = buy_low * 0.97
+        sl1 = buy_low * 0.94
+
+    levels = {
+        "buy_low": buy_low, "buy_high": buy_high,
+        "tp0": tp0, "tp1": tp1, "tp2": tp2,
+        "sl0": sl0, "sl1": sl1,
+    }
+
+    # ✅ 상태 머신
+    state_name, action_text, recover_level, phase = compute_state_and_action(
+        holding_type=holding_type,
+        price_now=price_now,
+        avg_price=avg_price,
+        levels=levels,
+        last_row=last,
+    )
+    return {
+        "levels": levels,
+        "atr14": atr14,
+        "state_name": state_name,
+        "action_text": action_text,
+        "recover_level": recover_level,
+        "phase": phase,
+        # ✅ 구조 붕괴 플래그 (UI에서 레벨 무효화/숨김 처리)
+        "structure_broken": "구조 붕괴" in state_name,
+    }
+
+
+# =====================================
+# ✅ 상태 머신: 구조 붕괴면 레벨 무효화 + 회복만 남김
+# =====================================
+def compute_state_and_action(
+    holding_type: str,
+    price_now: float,
+    avg_price: float,
+    levels: dict,
+    last_row: pd.Series
+):
+    buy_low = levels.get("buy_low")
+    buy_high = levels.get("buy_high")
+    tp0 = levels.get("tp0")
+    tp1 = levels.get("tp1")
+    tp2 = levels.get("tp2")
+    sl0 = levels.get("sl0")
+    sl1 = levels.get("sl1")
+
+    # 회복 확인가: "매수밴드 상단 회복" vs "20일선 회복" 중 더 보수적(높은 값)
+    try:
+        ma20 = float(last_row.get("MA20", np.nan))
+    except Exception:
+        ma20 = np.nan
+    recover_candidates = []
+    if buy_high is not None:
+        recover_candidates.append(float(buy_high) * 1.005)
+    if not np.isnan(ma20):
+        recover_candidates.append(float(ma20) * 1.01)
+    recover_level = max(recover_candidates) if recover_candidates else None
+
+    # ✅ 구조 붕괴 판정 (상태 전환은 현재가 기준)
+    structure_broken = False
+    if price_now is not None and sl1 is not None:
+        if price_now < float(sl1) * 0.998:
+            structure_broken = True
+
+    # ---- 구조 붕괴면: 기존 1차/목표 전부 무효화, 회복만 표시 ----
+    if structure_broken:
+        if recover_level is not None:
+            return (
+                "구조 붕괴 → 관망/회복 대기",
+                f"지금은 기존 매수/목표 레벨이 무효화된 구간. (회복 확인: {recover_level:.2f} 위로 복귀하면 다시 시나리오 재계산)",
+                recover_level,
+                "structure_broken",
+            )
+        return (
+            "구조 붕괴 → 관망/회복 대기",
+            "지금은 기존 매수/목표 레벨이 무효화된 구간. (회복 확인가 재계산 필요)",
+            recover_level,
+            "structure_broken",
+        )
+
+    # ---- 신규 진입 ----
+    if holding_type != "보유 중":
+        if price_now is None:
+            return "데이터 부족", "현재가(시외 포함)를 못 불러와서 상태 판정 불가", recover_level, "unknown"
+
+        # 진입 실패(약): sl0 하회 (단, 구조 붕괴는 위에서 처리됨)
+        if sl0 is not None and price_now < float(sl0) * 0.998:
+            return (
+                "진입 실패(중단)",
+                f"진입 가설이 흔들림. 우선 중단/관망. (회복 확인: {recover_level:.2f} 위 복귀 시 재평가)" if recover_level else
+                "진입 가설이 흔들림. 우선 중단/관망. (회복 확인가 재평가 필요)",
+                recover_level,
+                "fail_soft",
+            )
+
+        # 1차 구간 진입
+        if buy_low is not None and price_now <= float(buy_low) * 1.005:
+            if sl0 is not None:
+                return (
+                    "1차 구간 진입",
+                    f"분할 접근 구간. (1차: {buy_low:.2f} 근처 / 중단: {sl0:.2f} 이탈 시)",
+                    recover_level,
+                    "entry_1",
+                )
+            return (
+                "1차 구간 진입",
+                f"분할 접근 구간. (1차: {buy_low:.2f} 근처 / 중단 기준 재설정 필요)",
+                recover_level,
+                "entry_1",
+            )
+
+        if buy_high is not None and price_now <= float(buy_high) * 1.01:
+            return (
+                "접근 대기(근접)",
+                f"아직은 대기. (1차 시작: {buy_low:.2f} ~ {buy_high:.2f} 접근 시 분할)",
+                recover_level,
+                "wait_near",
+            )
+
+        if tp1 is not None and price_now >= float(tp1) * 0.98:
+            return (
+                "상단 구간(추격 경계)",
+                f"상단/저항 근접. 신규진입은 추격보다 확인 우선. (눌림 시: {buy_high:.2f} 근처 재접근)" if buy_high else
+                "상단/저항 근접. 신규진입은 추격보다 확인 우선.",
+                recover_level,
+                "tp_zone",
+            )
+
+        if buy_high is not None and buy_low is not None:
+            return (
+                "대기(접근 전)",
+                f"지금은 접근 전 대기. (1차 시작: {buy_low:.2f} ~ {buy_high:.2f})",
+                recover_level,
+                "wait_far",
+            )
+
+        return ("대기", "지금은 대기(레벨 계산값 부족).", recover_level, "wait")
+
+    # ---- 보유 중 ----
+    else:
+        if price_now is None:
+            return "데이터 부족", "현재가(시외 포함)를 못 불러와서 상태 판정 불가", recover_level, "unknown"
+
+        # 방어(약)
+        if sl0 is not None and price_now < float(sl0) * 0.998:
+            return (
+                "방어 우선",
+                f"방어 우선 구간. (0차 방어선: {sl0:.2f} 근처) 회복하면 유지, 재하락하면 비중조절",
+                recover_level,
+                "hold_def_soft",
+            )
+
+        if tp1 is not None and price_now >= float(tp1) * 0.98:
+            return (
+                "익절 구간",
+                f"익절/부분정리 고려 구간. (1차 목표: {tp1:.2f} 근처) 무리한 추가매수는 비추",
+                recover_level,
+                "hold_tp",
+            )
+
+        if buy_low is not None and price_now >= float(buy_low) * 1.02:
+            return (
+                "유지(추세 유지)",
+                f"유지 중심. (눌림 관심: {buy_low:.2f} ~ {buy_high:.2f}) / 이탈 시 방어: {sl0:.2f}" if (buy_high and sl0) else
+                "유지 중심(레벨 일부 부족).",
+                recover_level,
+                "hold_trend",
+            )
+
+        if buy_low is not None and sl0 is not None:
+            return (
+                "애매 구간(대기/정리 고민)",
+                f"애매 구간. (눌림 매수는 {buy_low:.2f} 근처부터 / 방어는 {sl0:.2f} 이탈 시)",
+                recover_level,
+                "hold_amb",
+            )
+
+        return ("보유", "보유 중(레벨 계산값 부족).", recover_level, "hold")
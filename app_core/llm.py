@@ -0,0 +1,383 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+
+# 선택 기능: AI 해석 (openai가 없으면 LLMUnavailable)
+try:
+    from openai import (
+        APIConnectionError,
+        APITimeoutError,
+        AsyncOpenAI,
+        InternalServerError,
+        OpenAI,
+        RateLimitError,
+    )
+
+    _TRANSIENT = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+except Exception:
+    OpenAI = AsyncOpenAI = None
+    _TRANSIENT = ()
+
+# =====================================
+# 프로세스 공용 LLM 클라이언트 (sync + async)
+# - 연결 풀(keep-alive)을 재사용 → 요청마다 클라이언트 생성/TLS 핸드셰이크 안 함
+# - 요청 하나의 마감 시간(deadline)은 대기/재시도를 모두 포함
+# - 동시 호출 수 상한(세마포어) → 장 시작 직후 버튼이 몰려도 API 한도를 넘지 않도록
+#   (클라이언트 하나 = API 키/주소 하나의 상한: sync 스레드와 모든 이벤트 루프의 async 호출이 같은 세마포어를 나눠 씀)
+# - 일시적 오류(연결/타임아웃/429/5xx)만 지수 백오프 + 지터로 재시도
+# - 호출별 지연/첫 토큰 시간/토큰 사용량 기록
+# =====================================
+DEFAULT_TIMEOUT = float(os.getenv("CHAN_LLM_TIMEOUT", 45))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("CHAN_LLM_MAX_CONCURRENCY", 8))
+DEFAULT_MAX_RETRIES = int(os.getenv("CHAN_LLM_MAX_RETRIES", 3))
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+# async 호출이 공용 세마포어 자리를 기다릴 때 다시 확인하는 간격(초)
+ASYNC_ACQUIRE_POLL = 0.01
+
+
+class LLMUnavailable(RuntimeError):
+    pass
+
+
+class LLMTimeout(RuntimeError):
+    pass
+
+
+class LLMResult:
+    """
+    호출 한 번의 결과 (text + 측정값)
+    """
+
+    __slots__ = ("text", "model", "latency", "ttft", "attempts", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, text, model, latency, ttft, attempts, prompt_tokens=None, completion_tokens=None):
+        self.text = text
+        self.model = model
+        self.latency = latency
+        self.ttft = ttft
+        self.attempts = attempts
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMMetrics:
+    """
+    스레드 안전 누적 지표 (지연은 최근 window건으로 p50/p95)
+    """
+
+    def __init__(self, window: int = 500):
+        self._lock = threading.Lock()
+        self._latency = deque(maxlen=window)
+        self._ttft = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def record(self, result: LLMResult):
+        with self._lock:
+            self.calls += 1
+            self.retries += result.attempts - 1
+            self._latency.append(result.latency)
+            if result.ttft is not None:
+                self._ttft.append(result.ttft)
+            self.prompt_tokens += result.prompt_tokens or 0
+            self.completion_tokens += result.completion_tokens or 0
+
+    def record_error(self, attempts: int, timeout: bool = False):
+        with self._lock:
+            self.errors += 1
+            self.retries += max(0, attempts - 1)
+            if timeout:
+                self.timeouts += 1
+
+    @staticmethod
+    def _pct(values, q):
+        if not values:
+            return None
+        s = sorted(values)
+        return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+    def snapshot(self):
+        with self._lock:
+            lat, ttft = list(self._latency), list(self._ttft)
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "latency_p50": self._pct(lat, 0.5),
+                "latency_p95": self._pct(lat, 0.95),
+                "ttft_p50": self._pct(ttft, 0.5),
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter: [0, min(상한, 기본 × 2^attempt)]
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def _usage_tokens(usage):
+    if usage is None:
+        return None, None
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+
+
+class RateLimiter:
+    """
+    호출 시작 간격을 1/rate초 이상으로 (여러 스레드 공용)
+    """
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec and rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class LLMClient:
+    """
+    chat(): 동기 (Streamlit 스크립트 스레드) / achat(): 비동기 (배치 등)
+    - stream=True면 on_delta(조각 텍스트)를 바로 호출; 이미 조각을 내보낸 뒤의 오류는 재시도하지 않음
+    - max_concurrency는 chat + achat(모든 이벤트 루프) 합계 상한
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        if OpenAI is None:
+            raise LLMUnavailable("openai 패키지를 찾지 못했습니다. requirements.txt에 openai를 추가했는지 확인하세요.")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.metrics = LLMMetrics()
+
+        # 클라이언트 하나를 계속 쓰면 내부 HTTP 연결 풀(keep-alive)도 재사용됨
+        # 재시도는 여기서 직접 (openai 기본 재시도는 끔 → 마감 시간 안에서만 재시도)
+        self._sync = OpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self._async_args = dict(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self._async = {}
+        self._sem = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+
+    # ---- 동기 ----
+    def chat(self, messages: list, model: str, temperature: float = 0.0, stream: bool = False, on_delta=None, timeout: float = None):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        if not self._sem.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self.metrics.record_error(0, timeout=True)
+            raise LLMTimeout("AI 요청이 몰려 대기 시간이 초과됐습니다. 잠시 후 다시 시도하세요.")
+        self.metrics.enter()
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                sent = []
+                try:
+                    result = self._call_sync(messages, model, temperature, stream, on_delta, deadline, sent)
+                    result.attempts = attempt
+                    self.metrics.record(result)
+                    return result
+                except _TRANSIENT as e:
+                    wait = _backoff(attempt - 1)
+                    if sent or attempt > self.max_retries or time.monotonic() + wait >= deadline:
+                        self.metrics.record_error(attempt, timeout=isinstance(e, APITimeoutError))
+                        raise
+                    time.sleep(wait)
+                except LLMTimeout:
+                    self.metrics.record_error(attempt, timeout=True)
+                    raise
+                except Exception:
+                    self.metrics.record_error(attempt)
+                    raise
+        finally:
+            self.metrics.leave()
+            self._sem.release()
+
+    def _call_sync(self, messages, model, temperature, stream, on_delta, deadline, sent):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMTimeout("AI 응답 시간이 초과됐습니다.")
+        t0 = time.perf_counter()
+        if not stream:
+            resp = self._sync.chat.completions.create(
+                model=model, messages=messages, temperature=temperature, timeout=remaining,
+            )
+            latency = time.perf_counter() - t0
+            text = (resp.choices[0].message.content or "").strip()
+            return LLMResult(text, model, latency, None, 1, *_usage_tokens(resp.usage))
+
+        resp = self._sync.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, timeout=remaining,
+            stream=True, stream_options={"include_usage": True},
+        )
+        # timeout은 읽기 1번당 제한이라 조각이 느리게 계속 오면 마감을 넘김
+        # → 마감 시각에 응답을 닫는 타이머 + 조각마다 마감 확인
+        watchdog = threading.Timer(max(0.0, deadline - time.monotonic()), resp.close)
+        watchdog.daemon = True
+        watchdog.start()
+        ttft, usage = None, None
+        try:
+            for chunk in resp:
+                if time.monotonic() >= deadline:
+                    raise LLMTimeout("AI 응답 시간이 초과됐습니다.")
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - t0
+                sent.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+        except LLMTimeout:
+            raise
+        except Exception as e:
+            if time.monotonic() >= deadline:
+                raise LLMTimeout("AI 응답 시간이 초과됐습니다.") from e
+            raise
+        finally:
+            watchdog.cancel()
+            resp.close()
+        if time.monotonic() >= deadline:
+            # 타이머가 닫아서 스트림이 조용히 끝난 경우
+            raise LLMTimeout("AI 응답 시간이 초과됐습니다.")
+        latency = time.perf_counter() - t0
+        return LLMResult("".join(sent).strip(), model, latency, ttft, 1, *_usage_tokens(usage))
+
+    # ---- 비동기 ----
+    def _async_state(self):
+        # AsyncOpenAI는 이벤트 루프에 묶이므로 루프마다 하나
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async.get(loop)
+            if client is None:
+                client = AsyncOpenAI(**self._async_args)
+                self._async = {lp: c for lp, c in self._async.items() if not lp.is_closed()}
+                self._async[loop] = client
+            return client
+
+    async def _acquire_async(self, deadline: float) -> bool:
+        # 동기 경로와 같은 threading 세마포어 → 루프 수와 상관없이 상한 하나
+        # (to_thread로 막고 기다리면 취소된 뒤에 자리를 잡아 새어 나가므로, 양보하면서 다시 시도)
+        while not self._sem.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(ASYNC_ACQUIRE_POLL)
+        return True
+
+    async def achat(self, messages: list, model: str, temperature: float = 0.0, timeout: float = None):
+        client = self._async_state()
+        deadline = time.monotonic() + (timeout or self.timeout)
+        if not await self._acquire_async(deadline):
+            self.metrics.record_error(0, timeout=True)
+            raise LLMTimeout("AI 요청이 몰려 대기 시간이 초과됐습니다. 잠시 후 다시 시도하세요.")
+        self.metrics.enter()
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise LLMTimeout("AI 응답 시간이 초과됐습니다.")
+                    t0 = time.perf_counter()
+                    resp = await client.chat.completions.create(
+                        model=model, messages=messages, temperature=temperature, timeout=remaining,
+                    )
+                    result = LLMResult(
+                        (resp.choices[0].message.content or "").strip(), model,
+                        time.perf_counter() - t0, None, attempt, *_usage_tokens(resp.usage),
+                    )
+                    self.metrics.record(result)
+                    return result
+                except _TRANSIENT as e:
+                    wait = _backoff(attempt - 1)
+                    if attempt > self.max_retries or time.monotonic() + wait >= deadline:
+                        self.metrics.record_error(attempt, timeout=isinstance(e, APITimeoutError))
+                        raise
+                    await asyncio.sleep(wait)
+                except LLMTimeout:
+                    self.metrics.record_error(attempt, timeout=True)
+                    raise
+                except Exception:
+                    self.metrics.record_error(attempt)
+                    raise
+        finally:
+            self.metrics.leave()
+            self._sem.release()
+
+
+_clients = {}
+_clients_guard = threading.Lock()
+
+
+def get_llm_client(api_key: str = None, base_url: str = None) -> LLMClient:
+    """
+    (api_key, base_url)별 프로세스 공용 클라이언트 (기본값은 OPENAI_API_KEY / OPENAI_BASE_URL)
+    """
+    api_key = (api_key or os.getenv("OPENAI_API_KEY", "")).strip()
+    base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+    key = (api_key, base_url)
+    with _clients_guard:
+        client = _clients.get(key)
+        if client is None:
+            client = LLMClient(api_key, base_url)
+            _clients[key] = client
+        return client
+
+
+def llm_metrics():
+    """
+    모든 공용 클라이언트의 지표 (클라이언트가 하나면 그 값 그대로)
+    """
+    with _clients_guard:
+        clients = list(_clients.values())
+    if not clients:
+        return LLMMetrics().snapshot()
+    if len(clients) == 1:
+        return clients[0].metrics.snapshot()
+    snaps = [c.metrics.snapshot() for c in clients]
+    out = {k: sum(s[k] for s in snaps) for k in ("calls", "errors", "retries", "timeouts", "in_flight", "prompt_tokens", "completion_tokens")}
+    out["peak_in_flight"] = max(s["peak_in_flight"] for s in snaps)
+    for k in ("latency_p50", "latency_p95", "ttft_p50"):
+        vals = [s[k] for s in snaps if s[k] is not None]
+        out[k] = max(vals) if vals else None
+    return out
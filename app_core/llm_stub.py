@@ -0,0 +1,233 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =====================================
+# 로컬 대역 chat-completions 서버 (OpenAI 호환, 개발/측정용)
+# - POST /v1/chat/completions (stream=true면 SSE 조각으로 전송)
+# - 응답 내용은 요청의 DATA(JSON)로 만든 고정 문장 → 같은 요청이면 같은 응답
+# - ttft(첫 토큰까지 대기) / chunk_delay(조각 사이 대기)로 실제 모델의 지연을 흉내
+# - fail_rate: 그 비율만큼 503으로 응답 (재시도 확인용)
+#   사용: python -m app_core.llm_stub --port 8765
+#         OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub streamlit run app.py
+# =====================================
+DEFAULT_TTFT = 0.4
+DEFAULT_CHUNK_DELAY = 0.03
+DEFAULT_CHUNK_CHARS = 6
+
+
+def _request_data(messages: list):
+    """
+    마지막 user 메시지의 'DATA:' 뒤 JSON (없으면 None)
+    """
+    for m in reversed(messages or []):
+        if m.get("role") != "user":
+            continue
+        content = m.get("content") or ""
+        if "DATA:" not in content:
+            return None
+        try:
+            return json.loads(content.split("DATA:", 1)[1].strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _fmt(x):
+    try:
+        return f"{float(x):.2f}"
+    except (TypeError, ValueError):
+        return "-"
+
+
+def interpretation_for(data: dict) -> dict:
+    """
+    ai_summarize_and_explain가 요구하는 JSON 모양의 고정 답변
+    """
+    data = data or {}
+    levels = data.get("levels") or {}
+    price = _fmt(data.get("price_now"))
+    state = data.get("state") or "상태 미상"
+    buy_low, buy_high = _fmt(levels.get("buy_low")), _fmt(levels.get("buy_high"))
+    sl0, tp1, recover = _fmt(levels.get("sl0")), _fmt(levels.get("tp1")), _fmt(levels.get("recover"))
+    held = data.get("holding_type") == "보유 중"
+    return {
+        "summary_one_line": f"{state}: 현재가 {price} 기준, {sl0} 아래면 중단하고 {buy_low}~{buy_high}에서만 분할 접근",
+        "confusion_explain": [
+            {
+                "title": "지금 가장 안전한 행동(가격 기준)",
+                "desc": f"현재가 {price}에서는 서두르지 않는 편이 안전합니다. {buy_low}~{buy_high} 구간에 닿을 때만 나눠서 보고, "
+                        f"{sl0} 아래로 내려가면 계획을 멈춥니다. {recover} 위로 올라오면 다시 점검합니다.",
+            },
+            {
+                "title": "보유자 관점: 지금 유지/축소 판단 포인트" if held else "신규진입 관점: 지금 들어가도 되는지 체크",
+                "desc": f"1차 목표는 {tp1} 근처, 방어선은 {sl0}입니다. 두 가격 사이에서는 확인 후 대응하고, "
+                        f"{sl0} 이탈이 이어지면 비중을 줄이는 쪽이 무난합니다.",
+            },
+        ],
+    }
+
+
+def completion_text(messages: list) -> str:
+    data = _request_data(messages)
+    if data is None:
+        return json.dumps({"echo": (messages[-1].get("content") or "")[:200] if messages else ""}, ensure_ascii=False)
+    return json.dumps(interpretation_for(data), ensure_ascii=False)
+
+
+def _usage(messages: list, text: str):
+    # 대략적인 토큰 수 (4글자 ≈ 1토큰)
+    prompt = sum(len(m.get("content") or "") for m in messages or []) // 4 + 1
+    completion = len(text) // 4 + 1
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 마감 시간으로 먼저 끊은 경우
+            self.close_connection = True
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "local"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fail = server.fail_rate > 0 and server.rng.random() < server.fail_rate
+            if fail:
+                server.failures += 1
+        if fail:
+            self._send_json(503, {"error": {"message": "stub: temporarily unavailable", "type": "server_error"}})
+            return
+        messages = req.get("messages") or []
+        model = req.get("model") or "stub"
+        text = completion_text(messages)
+        rid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        time.sleep(server.ttft)
+
+        if not req.get("stream"):
+            self._send_json(200, {
+                "id": rid,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": _usage(messages, text),
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(choices, **extra):
+            chunk = {"id": rid, "object": "chat.completion.chunk", "created": created, "model": model, "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            send([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+            n = max(1, server.chunk_chars)
+            for i in range(0, len(text), n):
+                send([{"index": 0, "delta": {"content": text[i:i + n]}, "finish_reason": None}])
+                time.sleep(server.chunk_delay)
+            send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if (req.get("stream_options") or {}).get("include_usage"):
+                send([], usage=_usage(messages, text))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    ttft: float = DEFAULT_TTFT,
+    chunk_delay: float = DEFAULT_CHUNK_DELAY,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    fail_rate: float = 0.0,
+    verbose: bool = False,
+    seed: int = 0,
+):
+    """
+    서버 객체 (port=0이면 빈 포트 자동 선택 → server.server_address로 확인)
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.ttft = ttft
+    server.chunk_delay = chunk_delay
+    server.chunk_chars = chunk_chars
+    server.fail_rate = fail_rate
+    server.verbose = verbose
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.failures = 0
+    return server
+
+
+def start_in_thread(**kwargs):
+    """
+    백그라운드 스레드에서 서버 실행 → (server, base_url); 끝나면 server.shutdown()
+    """
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="로컬 대역 chat-completions 서버 (OpenAI 호환)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=DEFAULT_TTFT, help="첫 토큰까지 대기(초)")
+    parser.add_argument("--chunk-delay", type=float, default=DEFAULT_CHUNK_DELAY, help="스트리밍 조각 사이 대기(초)")
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    srv = make_server(args.host, args.port, args.ttft, args.chunk_delay, args.chunk_chars, args.fail_rate, args.verbose)
+    print(f"listening on http://{args.host}:{srv.server_address[1]}/v1")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,418 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app_core.providers import get_default_provider
+
+# =====================================
+# 시장 개요 구성 종목
+# =====================================
+FUTURES_LIST = [("nasdaq", "NQ=F"), ("sp500", "ES=F")]
+INDEX_LIST = [("nasdaq", "^IXIC"), ("sp500", "^GSPC")]
+TNX_SYMBOL = "^TNX"
+DXY_SYMBOL = "DX-Y.NYB"
+
+ETF_LIST = [
+    ("QQQ", "QQQ (나스닥100 ETF)"),
+    ("VOO", "VOO (S&P500 ETF)"),
+    ("SOXX", "SOXX (반도체 ETF)"),
+]
+
+BIGTECH_LIST = [
+    ("NVDA", "NVDA"),
+    ("AAPL", "AAPL"),
+    ("MSFT", "MSFT"),
+    ("AMZN", "AMZN"),
+    ("META", "META"),
+    ("GOOGL", "GOOGL"),
+    ("TSLA", "TSLA"),
+]
+
+SECTOR_ETF_LIST = [
+    ("기술주 (XLK)", "XLK"),
+    ("반도체 (SOXX)", "SOXX"),
+    ("금융 (XLF)", "XLF"),
+    ("헬스케어 (XLV)", "XLV"),
+    ("에너지 (XLE)", "XLE"),
+    ("커뮤니케이션 (XLC)", "XLC"),
+]
+
+
+def overview_symbols():
+    """
+    개요에 필요한 전체 종목 (중복 제거, 순서 유지) – SOXX처럼 여러 섹션에 나오는 종목도 1번만 조회
+    """
+    syms = [s for _, s in FUTURES_LIST] + [TNX_SYMBOL, DXY_SYMBOL] + [s for _, s in INDEX_LIST]
+    syms += [s for s, _ in ETF_LIST] + [s for s, _ in BIGTECH_LIST] + [s for _, s in SECTOR_ETF_LIST]
+    return list(dict.fromkeys(syms))
+
+
+# =====================================
+# 시세 스냅샷 (한 번에 조회 → 정규화된 시세표)
+# =====================================
+def fetch_quote_snapshot(symbols, max_workers: int = 8, provider=None):
+    """
+    종목들의 시세를 제공자를 통해 한 번에 조회해서 {symbol: quote or None} 반환
+    """
+    provider = provider or get_default_provider()
+    return provider.quote_snapshot(symbols, max_workers=max_workers)
+
+
+def last_change_from_quote(quote):
+    """
+    정규장 가격 + 전일 종가 대비 % (기존 safe_last_change_info와 동일 규칙)
+    """
+    if not quote:
+        return None, None, ""
+    last = quote.get("regular")
+    prev = quote.get("prev_close")
+    market_state = quote.get("market_state", "")
+    if last is None or prev in (None, 0, 0.0):
+        return None, None, market_state
+    chg_pct = (last - prev) / prev * 100
+    return float(last), float(chg_pct), market_state
+
+
+def etf_price_from_quote(quote, symbol: str, name: str):
+    """
+    프리/애프터 포함 현재가 (기존 get_etf_price_with_prepost와 동일 규칙)
+    """
+    if not quote:
+        return {
+            "symbol": symbol,
+            "name": name,
+            "current": None,
+            "basis": "조회 실패",
+            "chg_pct": None,
+            "market_state": "",
+        }
+
+    market_state = quote.get("market_state", "")
+    prev_close = quote.get("prev_close")
+
+    pre = quote.get("pre")
+    post = quote.get("post")
+    regular = quote.get("regular")
+
+    current = None
+    chg_pct = None
+    basis = "기준 불명"
+
+    if market_state == "PRE" and pre is not None:
+        current = pre
+        basis = "프리장 기준"
+        chg_pct = quote.get("pre_chg_pct")
+        if chg_pct is None and prev_close not in (None, 0, 0.0):
+            chg_pct = (pre - prev_close) / prev_close * 100
+    elif market_state == "POST" and post is not None:
+        current = post
+        basis = "애프터장 기준"
+        chg_pct = quote.get("post_chg_pct")
+        if chg_pct is None and prev_close not in (None, 0, 0.0):
+            chg_pct = (post - prev_close) / prev_close * 100
+    elif regular is not None:
+        current = regular
+        basis = "정규장 기준"
+        chg_pct = quote.get("regular_chg_pct")
+        if chg_pct is None and prev_close not in (None, 0, 0.0):
+            chg_pct = (regular - prev_close) / prev_close * 100
+
+    if current is None:
+        current = pre or post or regular
+
+    return {
+        "symbol": symbol,
+        "name": name,
+        "current": float(current) if current is not None else None,
+        "basis": basis,
+        "chg_pct": float(chg_pct) if chg_pct is not None else None,
+        "market_state": market_state,
+    }
+
+
+# 개요 값 중 이 비율 이상이 채워져야 정상 스냅샷 (yfinance 장애 시 시세가 전부 None으로 옴)
+MIN_OVERVIEW_COVERAGE = 0.5
+
+
+def overview_coverage(overview: dict):
+    """
+    (채워진 값 수, 전체 값 수) – 선물/지수/금리·달러/ETF/빅테크/섹터
+    """
+    if not overview:
+        return 0, 0
+    rf = overview.get("rates_fx", {})
+    values = [v.get("last") for v in overview.get("futures", {}).values()]
+    values += [v.get("last") for v in overview.get("indexes", {}).values()]
+    values += [rf.get("us10y"), rf.get("dxy")]
+    values += [e.get("current") for e in overview.get("etfs", [])]
+    values += [b.get("chg") for b in overview.get("bigtech", {}).get("items", [])]
+    values += [s.get("chg") for s in overview.get("sector", {}).get("items", [])]
+    return sum(v is not None for v in values), len(values)
+
+
+def overview_is_usable(overview: dict, min_coverage: float = MIN_OVERVIEW_COVERAGE) -> bool:
+    """
+    조회 실패가 None으로 흡수되므로 값이 너무 적으면 '실패'로 보고 이전 스냅샷을 유지 (StaleWhileRevalidate is_valid)
+    """
+    filled, total = overview_coverage(overview)
+    return total > 0 and filled >= total * min_coverage
+
+
+def load_market_overview(provider=None):
+    """
+    개요 종목 전체를 한 번에(동시 요청) 조회 → 시세표 하나로 모든 섹션 구성
+    """
+    provider = provider or get_default_provider()
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        fgi_future = ex.submit(provider.fgi)
+        quotes = fetch_quote_snapshot(overview_symbols(), provider=provider)
+        fgi = fgi_future.result()
+    return build_us_market_overview(quotes, fgi)
+
+
+def build_us_market_overview(quotes: dict, fgi=None):
+    """
+    시세표 하나로 개요의 모든 섹션을 구성 (네트워크 호출 없음)
+    """
+    overview = {}
+
+    futures = {}
+    for key, sym in FUTURES_LIST:
+        last, chg, state = last_change_from_quote(quotes.get(sym))
+        futures[key] = {"last": last, "chg_pct": chg, "state": state}
+    overview["futures"] = futures
+
+    tnx_last, tnx_chg, tnx_state = last_change_from_quote(quotes.get(TNX_SYMBOL))
+    if tnx_last is not None:
+        us10y = tnx_last / 10.0
+        us10y_chg = tnx_chg / 10.0 if tnx_chg is not None else None
+    else:
+        us10y, us10y_chg = None, None
+
+    dxy_last, dxy_chg, dxy_state = last_change_from_quote(quotes.get(DXY_SYMBOL))
+
+    overview["rates_fx"] = {
+        "us10y": us10y,
+        "us10y_chg": us10y_chg,
+        "us10y_state": tnx_state,
+        "dxy": dxy_last,
+        "dxy_chg": dxy_chg,
+        "dxy_state": dxy_state,
+    }
+
+    indexes = {}
+    for key, sym in INDEX_LIST:
+        last, chg, state = last_change_from_quote(quotes.get(sym))
+        indexes[key] = {"last": last, "chg_pct": chg, "state": state}
+    overview["indexes"] = indexes
+
+    overview["etfs"] = [etf_price_from_quote(quotes.get(sym), sym, name) for sym, name in ETF_LIST]
+
+    overview["fgi"] = fgi
+
+    bigtech = []
+    score_bt = 0
+    for sym, _ in BIGTECH_LIST:
+        _, chg, _ = last_change_from_quote(quotes.get(sym))
+        if chg is not None:
+            if chg >= 1:
+                score_bt += 1
+            elif chg <= -1:
+                score_bt -= 1
+        bigtech.append({"symbol": sym, "chg": chg})
+    overview["bigtech"] = {"score": score_bt, "items": bigtech}
+
+    sector = []
+    score_sec = 0
+    for label, sym in SECTOR_ETF_LIST:
+        _, chg, _ = last_change_from_quote(quotes.get(sym))
+        if chg is not None:
+            if chg >= 0.8:
+                score_sec += 1
+            elif chg <= -0.8:
+                score_sec -= 1
+        sector.append({"label": label, "symbol": sym, "chg": chg})
+    overview["sector"] = {"score": score_sec, "items": sector}
+
+    return overview
+
+
+# =====================================
+# 시장 점수 (개요 → 점수/라벨/근거)
+# =====================================
+def compute_market_score(overview: dict):
+    if not overview:
+        return 0, "데이터 부족", "실시간 시장 데이터를 불러오지 못했습니다."
+
+    fut = overview.get("futures", {})
+    rf = overview.get("rates_fx", {})
+    etfs = overview.get("etfs", [])
+
+    score = 0
+    details = []
+
+    nas = fut.get("nasdaq", {})
+    nas_chg = nas.get("chg_pct")
+    if nas_chg is not None:
+        if nas_chg >= 1.0:
+            score += 2; details.append(f"나스닥 선물 +{nas_chg:.2f}% (강한 상승)")
+        elif nas_chg >= 0.3:
+            score += 1; details.append(f"나스닥 선물 +{nas_chg:.2f}% (완만한 상승)")
+        elif nas_chg <= -1.0:
+            score -= 2; details.append(f"나스닥 선물 {nas_chg:.2f}% (강한 하락)")
+        elif nas_chg <= -0.3:
+            score -= 1; details.append(f"나스닥 선물 {nas_chg:.2f}% (완만한 하락)")
+
+    us10y = rf.get("us10y")
+    if us10y is not None:
+        if us10y < 4.0:
+            score += 2; details.append(f"미 10년물 {us10y:.2f}% (금리 우호)")
+        elif us10y < 4.2:
+            score += 1; details.append(f"미 10년물 {us10y:.2f}% (무난)")
+        elif us10y > 4.4:
+            score -= 2; details.append(f"미 10년물 {us10y:.2f}% (금리 부담)")
+        else:
+            score -= 1; details.append(f"미 10년물 {us10y:.2f}% (다소 부담)")
+
+    dxy = rf.get("dxy")
+    if dxy is not None:
+        if dxy < 104:
+            score += 1; details.append(f"DXY {dxy:.2f} (달러 약세 → Risk-on 우호)")
+        elif dxy > 106:
+            score -= 1; details.append(f"DXY {dxy:.2f} (달러 강세 → Risk-off 경계)")
+
+    for e in etfs:
+        sym = e.get("symbol")
+        chg = e.get("chg_pct")
+        if chg is None:
+            continue
+        if chg >= 0.5:
+            score += 1; details.append(f"{sym} +{chg:.2f}% (ETF 강세)")
+        elif chg <= -0.5:
+            score -= 1; details.append(f"{sym} {chg:.2f}% (ETF 약세)")
+
+    if score >= 5:
+        label = "🚀 강한 Risk-on (상승장 상단 구간)"
+    elif score >= 2:
+        label = "😊 약한 Risk-on ~ 우상향 기대"
+    elif score >= -1:
+        label = "😐 중립/혼조 (방향 모호)"
+    elif score >= -4:
+        label = "⚠ 약한 Risk-off (조정/변동성 주의)"
+    else:
+        label = "🧨 강한 Risk-off (공포장 가능성)"
+
+    return score, label, " · ".join(details)
+
+
+# =====================================
+# 시장 판독 (세계지표 / ETF / 지수 / 빅테크 0~100 점수 + 결론)
+# =====================================
+def _clamp(x, lo=0.0, hi=100.0):
+    try:
+        x = float(x)
+    except Exception:
+        return lo
+    return max(lo, min(hi, x))
+
+
+def score_to_text(score_0_100: float) -> str:
+    s = float(score_0_100)
+    if s >= 70:
+        return "위험선호 우세"
+    elif s >= 65:
+        return "양호"
+    elif s >= 52:
+        return "반등 시도"
+    elif s >= 45:
+        return "추세 불안"
+    else:
+        return "위험회피 우세"
+
+
+def compute_market_verdict_scores(overview: dict):
+    if not overview:
+        return None
+
+    mkt_score, _, _ = compute_market_score(overview)
+    macro_0_100 = _clamp((mkt_score + 8) / 16 * 100)
+
+    etfs = overview.get("etfs", []) or []
+    etf_chgs = [e.get("chg_pct") for e in etfs if e.get("chg_pct") is not None]
+    if etf_chgs:
+        avg_etf = float(np.mean(etf_chgs))
+        etf_0_100 = _clamp(50 + avg_etf * 20)
+    else:
+        etf_0_100 = 50.0
+
+    idx = overview.get("indexes", {}) or {}
+    ixic = idx.get("nasdaq", {}) or {}
+    gspc = idx.get("sp500", {}) or {}
+    idx_chgs = [v for v in [ixic.get("chg_pct"), gspc.get("chg_pct")] if v is not None]
+    if idx_chgs:
+        avg_idx = float(np.mean(idx_chgs))
+        index_0_100 = _clamp(50 + avg_idx * 20)
+    else:
+        fut = overview.get("futures", {}) or {}
+        nas_f = (fut.get("nasdaq", {}) or {}).get("chg_pct")
+        if nas_f is not None:
+            index_0_100 = _clamp(50 + float(nas_f) * 18)
+        else:
+            index_0_100 = 50.0
+
+    bt = overview.get("bigtech", {}) or {}
+    bt_score = bt.get("score", 0)
+    n = max(1, len(BIGTECH_LIST))
+    leader_0_100 = _clamp(50 + (float(bt_score) / n) * 30)
+
+    line_macro = f"세계지표: {score_to_text(macro_0_100)}"
+
+    etf_text = score_to_text(etf_0_100)
+    if etf_0_100 >= 65:
+        etf_text = f"{etf_text} (정규장 확인 필요)"
+    elif etf_0_100 < 50:
+        etf_text = f"{etf_text} (리스크 경계)"
+    else:
+        etf_text = f"{etf_text} (대기)"
+    line_etf = f"ETF 선행: {etf_text}"
+
+    idx_text = score_to_text(index_0_100)
+    if 52 <= index_0_100 < 60:
+        idx_text = "반등 시도 중이나 추세 불안"
+    elif 45 <= index_0_100 < 52:
+        idx_text = "추세 불안"
+    line_index = f"지수 점수: {idx_text}"
+
+    leader_text = score_to_text(leader_0_100)
+    if 58 <= leader_0_100 < 68:
+        leader_text = "상단 부담"
+    elif 52 <= leader_0_100 < 58:
+        leader_text = "힘 부족"
+    elif leader_0_100 < 52:
+        leader_text = "주도력 상실"
+    elif leader_0_100 >= 68:
+        leader_text = "주도력 확실"
+    line_leader = f"빅테크: {leader_text}"
+
+    if macro_0_100 < 45:
+        conclusion = "신규진입 불리"
+        holder_line = "보유자는 방어적 대응"
+    elif (index_0_100 < 52) or (leader_0_100 < 52):
+        conclusion = "신규진입 신중"
+        holder_line = "보유자는 단기 반등까지만 대응"
+    elif (macro_0_100 >= 60) and (index_0_100 >= 60) and (leader_0_100 >= 58):
+        conclusion = "신규진입 가능"
+        holder_line = "보유자는 추세 추종 가능"
+    else:
+        conclusion = "선별적 접근"
+        holder_line = "보유자는 분할 대응"
+
+    return {
+        "macro": macro_0_100,
+        "etf": etf_0_100,
+        "index": index_0_100,
+        "leader": leader_0_100,
+        "lines": [line_macro, line_etf, line_index, line_leader],
+        "conclusion": conclusion,
+        "holder_line": holder_line,
+    }
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+
+from app_core.market import (
+    BIGTECH_LIST,
+    DXY_SYMBOL,
+    ETF_LIST,
+    FUTURES_LIST,
+    INDEX_LIST,
+    SECTOR_ETF_LIST,
+    TNX_SYMBOL,
+    overview_symbols,
+)
+
+# =====================================
+# 시장 점수 / 판독 히스토리
+# - 개요 종목 일봉(로컬 저장소)으로 날짜별 '전일 종가 대비' 등락을 만들고
+#   compute_market_score / compute_market_verdict_scores와 같은 규칙을 날짜 축 전체에 한 번에 적용
+# - 과거 일봉은 정규장 종가뿐 → ETF는 항상 '정규장 기준' (프리/애프터 값은 재현 불가)
+# =====================================
+MARKET_LABELS = [
+    "🚀 강한 Risk-on (상승장 상단 구간)",
+    "😊 약한 Risk-on ~ 우상향 기대",
+    "😐 중립/혼조 (방향 모호)",
+    "⚠ 약한 Risk-off (조정/변동성 주의)",
+    "🧨 강한 Risk-off (공포장 가능성)",
+]
+
+
+def _naive_dates(idx):
+    if getattr(idx, "tz", None) is not None:
+        idx = idx.tz_localize(None)
+    return idx.normalize()
+
+
+def closes_table(frames: dict, calendar_symbol: str = None):
+    """
+    {symbol: 일봉} → 종가 표 (행=날짜, 열=종목)
+    - 날짜 축은 calendar_symbol(기본: S&P500 지수)의 거래일, 다른 종목은 그 날짜까지의 마지막 종가
+    """
+    series = {
+        sym: pd.Series(df["Close"].to_numpy(dtype=float), index=_naive_dates(df.index))
+        for sym, df in frames.items()
+        if df is not None and not df.empty
+    }
+    if not series:
+        return pd.DataFrame()
+    table = pd.DataFrame(series).sort_index()
+    table = table[~table.index.duplicated(keep="last")]
+    calendar_symbol = calendar_symbol or dict(INDEX_LIST)["sp500"]
+    if calendar_symbol in series:
+        table = table.ffill()
+        table = table.loc[table.index.isin(series[calendar_symbol].index)]
+    return table
+
+
+def _col(table: pd.DataFrame, sym: str):
+    if sym in table.columns:
+        return table[sym].to_numpy(dtype=float)
+    return np.full(len(table), np.nan)
+
+
+def _chg_pct(table: pd.DataFrame, sym: str):
+    # last_change_from_quote: (종가 - 전일 종가) / 전일 종가 × 100
+    c = _col(table, sym)
+    prev = np.concatenate([[np.nan], c[:-1]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (c - prev) / prev * 100
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def _step_score(x, up_strong, up, down_strong, down, strong_pts=2, pts=1):
+    """
+    compute_market_score의 if/elif 계단 (NaN은 0점)
+    """
+    return np.select(
+        [x >= up_strong, x >= up, x <= down_strong, x <= down],
+        [strong_pts, pts, -strong_pts, -pts],
+        default=0,
+    )
+
+
+def _count_score(chgs, up, down):
+    # 빅테크/섹터 레이어: 종목마다 +1 / -1
+    score = np.zeros(chgs.shape[0], dtype=int)
+    with np.errstate(invalid="ignore"):
+        score += (chgs >= up).sum(axis=1)
+        score -= (chgs <= down).sum(axis=1)
+    return score
+
+
+def _score_text(x):
+    # score_to_text
+    return np.select(
+        [x >= 70, x >= 65, x >= 52, x >= 45],
+        ["위험선호 우세", "양호", "반등 시도", "추세 불안"],
+        default="위험회피 우세",
+    )
+
+
+def market_history(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    종가 표 → 날짜별 market_score / label / macro / etf / index / leader / conclusion / holder_line (+ 각 레이어 점수)
+    """
+    if table.empty:
+        return pd.DataFrame()
+
+    with np.errstate(invalid="ignore"):
+        # ---- compute_market_score ----
+        nas_fut = _chg_pct(table, dict(FUTURES_LIST)["nasdaq"])
+        us10y = _col(table, TNX_SYMBOL) / 10.0
+        dxy = _col(table, DXY_SYMBOL)
+        etf_chg = np.column_stack([_chg_pct(table, sym) for sym, _ in ETF_LIST])
+
+        score = _step_score(nas_fut, 1.0, 0.3, -1.0, -0.3)
+        score = score + np.select(
+            [np.isnan(us10y), us10y < 4.0, us10y < 4.2, us10y > 4.4],
+            [0, 2, 1, -2],
+            default=-1,
+        )
+        score = score + np.select([dxy < 104, dxy > 106], [1, -1], default=0)
+        score = score + _count_score(etf_chg, 0.5, -0.5)
+
+        label_idx = np.select([score >= 5, score >= 2, score >= -1, score >= -4], [0, 1, 2, 3], default=4)
+
+        # ---- compute_market_verdict_scores ----
+        macro = np.clip((score + 8) / 16 * 100, 0.0, 100.0)
+
+        etf_n = (~np.isnan(etf_chg)).sum(axis=1)
+        etf_avg = np.nansum(etf_chg, axis=1) / np.maximum(etf_n, 1)
+        etf = np.where(etf_n > 0, np.clip(50 + etf_avg * 20, 0.0, 100.0), 50.0)
+
+        idx_chg = np.column_stack([_chg_pct(table, sym) for _, sym in INDEX_LIST])
+        idx_n = (~np.isnan(idx_chg)).sum(axis=1)
+        idx_avg = np.nansum(idx_chg, axis=1) / np.maximum(idx_n, 1)
+        index = np.where(
+            idx_n > 0,
+            np.clip(50 + idx_avg * 20, 0.0, 100.0),
+            np.where(np.isnan(nas_fut), 50.0, np.clip(50 + nas_fut * 18, 0.0, 100.0)),
+        )
+
+        bt_chg = np.column_stack([_chg_pct(table, sym) for sym, _ in BIGTECH_LIST])
+        bigtech_score = _count_score(bt_chg, 1.0, -1.0)
+        leader = np.clip(50 + (bigtech_score / max(1, len(BIGTECH_LIST))) * 30, 0.0, 100.0)
+
+        sec_chg = np.column_stack([_chg_pct(table, sym) for _, sym in SECTOR_ETF_LIST])
+        sector_score = _count_score(sec_chg, 0.8, -0.8)
+
+        cond = [
+            macro < 45,
+            (index < 52) | (leader < 52),
+            (macro >= 60) & (index >= 60) & (leader >= 58),
+        ]
+        conclusion = np.select(cond, ["신규진입 불리", "신규진입 신중", "신규진입 가능"], default="선별적 접근")
+        holder_line = np.select(
+            cond,
+            ["보유자는 방어적 대응", "보유자는 단기 반등까지만 대응", "보유자는 추세 추종 가능"],
+            default="보유자는 분할 대응",
+        )
+
+    return pd.DataFrame({
+        "market_score": score.astype(int),
+        "label": np.asarray(MARKET_LABELS, dtype=object)[label_idx],
+        "macro": macro,
+        "etf": etf,
+        "index": index,
+        "leader": leader,
+        "macro_text": _score_text(macro),
+        "conclusion": conclusion,
+        "holder_line": holder_line,
+        "bigtech_score": bigtech_score,
+        "sector_score": sector_score,
+        "us10y": us10y,
+        "dxy": dxy,
+    }, index=table.index)
+
+
+def load_market_history(load_many, period: str = "1y") -> pd.DataFrame:
+    """
+    load_many(symbols, period) → {symbol: 일봉} (예: PriceStore.get_daily_many) 로 개요 종목을 받아 히스토리 계산
+    - 첫 행(전일 종가 없음)은 제외
+    """
+    frames = load_many(overview_symbols(), period)
+    hist = market_history(closes_table(frames))
+    return hist.iloc[1:]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app_core.store import PriceStore
+
+    parser = argparse.ArgumentParser(description="시장 점수/판독 히스토리 (로컬 일봉 저장소 기준)")
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--out", default=None, help="CSV 경로")
+    args = parser.parse_args()
+
+    hist = load_market_history(PriceStore().get_daily_many, args.period)
+    if args.out:
+        hist.to_csv(args.out, encoding="utf-8-sig")
+    pd.set_option("display.width", 200)
+    print(hist[["market_score", "macro", "etf", "index", "leader", "conclusion"]].tail(20).round(1).to_string())
+    print()
+    print(hist["conclusion"].value_counts().to_string())
@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app_core.indicators import INDICATOR_COLUMNS
+from app_core.providers import OHLCV_COLUMNS
+
+# =====================================
+# 패널(종목 N × 일자 T) 벡터화 지표 계산
+# - 각 종목의 최근 T봉을 '오른쪽 정렬'해서 (T, N) 배열로 만듦 (앞쪽은 NaN 패딩)
+#   → 열마다 자기 봉 순서대로 계산되므로 종목별 add_indicators와 같은 결과
+# =====================================
+
+
+def build_panel(frames: dict, max_bars: int = None):
+    """
+    {symbol: OHLCV DataFrame} → {"symbols", "dates"(T,N), "Open".."Volume"(T,N)}
+    """
+    frames = {s: f for s, f in frames.items() if f is not None and not f.empty}
+    symbols = list(frames)
+    if not symbols:
+        return {"symbols": [], "dates": np.empty((0, 0), dtype="datetime64[ns]"), **{c: np.empty((0, 0)) for c in OHLCV_COLUMNS}}
+    T = max(len(f) for f in frames.values())
+    if max_bars is not None:
+        T = min(T, max_bars)
+    N = len(symbols)
+
+    panel = {"symbols": symbols, "dates": np.full((T, N), np.datetime64("NaT"), dtype="datetime64[ns]")}
+    for c in OHLCV_COLUMNS:
+        panel[c] = np.full((T, N), np.nan)
+    for j, sym in enumerate(symbols):
+        f = frames[sym].tail(T)
+        n = len(f)
+        idx = f.index
+        if getattr(idx, "tz", None) is not None:
+            idx = idx.tz_localize(None)
+        panel["dates"][T - n:, j] = idx.values.astype("datetime64[ns]")
+        for c in OHLCV_COLUMNS:
+            panel[c][T - n:, j] = f[c].to_numpy(dtype=float)
+    return panel
+
+
+def _rolling(x: np.ndarray, window: int, fn: str):
+    out = np.full_like(x, np.nan)
+    if x.shape[0] < window:
+        return out
+    win = sliding_window_view(x, window, axis=0)
+    if fn == "mean":
+        out[window - 1:] = win.mean(axis=-1)
+    elif fn == "std":
+        out[window - 1:] = win.std(axis=-1, ddof=1)
+    elif fn == "min":
+        out[window - 1:] = win.min(axis=-1)
+    elif fn == "max":
+        out[window - 1:] = win.max(axis=-1)
+    return out
+
+
+def _ema(x: np.ndarray, alpha: float):
+    # pandas ewm(adjust=False): 열마다 첫 유효값에서 시작, NaN 구간은 직전 값 유지
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1], np.nan)
+    for t in range(x.shape[0]):
+        xt = x[t]
+        nxt = alpha * xt + (1 - alpha) * prev
+        prev = np.where(np.isnan(prev), xt, np.where(np.isnan(xt), prev, nxt))
+        out[t] = prev
+    return out
+
+
+def panel_indicators(panel: dict):
+    """
+    add_indicators와 같은 컬럼을 (T, N) 배열로 추가해서 panel 반환
+    """
+    close = panel["Close"]
+    high = panel["High"]
+    low = panel["Low"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        panel["MA5"] = _rolling(close, 5, "mean")
+
+        ma20 = _rolling(close, 20, "mean")
+        std20 = _rolling(close, 20, "std")
+        panel["MA20"] = ma20
+        panel["BBL"] = ma20 - 2 * std20
+        panel["BBU"] = ma20 + 2 * std20
+
+        ema12 = _ema(close, 2 / (12 + 1))
+        ema26 = _ema(close, 2 / (26 + 1))
+        panel["MACD"] = ema12 - ema26
+        panel["MACD_SIGNAL"] = _ema(panel["MACD"], 2 / (9 + 1))
+
+        low14 = _rolling(low, 14, "min")
+        high14 = _rolling(high, 14, "max")
+        stoch_k = (close - low14) / (high14 - low14) * 100
+        stoch_k[~np.isfinite(stoch_k)] = np.nan
+        panel["STOCH_K"] = stoch_k
+        panel["STOCH_D"] = _rolling(stoch_k, 3, "mean")
+
+        prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+        delta = close - prev_close
+        gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+        loss = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+        roll_up = _ema(gain, 1 / 14)
+        roll_down = _ema(loss, 1 / 14)
+        rs = roll_up / roll_down
+        panel["RSI14"] = 100 - (100 / (1 + rs))
+
+        panel["MA50"] = _rolling(close, 50, "mean")
+
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        panel["ATR14"] = _rolling(tr, 14, "mean")
+
+    return panel
+
+
+def valid_mask(panel: dict):
+    cols = OHLCV_COLUMNS + INDICATOR_COLUMNS
+    mask = np.ones(panel["Close"].shape, dtype=bool)
+    for c in cols:
+        mask &= ~np.isnan(panel[c])
+    return mask
+
+
+def panel_last_rows(panel: dict):
+    """
+    종목별 add_indicators(df).iloc[-1]에 해당하는 행 → {symbol: pd.Series}
+    """
+    if not panel["symbols"]:
+        return {}
+    mask = valid_mask(panel)
+    T = mask.shape[0]
+    cols = OHLCV_COLUMNS + INDICATOR_COLUMNS
+    has_any = mask.any(axis=0)
+    last_idx = T - 1 - np.argmax(mask[::-1], axis=0)
+    out = {}
+    for j, sym in enumerate(panel["symbols"]):
+        if not has_any[j]:
+            continue
+        t = last_idx[j]
+        out[sym] = pd.Series({c: float(panel[c][t, j]) for c in cols}, name=pd.Timestamp(panel["dates"][t, j]))
+    return out
+
+
+def panel_frames(panel: dict, symbols=None):
+    """
+    종목별 add_indicators 결과(DataFrame, NaN 행 제거)로 풀어냄
+    """
+    mask = valid_mask(panel)
+    cols = OHLCV_COLUMNS + INDICATOR_COLUMNS
+    wanted = set(symbols) if symbols is not None else None
+    out = {}
+    for j, sym in enumerate(panel["symbols"]):
+        if wanted is not None and sym not in wanted:
+            continue
+        rows = mask[:, j]
+        out[sym] = pd.DataFrame(
+            {c: panel[c][rows, j] for c in cols},
+            index=pd.DatetimeIndex(panel["dates"][rows, j]),
+        )
+    return out
+
+
+def add_indicators_panel(frames: dict, max_bars: int = None):
+    """
+    {symbol: OHLCV DataFrame} → 지표가 계산된 panel
+    """
+    return panel_indicators(build_panel(frames, max_bars=max_bars))
+
+
+# =====================================
+# 벤치마크: python -m app_core.panel [종목수] [일수]
+# =====================================
+def _synthetic_frames(n_symbols: int, n_days: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2020-01-01", periods=n_days, tz="America/New_York")
+    frames = {}
+    for i in range(n_symbols):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        high = close * (1 + rng.uniform(0, 0.02, n_days))
+        low = close * (1 - rng.uniform(0, 0.02, n_days))
+        frames[f"S{i:04d}"] = pd.DataFrame({
+            "Open": (high + low) / 2,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": rng.uniform(1e5, 1e7, n_days),
+        }, index=dates)
+    return frames
+
+
+def benchmark(n_symbols: int = 500, n_days: int = 252, repeat: int = 3):
+    import time
+
+    from app_core import analysis
+
+    frames = _synthetic_frames(n_symbols, n_days)
+
+    best_loop = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        per_frame = {s: analysis.add_indicators(f.copy()).iloc[-1] for s, f in frames.items()}
+        best_loop = min(best_loop, time.perf_counter() - t0)
+
+    best_panel = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = panel_last_rows(add_indicators_panel(frames))
+        best_panel = min(best_panel, time.perf_counter() - t0)
+
+    max_diff = 0.0
+    for s, r in per_frame.items():
+        a = r[INDICATOR_COLUMNS].to_numpy(dtype=float)
+        b = rows[s][INDICATOR_COLUMNS].to_numpy(dtype=float)
+        max_diff = max(max_diff, float(np.nanmax(np.abs(a - b) / np.maximum(1.0, np.abs(a)))))
+
+    return {
+        "symbols": n_symbols,
+        "days": n_days,
+        "per_frame_sec": best_loop,
+        "panel_sec": best_panel,
+        "speedup": best_loop / best_panel if best_panel > 0 else float("inf"),
+        "max_rel_diff": max_diff,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    n_sym = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_day = int(sys.argv[2]) if len(sys.argv) > 2 else 252
+    res = benchmark(n_sym, n_day)
+    print(
+        f"{res['symbols']} symbols x {res['days']} days | "
+        f"per-frame add_indicators: {res['per_frame_sec'] * 1000:.1f} ms | "
+        f"panel: {res['panel_sec'] * 1000:.1f} ms | "
+        f"x{res['speedup']:.1f} | max rel diff {res['max_rel_diff']:.2e}"
+    )
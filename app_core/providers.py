@@ -0,0 +1,346 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+import yfinance as yf
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+FGI_URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
+
+
+def clean_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    out = df[OHLCV_COLUMNS].dropna()
+    out = out[~out.index.duplicated(keep="last")]
+    return out.sort_index()
+
+
+def normalize_quote(symbol: str, info: dict):
+    return {
+        "symbol": symbol,
+        "market_state": info.get("marketState", "") or "",
+        "regular": info.get("regularMarketPrice"),
+        "prev_close": info.get("regularMarketPreviousClose"),
+        "regular_chg_pct": info.get("regularMarketChangePercent"),
+        "pre": info.get("preMarketPrice"),
+        "pre_chg_pct": info.get("preMarketChangePercent"),
+        "post": info.get("postMarketPrice"),
+        "post_chg_pct": info.get("postMarketChangePercent"),
+    }
+
+
+def _safe_name(symbol: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._=^-]", "_", symbol)
+
+
+# =====================================
+# 시세 제공자 인터페이스
+# =====================================
+class MarketDataProvider:
+    """
+    앱이 쓰는 모든 외부 데이터 접근 지점.
+    - 실패 시 예외 대신 빈 DataFrame / None 반환 (daily_bars만 예외 허용 → 저장소가 처리)
+    """
+
+    name = "base"
+
+    def daily_bars(self, symbol: str, period: str = None, start: str = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def daily_bars_many(self, symbols, period: str = None, start: str = None) -> dict:
+        """
+        여러 종목 일봉 → {symbol: DataFrame} (기본은 종목별 호출, 제공자가 일괄 조회로 대체 가능)
+        """
+        out = {}
+        for sym in dict.fromkeys(symbols):
+            try:
+                out[sym] = self.daily_bars(sym, period=period, start=start)
+            except Exception:
+                out[sym] = clean_ohlcv(None)
+        return out
+
+    def intraday_bars(self, symbol: str, period: str = "1d", interval: str = "1m", prepost: bool = True) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def last_extended_price(self, symbol: str):
+        df = self.intraday_bars(symbol, period="1d", interval="1m", prepost=True)
+        if df.empty:
+            return None
+        return float(df["Close"].iloc[-1])
+
+    def quote(self, symbol: str):
+        raise NotImplementedError
+
+    def quote_snapshot(self, symbols, max_workers: int = 8):
+        syms = list(dict.fromkeys(symbols))
+        if not syms:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(syms)))) as ex:
+            quotes = list(ex.map(self.quote, syms))
+        return dict(zip(syms, quotes))
+
+    def fx_rate(self, pair: str = "USDKRW=X"):
+        raise NotImplementedError
+
+    def fgi(self):
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def daily_bars(self, symbol: str, period: str = None, start: str = None) -> pd.DataFrame:
+        t = yf.Ticker(symbol)
+        if start is not None:
+            df = t.history(start=start, interval="1d", auto_adjust=False)
+        else:
+            df = t.history(period=period or "6mo", interval="1d", auto_adjust=False)
+        return clean_ohlcv(df)
+
+    def daily_bars_many(self, symbols, period: str = None, start: str = None) -> dict:
+        # yf.download 한 번으로 여러 종목 (내부적으로 병렬)
+        syms = list(dict.fromkeys(symbols))
+        if not syms:
+            return {}
+        kwargs = {"start": start} if start is not None else {"period": period or "6mo"}
+        try:
+            raw = yf.download(
+                syms, interval="1d", auto_adjust=False, group_by="ticker",
+                threads=True, progress=False, **kwargs,
+            )
+        except Exception:
+            raw = None
+        out = {}
+        for sym in syms:
+            df = None
+            if raw is not None and not raw.empty:
+                if isinstance(raw.columns, pd.MultiIndex):
+                    if sym in raw.columns.get_level_values(0):
+                        df = raw[sym]
+                else:
+                    df = raw
+            out[sym] = clean_ohlcv(df)
+        return out
+
+    def intraday_bars(self, symbol: str, period: str = "1d", interval: str = "1m", prepost: bool = True) -> pd.DataFrame:
+        try:
+            df = yf.Ticker(symbol).history(period=period, interval=interval, auto_adjust=False, prepost=prepost)
+            return clean_ohlcv(df)
+        except Exception:
+            return clean_ohlcv(None)
+
+    def quote(self, symbol: str):
+        try:
+            return normalize_quote(symbol, yf.Ticker(symbol).info)
+        except Exception:
+            return None
+
+    def fx_rate(self, pair: str = "USDKRW=X"):
+        try:
+            df = yf.Ticker(pair).history(period="1d")
+            if df.empty:
+                return None
+            return float(df["Close"].iloc[-1])
+        except Exception:
+            return None
+
+    def fgi(self):
+        headers = {"User-Agent": "Mozilla/5.0"}
+        try:
+            r = requests.get(FGI_URL, headers=headers, timeout=5)
+            r.raise_for_status()
+            data = r.json()
+            series = data.get("fear_and_greed_historical", {}).get("data", [])
+            if not series:
+                return None
+            last_point = series[-1]
+            return float(last_point.get("y"))
+        except Exception:
+            return None
+
+
+# =====================================
+# 기록 재생 제공자 (네트워크 없이 벤치마크/부하 테스트용)
+# =====================================
+# 디렉터리 구조
+#   daily/<SYM>.parquet
+#   intraday/<SYM>_<interval>[_ext].parquet
+#   quotes.json  {symbol: quote}
+#   fx.json      {pair: rate}
+#   fgi.json     {"value": float | null}
+# interval/prepost 조합마다 가장 긴 구간 하나만 기록 → 더 짧은 period는 읽을 때 잘라서 반환
+INTRADAY_RECORDINGS = (("1m", "5d", True), ("5m", "5d", False))
+
+
+def _intraday_name(symbol: str, interval: str, prepost: bool) -> str:
+    return f"{_safe_name(symbol)}_{interval}{'_ext' if prepost else ''}.parquet"
+
+
+def slice_sessions(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    분봉 period("1d", "2d", "5d" …) → 마지막 N개 거래일의 봉 (yfinance 분봉 period와 같은 의미, 기록된 마지막 봉 기준)
+    """
+    m = re.fullmatch(r"(\d+)d", period or "")
+    if df.empty or m is None:
+        return df
+    days = df.index.normalize()
+    keep = days.unique()[-int(m.group(1)):]
+    return df[days.isin(keep)]
+
+
+def _read_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    기록된 스냅샷을 파일에서 읽어 그대로 돌려줌.
+    - latency_ms/jitter_ms: 호출마다 인위적 지연 (실제 네트워크 왕복 흉내)
+    - period 슬라이스는 '지금'이 아니라 기록된 마지막 봉 기준 → 결과가 항상 동일 (일봉: slice_period, 분봉: slice_sessions)
+    """
+
+    name = "replay"
+
+    def __init__(self, root: str, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.root = root
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._quotes = None
+        self._daily = {}
+
+    def _sleep(self):
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000.0)
+
+    def _load_daily(self, symbol: str) -> pd.DataFrame:
+        df = self._daily.get(symbol)
+        if df is None:
+            path = os.path.join(self.root, "daily", f"{_safe_name(symbol)}.parquet")
+            df = clean_ohlcv(pd.read_parquet(path)) if os.path.exists(path) else clean_ohlcv(None)
+            self._daily[symbol] = df
+        return df
+
+    def daily_bars(self, symbol: str, period: str = None, start: str = None) -> pd.DataFrame:
+        from app_core.store import slice_period
+
+        self._sleep()
+        df = self._load_daily(symbol)
+        if df.empty:
+            return df.copy()
+        if start is not None:
+            return df[df.index >= pd.Timestamp(start, tz=df.index.tz)].copy()
+        return slice_period(df, period or "6mo", end=df.index[-1]).copy()
+
+    def intraday_bars(self, symbol: str, period: str = "1d", interval: str = "1m", prepost: bool = True) -> pd.DataFrame:
+        self._sleep()
+        path = os.path.join(self.root, "intraday", _intraday_name(symbol, interval, prepost))
+        if not os.path.exists(path):
+            return clean_ohlcv(None)
+        return slice_sessions(clean_ohlcv(pd.read_parquet(path)), period)
+
+    def quote(self, symbol: str):
+        self._sleep()
+        if self._quotes is None:
+            self._quotes = _read_json(os.path.join(self.root, "quotes.json"), {})
+        return self._quotes.get(symbol)
+
+    def fx_rate(self, pair: str = "USDKRW=X"):
+        self._sleep()
+        return _read_json(os.path.join(self.root, "fx.json"), {}).get(pair)
+
+    def fgi(self):
+        self._sleep()
+        return _read_json(os.path.join(self.root, "fgi.json"), {}).get("value")
+
+
+def record_snapshot(provider: MarketDataProvider, root: str, symbols, quote_symbols=(), daily_period: str = "5y"):
+    """
+    provider(보통 yfinance)에서 받은 데이터를 ReplayProvider가 읽는 구조로 저장
+    """
+    os.makedirs(os.path.join(root, "daily"), exist_ok=True)
+    os.makedirs(os.path.join(root, "intraday"), exist_ok=True)
+
+    for sym in dict.fromkeys(symbols):
+        try:
+            daily = provider.daily_bars(sym, period=daily_period)
+        except Exception:
+            daily = clean_ohlcv(None)
+        if not daily.empty:
+            daily.to_parquet(os.path.join(root, "daily", f"{_safe_name(sym)}.parquet"))
+        for interval, period, prepost in INTRADAY_RECORDINGS:
+            intra = provider.intraday_bars(sym, period=period, interval=interval, prepost=prepost)
+            if not intra.empty:
+                intra.to_parquet(os.path.join(root, "intraday", _intraday_name(sym, interval, prepost)))
+
+    quotes = provider.quote_snapshot(list(quote_symbols) + list(symbols))
+    with open(os.path.join(root, "quotes.json"), "w", encoding="utf-8") as f:
+        json.dump(quotes, f, ensure_ascii=False, indent=1)
+    with open(os.path.join(root, "fx.json"), "w", encoding="utf-8") as f:
+        json.dump({"USDKRW=X": provider.fx_rate("USDKRW=X")}, f)
+    with open(os.path.join(root, "fgi.json"), "w", encoding="utf-8") as f:
+        json.dump({"value": provider.fgi()}, f)
+
+
+# =====================================
+# 기본 제공자 (프로세스 전체 공용)
+# =====================================
+_default_provider = None
+_default_provider_lock = threading.Lock()
+
+
+def get_default_provider() -> MarketDataProvider:
+    """
+    CHAN_PROVIDER=replay 이면 CHAN_REPLAY_DIR의 기록을 재생 (CHAN_REPLAY_LATENCY_MS로 지연 설정)
+    """
+    global _default_provider
+    with _default_provider_lock:
+        if _default_provider is None:
+            kind = os.getenv("CHAN_PROVIDER", "yfinance").strip().lower()
+            if kind == "replay":
+                _default_provider = ReplayProvider(
+                    os.getenv("CHAN_REPLAY_DIR", "replay"),
+                    latency_ms=float(os.getenv("CHAN_REPLAY_LATENCY_MS", "0") or 0),
+                    jitter_ms=float(os.getenv("CHAN_REPLAY_JITTER_MS", "0") or 0),
+                )
+            else:
+                _default_provider = YFinanceProvider()
+        return _default_provider
+
+
+def set_default_provider(provider: MarketDataProvider):
+    global _default_provider
+    with _default_provider_lock:
+        _default_provider = provider
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="yfinance 데이터를 재생용 스냅샷으로 기록")
+    parser.add_argument("root", help="기록 디렉터리 (CHAN_REPLAY_DIR로 재생)")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--with-overview", action="store_true", help="시장 개요 종목 시세도 함께 기록")
+    args = parser.parse_args()
+
+    quote_syms = []
+    if args.with_overview:
+        from app_core.market import overview_symbols
+
+        quote_syms = overview_symbols()
+    record_snapshot(YFinanceProvider(), args.root, args.symbols, quote_symbols=quote_syms)
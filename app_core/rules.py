@@ -0,0 +1,231 @@
+import ast
+
+import numpy as np
+
+from app_core.indicators import INDICATOR_COLUMNS
+from app_core.providers import OHLCV_COLUMNS
+
+# =====================================
+# 스캐너 규칙 식 (작은 식 언어 → NumPy 벡터 연산)
+# - 문법은 파이썬 식의 일부: 숫자, 컬럼 이름, + - * /, 비교(연쇄 허용), and/or/not, abs/min/max
+#   예) RSI14 < 60 and Close > MA20 and ATR14 / Close < 0.04
+# - 컴파일 결과는 {이름: (N,) 배열} → (N,) 배열 함수 → 유니버스 전체를 한 번에 평가
+# =====================================
+
+# 스캐너가 종목마다 채워주는 파생 값 (마지막 봉 기준)
+DERIVED_FIELDS = [
+    "buy_low", "buy_high",      # 매수 밴드 (calc_levels)
+    "tp1", "sl0",               # 1차 목표 / 스캐너 손절 (buy_low * 0.97)
+    "dist_band",                # 현재가와 매수 밴드 중심의 거리(%)
+    "bias_score",               # short_term_bias 점수 (-5 ~ +5)
+    "bias_points",              # 상방 2 / 중립 1 / 하방 0
+]
+
+FIELDS = OHLCV_COLUMNS + INDICATOR_COLUMNS + DERIVED_FIELDS
+
+
+class RuleError(ValueError):
+    pass
+
+
+def _as_bool(x):
+    return np.asarray(x).astype(bool)
+
+
+_COMPARE = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+_BINARY = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+}
+
+
+def _fn_max(*args):
+    out = args[0]
+    for a in args[1:]:
+        out = np.maximum(out, a)
+    return out
+
+
+def _fn_min(*args):
+    out = args[0]
+    for a in args[1:]:
+        out = np.minimum(out, a)
+    return out
+
+
+_FUNCTIONS = {
+    "abs": (np.abs, 1, 1),
+    "max": (_fn_max, 2, None),
+    "min": (_fn_min, 2, None),
+}
+
+
+def _compile_node(node, text: str):
+    """
+    AST 노드 → fn(ns) 클로저 (허용 목록 밖의 노드는 RuleError)
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda ns: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name not in FIELDS:
+            raise RuleError(f"알 수 없는 이름: {name} (사용 가능: {', '.join(FIELDS)})")
+        return lambda ns: ns[name]
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, text) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def _boolop(ns):
+            out = _as_bool(parts[0](ns))
+            for p in parts[1:]:
+                out = combine(out, _as_bool(p(ns)))
+            return out
+
+        return _boolop
+
+    if isinstance(node, ast.UnaryOp):
+        inner = _compile_node(node.operand, text)
+        if isinstance(node.op, ast.Not):
+            return lambda ns: np.logical_not(_as_bool(inner(ns)))
+        if isinstance(node.op, ast.USub):
+            return lambda ns: np.negative(inner(ns))
+        if isinstance(node.op, ast.UAdd):
+            return inner
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left = _compile_node(node.left, text)
+        right = _compile_node(node.right, text)
+        return lambda ns: op(left(ns), right(ns))
+
+    if isinstance(node, ast.Compare) and all(type(o) in _COMPARE for o in node.ops):
+        # a < b < c → (a < b) and (b < c)
+        operands = [_compile_node(node.left, text)] + [_compile_node(c, text) for c in node.comparators]
+        ops = [_COMPARE[type(o)] for o in node.ops]
+
+        def _compare(ns):
+            values = [f(ns) for f in operands]
+            out = ops[0](values[0], values[1])
+            for i, op in enumerate(ops[1:], start=1):
+                out = np.logical_and(out, op(values[i], values[i + 1]))
+            return out
+
+        return _compare
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        spec = _FUNCTIONS.get(node.func.id)
+        if spec is not None:
+            fn, min_args, max_args = spec
+            n = len(node.args)
+            if n < min_args or (max_args is not None and n > max_args):
+                raise RuleError(f"{node.func.id}() 인자 수가 맞지 않습니다: {n}개")
+            args = [_compile_node(a, text) for a in node.args]
+            return lambda ns: fn(*(a(ns) for a in args))
+
+    snippet = ast.get_source_segment(text, node) or type(node).__name__
+    raise RuleError(f"지원하지 않는 식: {snippet}")
+
+
+def compile_expr(text: str):
+    """
+    식 문자열 → fn(ns) (ns: {필드명: (N,) 배열}, 결과는 (N,) 배열 또는 스칼라)
+    """
+    text = (text or "").strip()
+    if not text:
+        raise RuleError("빈 식입니다.")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise RuleError(f"문법 오류: {text} ({e.msg})") from None
+    return _compile_node(tree.body, text)
+
+
+class RuleSet:
+    """
+    filters(모두 만족해야 통과) + score(통과 종목의 스코어 식)
+    - 식 문자열만 보관 (프로세스 풀로 넘겨도 되고, 같은 식이면 같은 규칙으로 비교/해시)
+    """
+
+    def __init__(self, filters=(), score: str = "0"):
+        self.filters = tuple(f.strip() for f in filters if f and f.strip())
+        self.score = (score or "0").strip()
+        self._compiled = None
+        self._compile()
+
+    def _compile(self):
+        if self._compiled is None:
+            self._compiled = ([compile_expr(f) for f in self.filters], compile_expr(self.score))
+        return self._compiled
+
+    def __getstate__(self):
+        return {"filters": self.filters, "score": self.score}
+
+    def __setstate__(self, state):
+        self.filters = state["filters"]
+        self.score = state["score"]
+        self._compiled = None
+
+    def _key(self):
+        return (self.filters, self.score)
+
+    def __eq__(self, other):
+        return isinstance(other, RuleSet) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"RuleSet(filters={list(self.filters)!r}, score={self.score!r})"
+
+    def mask(self, ns: dict, n: int):
+        filters, _ = self._compile()
+        out = np.ones(n, dtype=bool)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for f in filters:
+                out &= np.broadcast_to(_as_bool(f(ns)), (n,))
+        return out
+
+    def scores(self, ns: dict, n: int):
+        _, score = self._compile()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.broadcast_to(np.asarray(score(ns), dtype=float), (n,))
+
+    def to_text(self) -> str:
+        return "\n".join(self.filters)
+
+
+def parse_rules(filters_text: str, score_text: str = None) -> RuleSet:
+    """
+    UI 입력 → RuleSet (한 줄에 규칙 하나, '#' 뒤는 주석; score가 비면 기본 스코어 식)
+    """
+    lines = [line.split("#", 1)[0].strip() for line in (filters_text or "").splitlines()]
+    score = (score_text or "").strip() or DEFAULT_RULES.score
+    return RuleSet([line for line in lines if line], score)
+
+
+# 기존 스캐너 판정 그대로 (evaluate_indicators의 조건/스코어)
+DEFAULT_RULES = RuleSet(
+    filters=[
+        "Close >= buy_low * 0.97",
+        "Close <= buy_high * 1.05",
+        "RSI14 <= 65",
+    ],
+    score="bias_points + max(0, 3 - dist_band) + max(0, 2 - abs(RSI14 - 50) / 10)",
+)
+
+
+def rules_for(cfg: dict) -> RuleSet:
+    return cfg.get("rules") or DEFAULT_RULES
@@ -0,0 +1,136 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from app_core import scanner
+from app_core.levels import all_mode_configs
+from app_core.market import compute_market_score, fetch_quote_snapshot, load_market_overview
+from app_core.providers import get_default_provider
+from app_core.store import DEFAULT_STORE_DIR, PriceStore
+from app_core.universe import SCAN_CANDIDATES, load_universe
+
+# =====================================
+# 정기 스캔 스냅샷 (화면 없이 돌리는 작업 → 버전별 JSON 파일)
+# - <SNAPSHOT_DIR>/<유니버스>/<UTC 시각>.json, 최신 파일을 UI가 바로 읽음
+# =====================================
+SNAPSHOT_DIR = os.getenv("CHAN_SCAN_SNAPSHOT_DIR", os.path.join(DEFAULT_STORE_DIR, "scans"))
+SNAPSHOT_VERSION = 1
+
+# 기본 후보(SCAN_CANDIDATES) 스캔의 유니버스 이름
+DEFAULT_UNIVERSE = "default"
+
+
+def run_scan(universe: str = DEFAULT_UNIVERSE, provider=None, store: PriceStore = None, max_results: int = 8):
+    """
+    세 모드를 한 번에 스캔해서 스냅샷 payload(dict) 반환
+    - DEFAULT_UNIVERSE: 앱의 기본 스캐너와 같은 2단계 스캔, 그 외: universes/ 파일 일괄 스캔
+    """
+    provider = provider or get_default_provider()
+    store = store or PriceStore(provider=provider)
+    t0 = time.perf_counter()
+
+    market_score, _, _ = compute_market_score(load_market_overview(provider))
+    cfgs = all_mode_configs()
+    stats = None
+    if universe == DEFAULT_UNIVERSE:
+        by_mode, stats = scanner.scan_two_stage_modes(
+            cfgs, SCAN_CANDIDATES, store.get_daily,
+            lambda syms: fetch_quote_snapshot(syms, provider=provider),
+            max_results=max_results,
+        )
+    else:
+        by_mode = scanner.scan_universe_modes(cfgs, load_universe(universe), store.get_daily_many, max_results=max_results)
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "universe": universe,
+        "created_at": time.time(),
+        "elapsed_sec": time.perf_counter() - t0,
+        "provider": provider.name,
+        "market_score": market_score,
+        "by_mode": by_mode,
+        "stats": stats,
+    }
+
+
+def _universe_dir(universe: str, root: str) -> str:
+    return os.path.join(root, os.path.basename(universe) or DEFAULT_UNIVERSE)
+
+
+def write_snapshot(payload: dict, root: str = SNAPSHOT_DIR, keep: int = 48) -> str:
+    """
+    임시 파일에 쓴 뒤 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록), 오래된 버전은 keep개만 남김
+    """
+    folder = _universe_dir(payload["universe"], root)
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.fromtimestamp(payload["created_at"], tz=timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = os.path.join(folder, f"{stamp}.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, default=float)
+    os.replace(tmp, path)
+
+    if keep:
+        for old in _snapshot_files(folder)[:-keep]:
+            try:
+                os.remove(os.path.join(folder, old))
+            except OSError:
+                pass
+    return path
+
+
+def _snapshot_files(folder: str):
+    if not os.path.isdir(folder):
+        return []
+    return sorted(fn for fn in os.listdir(folder) if fn.endswith(".json"))
+
+
+def load_latest_snapshot(universe: str = DEFAULT_UNIVERSE, root: str = SNAPSHOT_DIR):
+    """
+    가장 최근 스냅샷 payload (없거나 버전이 다르면 None)
+    """
+    folder = _universe_dir(universe, root)
+    for fn in reversed(_snapshot_files(folder)):
+        try:
+            with open(os.path.join(folder, fn), encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if payload.get("version") == SNAPSHOT_VERSION:
+            return payload
+    return None
+
+
+def run_forever(universes, interval_sec: float = 900.0, root: str = SNAPSHOT_DIR, keep: int = 48, max_results: int = 8, once: bool = False):
+    provider = get_default_provider()
+    store = PriceStore(provider=provider)
+    while True:
+        started = time.monotonic()
+        for universe in universes:
+            try:
+                payload = run_scan(universe, provider=provider, store=store, max_results=max_results)
+            except Exception as e:
+                print(f"[scan] {universe}: 실패 ({e})", flush=True)
+                continue
+            path = write_snapshot(payload, root=root, keep=keep)
+            counts = ", ".join(f"{k} {len(v)}" for k, v in payload["by_mode"].items())
+            print(f"[scan] {universe}: {counts} · {payload['elapsed_sec']:.1f}초 → {path}", flush=True)
+        if once:
+            return
+        time.sleep(max(0.0, interval_sec - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="신규 진입 스캐너를 주기적으로 돌려 결과 스냅샷 저장")
+    parser.add_argument("universes", nargs="*", default=[DEFAULT_UNIVERSE], help=f"유니버스 이름 (기본: {DEFAULT_UNIVERSE})")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("CHAN_SCAN_INTERVAL_SEC", "900")), help="실행 간격(초)")
+    parser.add_argument("--once", action="store_true", help="한 번만 실행하고 종료")
+    parser.add_argument("--root", default=SNAPSHOT_DIR, help="스냅샷 디렉터리")
+    parser.add_argument("--keep", type=int, default=48, help="유니버스별 보관 버전 수")
+    parser.add_argument("--max-results", type=int, default=8)
+    args = parser.parse_args()
+
+    run_forever(args.universes, interval_sec=args.interval, root=args.root, keep=args.keep, max_results=args.max_results, once=args.once)
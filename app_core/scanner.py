@@ -0,0 +1,549 @@
+import heapq
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from app_core import analysis
+from app_core.cache import shared_cache
+from app_core.indicators import INDICATOR_COLUMNS
+from app_core.levels import level_param
+from app_core.panel import add_indicators_panel, valid_mask
+from app_core.providers import OHLCV_COLUMNS
+from app_core.rules import DEFAULT_RULES, rules_for
+from app_core.store import longest_period, slice_period
+
+# =====================================
+# 신규 진입 스캐너 (A안: 심플)
+# - 조회는 I/O 풀, 지표/레벨 계산은 계산 풀 → 전체 시간은 가장 느린 조회 1건 수준
+# - 여러 모드(단타/스윙/장기)를 한 번에: 가장 긴 구간만 조회하고 모드별로 잘라서 판정
+# =====================================
+
+
+def evaluate_candidate(sym: str, df, cfg: dict):
+    """
+    종목 1개 판정: 조건 미달이면 None, 통과하면 결과 dict
+    """
+    if df is None or df.empty:
+        return None
+    return evaluate_indicators(sym, analysis.add_indicators(df), cfg)
+
+
+def evaluate_indicators(sym: str, df, cfg: dict):
+    """
+    evaluate_candidate의 판정부 (add_indicators가 이미 적용된 df)
+    - 판정은 cfg["rules"] (없으면 기본 규칙)을 종목 1개짜리 패널에 적용 → screen_panel과 같은 경로
+    """
+    if df.empty or len(df) < max(30, cfg["lookback_long"] + 5):
+        return None
+    span = max(cfg["lookback_short"], cfg["lookback_long"])
+    results = _screen(_frame_panel(sym, df.tail(span)), cfg, np.ones(1, dtype=bool))
+    return results[0] if results else None
+
+
+def mode_view(df, cfg: dict):
+    """
+    가장 긴 구간으로 받은 일봉에서 cfg 모드의 구간만 (get_daily(symbol, cfg["period"])와 같은 행)
+    """
+    return slice_period(df, cfg["period"]).copy()
+
+
+def _evaluate_modes(sym: str, df, cfgs):
+    """
+    모드별 evaluate_candidate + 1단계 사전필터용 마지막 지표값(첫 모드 기준)
+    - 프로세스 풀에서도 결과로 돌려받도록 ({모드명: 결과}, snapshot) 반환
+    """
+    items, snapshot = {}, None
+    if df is None or df.empty:
+        return items, snapshot
+    for cfg in cfgs:
+        view = analysis.add_indicators(mode_view(df, cfg))
+        if view.empty:
+            items[cfg["name"]] = None
+            continue
+        if snapshot is None:
+            snapshot = indicator_snapshot(view.iloc[-1])
+        items[cfg["name"]] = evaluate_indicators(sym, view, cfg)
+    return items, snapshot
+
+
+# =====================================
+# 증분 재스캔: 종목×모드별 (데이터 지문, 판정 결과) 기억 → 데이터가 그대로면 재계산 없이 재사용
+# =====================================
+SCAN_RESULT_NAMESPACE = "scan_results"
+
+
+def data_fingerprint(df):
+    """
+    모드 구간의 봉 수 + 첫/마지막 봉 시각 + 마지막 봉 값 (새 봉, 장중 갱신, 구간 시작 이동을 모두 구분)
+    """
+    if df is None or df.empty:
+        return None
+    last = df.iloc[-1]
+    return (len(df), df.index[0].value, df.index[-1].value) + tuple(float(last[c]) for c in OHLCV_COLUMNS)
+
+
+def _result_key(sym: str, cfg: dict):
+    return (sym, tuple(sorted(cfg.items())))
+
+
+def cached_result(sym: str, fingerprint, cfg: dict, cache=shared_cache):
+    """
+    (hit 여부, 결과 dict 또는 None)
+    """
+    if fingerprint is None:
+        return False, None
+    hit, entry = cache.get(SCAN_RESULT_NAMESPACE, _result_key(sym, cfg))
+    if hit and entry[0] == fingerprint:
+        return True, entry[1]
+    return False, None
+
+
+def remember_result(sym: str, fingerprint, cfg: dict, item, cache=shared_cache):
+    if fingerprint is not None:
+        cache.set(SCAN_RESULT_NAMESPACE, _result_key(sym, cfg), (fingerprint, item))
+
+
+def rank_results(results, symbols, max_results: int = 8):
+    # 점수 내림차순, 동점은 후보 목록 순서 (완료 순서와 무관하게 항상 같은 순위)
+    order = {s: i for i, s in enumerate(symbols)}
+    ranked = sorted(results, key=lambda x: (-x["score"], order.get(x["symbol"], len(order))))
+    return ranked[:max_results]
+
+
+class TopK:
+    """
+    상위 k개만 유지하는 힙 (rank_results와 같은 순위 규칙)
+    """
+
+    def __init__(self, k: int, symbols):
+        self.k = max(0, k)
+        self._order = {s: i for i, s in enumerate(symbols)}
+        self._heap = []
+        self.pushed = 0
+
+    def _key(self, item):
+        # 최소 힙의 루트 = 현재 k개 중 가장 약한 항목
+        return (item["score"], -self._order.get(item["symbol"], len(self._order)))
+
+    def push(self, item):
+        self.pushed += 1
+        if self.k == 0:
+            return
+        entry = (self._key(item), self.pushed, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self):
+        return [e[2] for e in sorted(self._heap, key=lambda e: e[0], reverse=True)]
+
+
+def scan_candidates(cfg: dict, symbols, fetch, max_results: int = 8, **kwargs):
+    """
+    fetch(symbol, period) → OHLCV DataFrame
+    - kwargs는 scan_candidates_modes와 같음
+    """
+    return scan_candidates_modes([cfg], symbols, fetch, max_results=max_results, **kwargs)[cfg["name"]]
+
+
+def scan_candidates_modes(
+    cfgs,
+    symbols,
+    fetch,
+    max_results: int = 8,
+    io_workers: int = 8,
+    compute_workers: int = 4,
+    compute_executor=None,
+    on_progress=None,
+    cancel_event=None,
+    stats: dict = None,
+):
+    """
+    종목마다 가장 긴 구간을 한 번만 조회해서 cfgs의 모든 모드를 판정 → {모드명: 상위 k 목록}
+    - compute_executor: 계산 풀 직접 지정 (예: ProcessPoolExecutor). 없으면 스레드 풀
+    - on_progress(첫 모드의 현재 상위 k 목록, 완료 수, 전체 수): 종목 하나 끝날 때마다 호출 스레드에서 호출
+    - cancel_event(threading.Event)가 set 되면 남은 작업을 버리고 지금까지의 상위 k 반환 (다른 스레드에서 중단할 때)
+    - on_progress에서 예외가 나면(Streamlit rerun 등) 남은 작업을 취소하고 그대로 전파
+    - stats: 주면 evaluated/passed(첫 모드)/passed_by_mode/reused/cancelled를 채움
+    - 지난 스캔과 데이터 지문이 같은 종목×모드는 계산 없이 기억된 결과 재사용 (reused = 재사용한 종목×모드 수)
+    """
+    cfgs = list(cfgs)
+    symbols = list(dict.fromkeys(symbols))
+    tops = {cfg["name"]: TopK(max_results, symbols) for cfg in cfgs}
+    primary = tops[cfgs[0]["name"]]
+    period = longest_period(cfg["period"] for cfg in cfgs)
+    total = len(symbols)
+    done = 0
+    reused = 0
+    cancelled = False
+    if not symbols:
+        return {name: [] for name in tops}
+
+    def _fetch(sym):
+        try:
+            return fetch(sym, period)
+        except Exception:
+            return None
+
+    own_compute = compute_executor is None
+    if own_compute:
+        compute_executor = ThreadPoolExecutor(max_workers=max(1, compute_workers))
+    io_pool = ThreadPoolExecutor(max_workers=max(1, min(io_workers, len(symbols))))
+
+    pending = {}
+    try:
+        for sym in symbols:
+            pending[io_pool.submit(_fetch, sym)] = ("fetch", sym)
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+            finished, _ = wait(list(pending), timeout=0.2, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                kind, sym, *ctx = pending.pop(fut)
+                if kind == "fetch":
+                    df = fut.result()
+                    items = {}
+                    if df is not None and not df.empty:
+                        fingerprints = {cfg["name"]: data_fingerprint(mode_view(df, cfg)) for cfg in cfgs}
+                        todo = []
+                        for cfg in cfgs:
+                            hit, item = cached_result(sym, fingerprints[cfg["name"]], cfg)
+                            if hit:
+                                items[cfg["name"]] = item
+                                reused += 1
+                            else:
+                                todo.append(cfg)
+                        if todo:
+                            fut2 = compute_executor.submit(_evaluate_modes, sym, df, todo)
+                            pending[fut2] = ("compute", sym, items, fingerprints, todo)
+                            continue
+                else:
+                    items, fingerprints, todo = ctx
+                    try:
+                        computed, snapshot = fut.result()
+                    except Exception:
+                        computed, snapshot = {}, None
+                    if snapshot is not None:
+                        remember_indicators(sym, snapshot)
+                    for cfg in todo:
+                        if cfg["name"] in computed:
+                            remember_result(sym, fingerprints[cfg["name"]], cfg, computed[cfg["name"]])
+                    items.update(computed)
+                for name, item in items.items():
+                    if item is not None:
+                        tops[name].push(item)
+                done += 1
+                if on_progress is not None:
+                    on_progress(primary.ranked(), done, total)
+    finally:
+        for fut in pending:
+            fut.cancel()
+        io_pool.shutdown(wait=not pending, cancel_futures=True)
+        if own_compute:
+            compute_executor.shutdown(wait=not pending, cancel_futures=True)
+
+    if stats is not None:
+        stats.update({
+            "evaluated": done,
+            "passed": primary.pushed,
+            "passed_by_mode": {name: top.pushed for name, top in tops.items()},
+            "reused": reused,
+            "cancelled": cancelled,
+        })
+    return {name: top.ranked() for name, top in tops.items()}
+
+
+# =====================================
+# 2단계 스캔: 1단계 = 시세 스냅샷 + 마지막 지표값으로 뻔한 탈락 제거, 2단계 = 생존 종목만 전체 계산
+# =====================================
+LAST_INDICATOR_NAMESPACE = "last_indicators"
+
+
+def indicator_snapshot(last_row):
+    return {
+        "Close": float(last_row["Close"]),
+        "MA20": float(last_row["MA20"]),
+        "BBL": float(last_row["BBL"]),
+        "RSI14": float(last_row["RSI14"]),
+    }
+
+
+def remember_indicators(sym: str, snapshot: dict, cache=shared_cache):
+    cache.set(LAST_INDICATOR_NAMESPACE, sym, snapshot)
+
+
+def prefilter_by_quotes(symbols, quotes: dict, cache=shared_cache, price_margin: float = 0.03, rsi_margin: float = 5.0):
+    """
+    (생존 종목, 제거 종목, 판단 불가로 통과시킨 종목 수)
+    - 현재가를 마지막 MA20/BBL 기준 매수 밴드에 대입, 밴드 허용폭보다 price_margin 이상 벗어나면 제거
+    - 마지막 RSI가 65 + rsi_margin 초과이고 그 뒤로 가격이 내려오지 않았으면 제거
+    - 시세나 지표 캐시가 없으면 판단하지 않고 2단계로 넘김
+    """
+    survivors, removed, unknown = [], [], 0
+    for sym in symbols:
+        quote = quotes.get(sym) or {}
+        price = quote.get("regular")
+        hit, snap = cache.get(LAST_INDICATOR_NAMESPACE, sym)
+        if price is None or not hit:
+            survivors.append(sym)
+            unknown += 1
+            continue
+        price = float(price)
+        if price > snap["MA20"]:
+            buy_low, buy_high = snap["MA20"] * 0.98, snap["MA20"] * 1.01
+        else:
+            buy_low, buy_high = snap["BBL"] * 0.98, snap["BBL"] * 1.02
+        if price < buy_low * 0.97 * (1 - price_margin) or price > buy_high * 1.05 * (1 + price_margin):
+            removed.append(sym)
+            continue
+        if snap["RSI14"] > 65 + rsi_margin and price >= snap["Close"]:
+            removed.append(sym)
+            continue
+        survivors.append(sym)
+    return survivors, removed, unknown
+
+
+def scan_two_stage(cfg: dict, symbols, fetch, quote_snapshot, max_results: int = 8, **scan_kwargs):
+    """
+    quote_snapshot(symbols) → {symbol: quote}
+    반환: (결과, 단계별 통계)
+    """
+    ranked, stats = scan_two_stage_modes([cfg], symbols, fetch, quote_snapshot, max_results=max_results, **scan_kwargs)
+    return ranked[cfg["name"]], stats
+
+
+def scan_two_stage_modes(cfgs, symbols, fetch, quote_snapshot, max_results: int = 8, **scan_kwargs):
+    """
+    scan_two_stage의 여러 모드 버전 → ({모드명: 결과}, 단계별 통계)
+    - 1단계 매수 밴드(MA20/BBL 기준)는 모드와 무관하므로 사전필터는 한 번만
+    - 1단계는 기본 규칙 전제 → 사용자 규칙이 섞이면 건너뛰고 전부 2단계로
+    """
+    symbols = list(dict.fromkeys(symbols))
+    t0 = time.perf_counter()
+    if all(rules_for(cfg) == DEFAULT_RULES for cfg in cfgs):
+        try:
+            quotes = quote_snapshot(symbols)
+        except Exception:
+            quotes = {}
+        survivors, removed, unknown = prefilter_by_quotes(symbols, quotes)
+    else:
+        survivors, removed, unknown = symbols, [], len(symbols)
+    t1 = time.perf_counter()
+
+    stage2 = {}
+    ranked = scan_candidates_modes(cfgs, survivors, fetch, max_results=max_results, stats=stage2, **scan_kwargs)
+    t2 = time.perf_counter()
+
+    stats = {
+        "universe": len(symbols),
+        "stage1_removed": len(removed),
+        "stage1_unknown": unknown,
+        "stage2_evaluated": stage2.get("evaluated", 0),
+        "stage2_removed": stage2.get("evaluated", 0) - stage2.get("passed", 0),
+        "passed": stage2.get("passed", 0),
+        "stage2_reused": stage2.get("reused", 0),
+        "cancelled": stage2.get("cancelled", False),
+        "stage1_sec": t1 - t0,
+        "stage2_sec": t2 - t1,
+    }
+    return ranked, stats
+
+
+# =====================================
+# 대형 유니버스 스캔 (수천 종목)
+# - 메모리 예산에 맞춘 배치 단위로 일괄 조회 → 패널 지표 → 벡터화 판정
+# =====================================
+_PERIOD_BARS = {"3mo": 66, "6mo": 130, "1y": 255, "2y": 510, "5y": 1265}
+_PANEL_FIELDS = len(OHLCV_COLUMNS) + len(INDICATOR_COLUMNS) + 1
+
+
+def batch_size_for_budget(period: str, memory_budget_mb: float = 256, overhead: float = 4.0, max_batch: int = 500):
+    """
+    종목 1개가 차지하는 패널 메모리(임시 배열 포함 추정) 기준 배치 크기
+    """
+    bars = _PERIOD_BARS.get(period, 260)
+    per_symbol = bars * _PANEL_FIELDS * 8 * overhead
+    return max(1, min(max_batch, int(memory_budget_mb * 1024 * 1024 // per_symbol)))
+
+
+def _frame_panel(sym: str, df):
+    # 지표가 계산된 DataFrame 1개 → 종목 1개짜리 패널
+    panel = {"symbols": [sym]}
+    for c in OHLCV_COLUMNS + INDICATOR_COLUMNS:
+        panel[c] = df[c].to_numpy(dtype=float)[:, None]
+    return panel
+
+
+def panel_namespace(panel: dict, cfg: dict):
+    """
+    규칙 식에서 쓰는 이름 → (N,) 배열 (마지막 봉 값 + calc_levels/short_term_bias와 같은 파생 값)
+    """
+    ns = {c: panel[c][-1] for c in OHLCV_COLUMNS + INDICATOR_COLUMNS}
+    price = ns["Close"]
+    ma20 = ns["MA20"]
+    bbl = ns["BBL"]
+    bbu = ns["BBU"]
+    rsi = ns["RSI14"]
+    k = ns["STOCH_K"]
+    d = ns["STOCH_D"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        above = price > ma20
+        buy_low = np.where(above, ma20 * 0.98, bbl * 0.98)
+        buy_high = np.where(above, ma20 * 1.01, bbl * 1.02)
+
+        swing_high = np.max(panel["High"][-cfg["lookback_short"]:], axis=0)
+        box_high = np.max(panel["High"][-cfg["lookback_long"]:], axis=0)
+        base_res = np.maximum(swing_high * level_param(cfg, "res_swing_mult"), box_high * level_param(cfg, "res_box_mult"))
+        base_res = np.where(np.isnan(bbu), base_res, np.maximum(base_res, bbu * level_param(cfg, "res_bbu_mult")))
+        tp1 = np.where(base_res <= price, price * level_param(cfg, "breakout_mult"), base_res)
+
+        band_center = (buy_low + buy_high) / 2
+        dist_band_pct = np.abs(price - band_center) / price * 100
+
+        bias_score = (
+            np.where(price > ma20, 1, -1)
+            + np.where(price > ns["MA5"], 1, -1)
+            + np.where(ns["MACD"] > ns["MACD_SIGNAL"], 1, -1)
+            + np.where(rsi > 60, 1, np.where(rsi < 40, -1, 0))
+            + np.where((k > d) & (k > 50), 1, np.where((k < d) & (k < 50), -1, 0))
+        )
+
+    ns.update({
+        "buy_low": buy_low,
+        "buy_high": buy_high,
+        "tp1": tp1,
+        "sl0": buy_low * 0.97,
+        "dist_band": dist_band_pct,
+        "bias_score": bias_score.astype(float),
+        "bias_points": np.where(bias_score >= 3, 2.0, np.where(bias_score <= -3, 0.0, 1.0)),
+    })
+    return ns
+
+
+def _screen(panel: dict, cfg: dict, exact):
+    symbols = panel["symbols"]
+    ns = panel_namespace(panel, cfg)
+    rules = rules_for(cfg)
+    keep = exact & rules.mask(ns, len(symbols))
+    score = rules.scores(ns, len(symbols))
+
+    results = []
+    for j in np.flatnonzero(keep):
+        p = float(ns["Close"][j])
+        rr = analysis.calc_rr_ratio(p, float(ns["tp1"][j]), float(ns["sl0"][j]))
+        results.append({
+            "symbol": symbols[j],
+            "price": p,
+            "rsi": float(ns["RSI14"][j]),
+            "bias": analysis.bias_label(int(ns["bias_score"][j])),
+            "dist_band": float(ns["dist_band"][j]),
+            "buy_low": float(ns["buy_low"][j]),
+            "buy_high": float(ns["buy_high"][j]),
+            "tp1": float(ns["tp1"][j]),
+            "sl0": float(ns["sl0"][j]),
+            "rr": rr,
+            "score": float(score[j]),
+        })
+    return results
+
+
+def screen_panel(panel: dict, cfg: dict, frames: dict = None):
+    """
+    evaluate_candidate와 같은 판정(cfg["rules"])을 패널 전체에 한 번에 적용 → 결과 dict 목록
+    - 마지막 봉이나 lookback 구간에 NaN이 낀 드문 종목은 frames로 종목별 판정
+    """
+    symbols = panel["symbols"]
+    if not symbols:
+        return []
+    mask = valid_mask(panel)
+    need = max(30, cfg["lookback_long"] + 5)
+    span = max(cfg["lookback_short"], cfg["lookback_long"])
+    has_data = mask.sum(axis=0) >= need
+    exact = has_data & mask[-span:].all(axis=0)
+
+    results = _screen(panel, cfg, exact)
+
+    if frames:
+        for j in np.flatnonzero(has_data & ~exact):
+            item = evaluate_candidate(symbols[j], frames[symbols[j]].copy(), cfg)
+            if item is not None:
+                results.append(item)
+    return results
+
+
+def _remember_panel(panel: dict):
+    if not panel["symbols"]:
+        return
+    last_ok = valid_mask(panel)[-1]
+    for j in np.flatnonzero(last_ok):
+        remember_indicators(panel["symbols"][j], {c: float(panel[c][-1, j]) for c in ("Close", "MA20", "BBL", "RSI14")})
+
+
+def scan_universe(cfg: dict, symbols, load_many, max_results: int = 8, **kwargs):
+    """
+    load_many(symbols, period) → {symbol: OHLCV DataFrame} (일괄 조회)
+    - kwargs는 scan_universe_modes와 같음
+    """
+    return scan_universe_modes([cfg], symbols, load_many, max_results=max_results, **kwargs)[cfg["name"]]
+
+
+def scan_universe_modes(
+    cfgs,
+    symbols,
+    load_many,
+    max_results: int = 8,
+    memory_budget_mb: float = 256,
+    max_batch: int = 500,
+    on_progress=None,
+    cancel_event=None,
+):
+    """
+    배치마다 가장 긴 구간을 한 번 조회 → 모드별로 잘라 패널 판정 → {모드명: 상위 k 목록}
+    - 배치마다 패널을 만들고 버림 → 최대 메모리는 배치 1개 분량
+    - on_progress / cancel_event: 배치 단위로 첫 모드의 상위 k 중간 결과 전달 / 중단 (중단은 배치 사이에서만)
+    - 데이터 지문이 그대로인 종목×모드는 패널에서 빼고 기억된 결과 재사용
+    """
+    cfgs = list(cfgs)
+    symbols = list(dict.fromkeys(symbols))
+    period = longest_period(cfg["period"] for cfg in cfgs)
+    batch = batch_size_for_budget(period, memory_budget_mb, max_batch=max_batch)
+    tops = {cfg["name"]: TopK(max_results, symbols) for cfg in cfgs}
+    primary = tops[cfgs[0]["name"]]
+    for i in range(0, len(symbols), batch):
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        chunk = symbols[i:i + batch]
+        frames = load_many(chunk, period)
+        for n, cfg in enumerate(cfgs):
+            views = {}
+            fingerprints = {}
+            for s, f in frames.items():
+                if f is None or f.empty:
+                    continue
+                view = mode_view(f, cfg)
+                fingerprints[s] = data_fingerprint(view)
+                hit, item = cached_result(s, fingerprints[s], cfg)
+                if hit:
+                    if item is not None:
+                        tops[cfg["name"]].push(item)
+                else:
+                    views[s] = view
+            # 데이터가 바뀐 종목만 패널 계산
+            panel = add_indicators_panel(views)
+            passed = {item["symbol"]: item for item in screen_panel(panel, cfg, views)}
+            for s in views:
+                item = passed.get(s)
+                remember_result(s, fingerprints[s], cfg, item)
+                if item is not None:
+                    tops[cfg["name"]].push(item)
+            if n == 0:
+                _remember_panel(panel)
+            del views, panel
+        del frames
+        if on_progress is not None:
+            on_progress(primary.ranked(), min(i + batch, len(symbols)), len(symbols))
+    return {name: top.ranked() for name, top in tops.items()}
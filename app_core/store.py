@@ -0,0 +1,208 @@
+import logging
+import os
+import re
+import threading
+
+import pandas as pd
+
+from app_core.providers import OHLCV_COLUMNS, clean_ohlcv as _clean_ohlcv, get_default_provider
+
+logger = logging.getLogger(__name__)
+
+# =====================================
+# 일봉 로컬 저장소 (종목별 parquet 1개, 부족한 꼬리 봉만 추가 수신)
+# =====================================
+DEFAULT_STORE_DIR = os.getenv(
+    "CHAN_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".data"),
+)
+
+_PERIOD_OFFSETS = {
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def longest_period(periods) -> str:
+    """
+    가장 긴 구간 (그 구간 하나를 받아 두면 나머지는 slice_period로 잘라 쓸 수 있음)
+    """
+    order = list(_PERIOD_OFFSETS)
+    periods = list(periods)
+    if "max" in periods:
+        return "max"
+    # ytd는 최대 1년
+    return max(periods, key=lambda p: order.index("1y" if p == "ytd" else p))
+
+
+def naive_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    일봉 인덱스를 tz 없는 거래소 현지 날짜로 통일
+    - Ticker.history는 거래소 시간대(tz-aware), yf.download는 tz 없음 → 섞이면 병합/정렬이 실패하므로 저장소는 항상 tz 없음
+    """
+    if df is None or df.empty:
+        return _clean_ohlcv(df)
+    idx = df.index
+    if getattr(idx, "tz", None) is not None:
+        idx = idx.tz_localize(None)
+    out = df.copy()
+    out.index = pd.DatetimeIndex(idx).normalize()
+    return _clean_ohlcv(out)
+
+
+# 같은 종목 파일을 동시에 갱신하지 않도록 (스캐너/여러 세션 공용)
+_symbol_locks = {}
+_symbol_locks_guard = threading.Lock()
+
+
+def _lock_for(symbol: str):
+    with _symbol_locks_guard:
+        lock = _symbol_locks.get(symbol)
+        if lock is None:
+            lock = threading.Lock()
+            _symbol_locks[symbol] = lock
+        return lock
+
+
+def slice_period(df: pd.DataFrame, period: str, end=None) -> pd.DataFrame:
+    """
+    yfinance history(period=...)와 같은 구간을 저장된 전체 일봉에서 잘라냄
+    - end: 기준 시점 (기본은 현재 시각)
+    """
+    if df.empty or period in (None, "max"):
+        return df
+    now = pd.Timestamp(end) if end is not None else pd.Timestamp.now(tz=df.index.tz)
+    if period == "ytd":
+        start = now.normalize().replace(month=1, day=1)
+    else:
+        offset = _PERIOD_OFFSETS.get(period)
+        if offset is None:
+            raise ValueError(f"지원하지 않는 period: {period}")
+        start = now.normalize() - offset
+    return df[df.index >= start]
+
+
+class PriceStore:
+    """
+    종목별 일봉 전체 이력을 디스크에 보관하고, 요청 시 마지막 봉 이후만 새로 받아서 합침.
+    - 마지막 저장 봉은 장중 미완성일 수 있으므로 항상 다시 받아서 덮어씀
+    - 겹치는 봉의 시가가 크게 다르면(분할/배당 재조정) 전체 이력을 다시 받음
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, initial_period: str = "5y", adjust_tolerance: float = 0.005, provider=None):
+        self.root = root
+        self.provider = provider or get_default_provider()
+        self.initial_period = initial_period
+        self.adjust_tolerance = adjust_tolerance
+
+    def _path(self, symbol: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._=^-]", "_", symbol)
+        return os.path.join(self.root, "daily", f"{safe}.parquet")
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        try:
+            # 예전에 tz-aware로 저장된 파일도 읽을 때 통일
+            return naive_daily(pd.read_parquet(path))
+        except Exception:
+            logger.warning("일봉 파일 읽기 실패: %s", path, exc_info=True)
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    def save(self, symbol: str, df: pd.DataFrame):
+        path = self._path(symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def _fetch(self, symbol: str, start=None) -> pd.DataFrame:
+        if start is None:
+            return naive_daily(self.provider.daily_bars(symbol, period=self.initial_period))
+        return naive_daily(self.provider.daily_bars(symbol, start=start))
+
+    def _merge(self, symbol: str, stored: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+        """
+        저장분 + 새로 받은 꼬리 봉 병합 후 저장 (호출자가 종목 잠금 보유)
+        """
+        stored, tail = naive_daily(stored), naive_daily(tail)
+        if stored.empty:
+            merged = tail
+        else:
+            if tail.empty:
+                return stored
+            last_ts = stored.index[-1]
+            if last_ts in tail.index:
+                old_open = float(stored["Open"].iloc[-1])
+                new_open = float(tail.loc[last_ts, "Open"])
+                if old_open > 0 and abs(new_open - old_open) / old_open > self.adjust_tolerance:
+                    merged = self._fetch(symbol)
+                    if not merged.empty:
+                        self.save(symbol, merged)
+                    return merged if not merged.empty else stored
+            merged = _clean_ohlcv(pd.concat([stored, tail]))
+        if not merged.empty:
+            self.save(symbol, merged)
+        return merged if not merged.empty else stored
+
+    def update(self, symbol: str) -> pd.DataFrame:
+        with _lock_for(symbol):
+            stored = self.load(symbol)
+            try:
+                if stored.empty:
+                    tail = self._fetch(symbol)
+                else:
+                    tail = self._fetch(symbol, start=stored.index[-1].strftime("%Y-%m-%d"))
+                return self._merge(symbol, stored, tail)
+            except Exception:
+                logger.warning("%s: 일봉 갱신 실패 → 저장분(%d봉) 사용", symbol, len(stored), exc_info=True)
+                return stored
+
+    def update_many(self, symbols) -> dict:
+        """
+        여러 종목을 일괄 조회로 갱신: 새 종목은 초기 구간 한 번에, 기존 종목은 마지막 봉 날짜가 같은 것끼리 한 번에
+        """
+        symbols = list(dict.fromkeys(symbols))
+        stored = {s: self.load(s) for s in symbols}
+        fresh = [s for s in symbols if stored[s].empty]
+        known = [s for s in symbols if not stored[s].empty]
+
+        tails = {}
+        try:
+            if fresh:
+                tails.update(self.provider.daily_bars_many(fresh, period=self.initial_period))
+            by_start = {}
+            for s in known:
+                by_start.setdefault(stored[s].index[-1].strftime("%Y-%m-%d"), []).append(s)
+            for start, group in by_start.items():
+                tails.update(self.provider.daily_bars_many(group, start=start))
+        except Exception:
+            logger.warning("일봉 일괄 조회 실패 (%d종목) → 저장분 사용", len(symbols), exc_info=True)
+
+        out = {}
+        for s in symbols:
+            tail = tails.get(s)
+            if tail is None:
+                out[s] = stored[s]
+                continue
+            with _lock_for(s):
+                try:
+                    out[s] = self._merge(s, self.load(s), tail)
+                except Exception:
+                    logger.warning("%s: 일봉 병합 실패 → 저장분(%d봉) 사용", s, len(stored[s]), exc_info=True)
+                    out[s] = stored[s]
+        return out
+
+    def get_daily(self, symbol: str, period: str = "6mo") -> pd.DataFrame:
+        df = self.update(symbol)
+        return slice_period(df, period)
+
+    def get_daily_many(self, symbols, period: str = "6mo") -> dict:
+        return {s: slice_period(df, period) for s, df in self.update_many(symbols).items()}
@@ -0,0 +1,274 @@
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from app_core.backtest import HOLDING_HELD, HOLDING_NEW, PHASES, TARGETS, backtest_panel
+from app_core.indicators import INDICATOR_COLUMNS
+from app_core.panel import add_indicators_panel
+from app_core.providers import OHLCV_COLUMNS
+from app_core.store import DEFAULT_STORE_DIR
+
+# =====================================
+# 모드 파라미터 스윕 (lookback / atr_mult / 레벨 배수)
+# - 지표 패널은 한 번만 계산 → 공유 메모리에 올려 프로세스 풀의 모든 작업이 복사 없이 읽음
+# - 파라미터는 레벨 계산에만 쓰이고 지표(MA/BB/ATR 기간)는 그대로라 패널 재사용 가능
+# =====================================
+SWEEP_DIR = os.path.join(DEFAULT_STORE_DIR, "sweeps")
+
+_SHARED_KEYS = OHLCV_COLUMNS + INDICATOR_COLUMNS
+
+DEFAULT_OBJECTIVE = "tp1_before_sl0"
+
+# 신규 진입 검토는 손절을 '매수 구간 하단 - ATR'로 바꾸므로 (level_arrays) 손절 계산 파라미터가 결과에 영향 없음
+STOP_PARAMS = ("atr_mult", "sl_swing_mult", "sl_ma20_mult", "sl_box_mult", "sl1_ratio", "sl1_deep_mult")
+
+# 보유 상태별 기본 탐색 공간 / 진입 이벤트 국면
+DEFAULT_SPACES = {
+    HOLDING_NEW: {"lookback_short": [10, 15, 20], "lookback_long": [20, 40, 60], "breakout_mult": [1.05, 1.08, 1.12]},
+    HOLDING_HELD: {"lookback_short": [10, 15, 20], "lookback_long": [20, 40, 60], "atr_mult": [1.0, 1.3, 1.6]},
+}
+DEFAULT_ENTRY_PHASES = {HOLDING_NEW: "entry_1", HOLDING_HELD: "hold_trend"}
+
+
+def inactive_params(params, holding_type: str = HOLDING_NEW):
+    """
+    holding_type에서 결과를 바꾸지 않는 파라미터 (스윕해도 같은 행만 늘어남)
+    """
+    if holding_type == HOLDING_HELD:
+        return []
+    return [p for p in params if p in STOP_PARAMS]
+
+
+def grid_configs(base_cfg: dict, grid: dict):
+    """
+    {파라미터: 값 목록} → 모든 조합의 cfg 목록
+    """
+    keys = list(grid)
+    return [{**base_cfg, **dict(zip(keys, values))} for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def random_configs(base_cfg: dict, space: dict, n: int, seed: int = 0):
+    """
+    {파라미터: 값 목록(무작위 선택) 또는 (하한, 상한) (균등, 둘 다 int면 정수)} → n개 cfg
+    """
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        cfg = dict(base_cfg)
+        for k, v in space.items():
+            if isinstance(v, tuple):
+                lo, hi = v
+                cfg[k] = rng.randint(lo, hi) if isinstance(lo, int) and isinstance(hi, int) else rng.uniform(lo, hi)
+            else:
+                cfg[k] = rng.choice(list(v))
+        out.append(cfg)
+    return out
+
+
+def summarize(report: dict):
+    """
+    백테스트 결과 → 비교표 한 줄 (진입 이벤트 수, 목표/손절 도달률, 보유 수익률)
+    """
+    row = {"events": report["events"]}
+    hits = report["hits"]
+    for level in TARGETS:
+        row[f"{level}_hit"] = hits.loc[level, "hit_rate"] if level in hits.index else np.nan
+        row[f"{level}_before_sl0"] = hits.loc[level, "before_sl0"] if level in hits.index else np.nan
+    for level in ("sl0", "sl1"):
+        row[f"{level}_hit"] = hits.loc[level, "hit_rate"] if level in hits.index else np.nan
+    for days, r in report["returns"].iterrows():
+        row[f"ret{days}d_mean"] = r["mean"]
+        row[f"win{days}d"] = r["win_rate"]
+    return row
+
+
+# ---- 공유 메모리 패널 ----
+def _share_panel(panel: dict):
+    blocks = []
+    spec = {"symbols": panel["symbols"], "arrays": {}}
+    for k in _SHARED_KEYS:
+        arr = np.ascontiguousarray(panel[k])
+        shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        spec["arrays"][k] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+
+_worker_panel = None
+_worker_blocks = []
+
+
+def _attach_panel(spec: dict):
+    global _worker_panel
+    panel = {"symbols": spec["symbols"]}
+    for k, (name, shape, dtype) in spec["arrays"].items():
+        # 작업 프로세스는 부모의 resource tracker를 공유 → 해제(unlink)는 만든 쪽(부모)이 담당
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(shm)
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        panel[k] = arr
+    _worker_panel = panel
+
+
+def _evaluate(args):
+    i, cfg, holding_type, entry_phase, horizon, hold_days = args
+    t0 = time.perf_counter()
+    report = backtest_panel(_worker_panel, cfg, holding_type, entry_phase, horizon, hold_days)
+    row = summarize(report)
+    row["sec"] = time.perf_counter() - t0
+    return i, row
+
+
+def run_sweep(
+    frames: dict,
+    configs,
+    params=None,
+    holding_type: str = HOLDING_NEW,
+    entry_phase: str = "entry_1",
+    horizon: int = 20,
+    hold_days=(1, 5, 10, 20),
+    workers: int = None,
+    objective: str = DEFAULT_OBJECTIVE,
+    min_events: int = 30,
+):
+    """
+    configs 각각을 같은 지표 패널로 백테스트 → 비교표(DataFrame, objective 내림차순)
+    - params: 표에 보여줄 파라미터 이름 (기본: configs 사이에서 값이 달라지는 키)
+    - workers: 프로세스 수 (기본 CPU 수, 1이면 현재 프로세스에서 순차 실행)
+    - 진입 이벤트가 min_events 미만인 조합은 표 아래쪽으로
+    """
+    global _worker_panel
+    configs = list(configs)
+    if not configs:
+        return pd.DataFrame()
+    if params is None:
+        keys = list(dict.fromkeys(k for c in configs for k in c))
+        params = [k for k in keys if len({repr(c.get(k)) for c in configs}) > 1]
+
+    panel = add_indicators_panel(frames)
+    tasks = [(i, cfg, holding_type, entry_phase, horizon, tuple(hold_days)) for i, cfg in enumerate(configs)]
+    workers = workers or os.cpu_count() or 1
+
+    rows = {}
+    if workers <= 1:
+        _worker_panel = panel
+        try:
+            for task in tasks:
+                i, row = _evaluate(task)
+                rows[i] = row
+        finally:
+            _worker_panel = None
+    else:
+        blocks, spec = _share_panel(panel)
+        del panel
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_panel, initargs=(spec,)) as ex:
+                chunk = max(1, len(tasks) // (workers * 4))
+                for i, row in ex.map(_evaluate, tasks, chunksize=chunk):
+                    rows[i] = row
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    table = pd.DataFrame([{**{p: configs[i].get(p) for p in params}, **rows[i]} for i in range(len(configs))])
+    if objective in table.columns:
+        table["_enough"] = table["events"] >= min_events
+        table = table.sort_values(["_enough", objective], ascending=[False, False]).drop(columns="_enough")
+    return table.reset_index(drop=True)
+
+
+def write_table(table: pd.DataFrame, path: str = None, label: str = "sweep") -> str:
+    if path is None:
+        os.makedirs(SWEEP_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(SWEEP_DIR, f"{label}_{stamp}.csv")
+    table.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+
+def _parse_values(text: str):
+    """
+    "10,15,20" → [10, 15, 20] (목록) / "0.8:2.0" → (0.8, 2.0) (범위)
+    """
+    def num(x):
+        x = x.strip()
+        return int(x) if x.lstrip("-").isdigit() else float(x)
+
+    if ":" in text:
+        lo, hi = text.split(":", 1)
+        return num(lo), num(hi)
+    return [num(x) for x in text.split(",") if x.strip()]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app_core.levels import get_mode_config
+    from app_core.store import PriceStore
+    from app_core.universe import load_universe
+
+    parser = argparse.ArgumentParser(description="모드 파라미터 그리드/랜덤 스윕 (상태 머신 백테스트 기준)")
+    parser.add_argument("symbols", nargs="+", help="티커 또는 @유니버스이름 (예: @popular)")
+    parser.add_argument("--mode", default="스윙", help="기준 모드 (단타 / 스윙 / 장기)")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--holding", default=HOLDING_NEW, choices=[HOLDING_NEW, HOLDING_HELD],
+                        help="신규 진입 검토는 손절이 ATR 기준으로 고정 → 손절 파라미터는 보유 중에서만 의미 있음")
+    parser.add_argument("--entry-phase", default=None, choices=PHASES, help="기본: 신규 진입 검토=entry_1, 보유 중=hold_trend")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUES",
+                        help="예: lookback_short=10,15,20 / atr_mult=0.8:2.0 (범위는 --random에서만)")
+    parser.add_argument("--random", type=int, default=0, help="랜덤 탐색 조합 수 (0이면 그리드)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--horizon", type=int, default=20)
+    parser.add_argument("--objective", default=DEFAULT_OBJECTIVE)
+    parser.add_argument("--min-events", type=int, default=30)
+    parser.add_argument("--out", default=None, help="CSV 경로 (기본 .data/sweeps/)")
+    args = parser.parse_args()
+
+    space = {}
+    for item in args.param:
+        name, values = item.split("=", 1)
+        space[name.strip()] = _parse_values(values)
+    if not space:
+        space = dict(DEFAULT_SPACES[args.holding])
+    noop = inactive_params(space, args.holding)
+    if noop:
+        print(f"※ {args.holding}: {', '.join(noop)} 는 손절이 ATR 기준으로 대체되어 결과에 영향 없음 → 탐색에서 제외 (--holding {HOLDING_HELD} 로 스윕)")
+        space = {k: v for k, v in space.items() if k not in noop}
+        if not space:
+            parser.error("남은 파라미터가 없습니다.")
+    entry_phase = args.entry_phase or DEFAULT_ENTRY_PHASES[args.holding]
+
+    base = get_mode_config(args.mode)
+    if args.random:
+        configs = random_configs(base, space, args.random, seed=args.seed)
+    else:
+        bad = [k for k, v in space.items() if isinstance(v, tuple)]
+        if bad:
+            parser.error(f"범위 값은 --random과 함께 사용: {', '.join(bad)}")
+        configs = grid_configs(base, space)
+
+    syms = []
+    for s in args.symbols:
+        syms += load_universe(s[1:]) if s.startswith("@") else [s.upper()]
+    frames = PriceStore().get_daily_many(syms, args.period)
+
+    t0 = time.perf_counter()
+    table = run_sweep(
+        frames, configs, params=list(space), holding_type=args.holding, entry_phase=entry_phase, horizon=args.horizon,
+        workers=args.workers, objective=args.objective, min_events=args.min_events,
+    )
+    path = write_table(table, args.out, label=f"sweep_{base['name']}")
+    pd.set_option("display.width", 200)
+    print(f"{len(configs)} configs x {len(frames)} symbols · {args.holding} · events({entry_phase}) · {time.perf_counter() - t0:.1f}s → {path}")
+    print(table.head(20).round(4).to_string())
@@ -0,0 +1,94 @@
+import csv
+import os
+
+# =====================================
+# 스캔 유니버스 (로컬 구성종목 파일)
+# - universes/<이름>.txt : 한 줄에 티커 1개 ('#' 주석 허용)
+# - universes/<이름>.csv : symbol / ticker 열 (없으면 첫 열)
+# =====================================
+UNIVERSE_DIR = os.getenv(
+    "CHAN_UNIVERSE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "universes"),
+)
+
+_SYMBOL_COLUMNS = ("symbol", "ticker", "code")
+
+POPULAR_SYMBOLS = [
+    "NVDA", "META", "TSLA", "AAPL", "MSFT", "AMZN",
+    "QQQ", "TQQQ", "SOXL", "SPY", "VOO",
+    "COIN", "MSTR", "RIOT", "MARA",
+    "ORCL", "PYPL", "NFLX", "PLTR", "AVGO",
+]
+
+# 기본 스캔 후보 (인기 종목 + 빅테크)
+SCAN_CANDIDATES = sorted(set(
+    POPULAR_SYMBOLS + ["NVDA", "AAPL", "MSFT", "AMZN", "META", "GOOGL", "TSLA"]
+))
+
+
+def list_universes(root: str = UNIVERSE_DIR):
+    if not os.path.isdir(root):
+        return []
+    names = []
+    for fn in sorted(os.listdir(root)):
+        base, ext = os.path.splitext(fn)
+        if ext.lower() in (".txt", ".csv"):
+            names.append(base)
+    return list(dict.fromkeys(names))
+
+
+def _normalize(sym: str) -> str:
+    # yfinance 표기: BRK.B → BRK-B
+    return sym.strip().upper().replace(".", "-")
+
+
+def _read_txt(path: str):
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                out.append(_normalize(line.split(",")[0]))
+    return out
+
+
+def _read_csv(path: str):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return []
+    header = [h.strip().lower() for h in rows[0]]
+    col = next((header.index(c) for c in _SYMBOL_COLUMNS if c in header), None)
+    body = rows[1:] if col is not None else rows
+    col = col or 0
+    return [_normalize(r[col]) for r in body if len(r) > col and r[col].strip()]
+
+
+def _is_path(name_or_path: str) -> bool:
+    # 경로 구분자나 확장자가 있을 때만 파일 경로로 취급 (작업 폴더의 같은 이름 파일/폴더가 유니버스를 가리지 않도록)
+    seps = {os.sep, os.altsep} - {None}
+    return any(sep in name_or_path for sep in seps) or bool(os.path.splitext(name_or_path)[1])
+
+
+def load_universe(name_or_path: str, root: str = UNIVERSE_DIR):
+    """
+    이름(universes/ 아래) 또는 파일 경로 → 중복 제거된 티커 목록
+    - 'popular'처럼 이름만 주면 항상 root 아래에서 찾음, 'my/list.txt'·'list.csv'처럼 경로 형태면 그 파일
+    """
+    path = None
+    if _is_path(name_or_path):
+        if os.path.isfile(name_or_path):
+            path = name_or_path
+    else:
+        for ext in (".txt", ".csv"):
+            cand = os.path.join(root, name_or_path + ext)
+            if os.path.isfile(cand):
+                path = cand
+                break
+    if path is None:
+        raise FileNotFoundError(f"유니버스 파일을 찾지 못했습니다: {name_or_path}")
+    if path.lower().endswith(".csv"):
+        syms = _read_csv(path)
+    else:
+        syms = _read_txt(path)
+    return list(dict.fromkeys(s for s in syms if s))
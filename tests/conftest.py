@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_core.providers import MarketDataProvider, clean_ohlcv
+
+
+def make_ohlcv(n_days: int = 260, seed: int = 0, start: str = "2023-01-02", tz="America/New_York", base: float = 50.0, end=None):
+    """
+    무작위 보행 일봉 (Ticker.history처럼 tz-aware, tz=None이면 yf.download처럼 tz 없음)
+    - end를 주면 그 날짜로 끝나는 봉 (slice_period처럼 '지금' 기준으로 자르는 경로용, 예: end="today")
+    """
+    rng = np.random.default_rng(seed)
+    if end is not None:
+        dates = pd.bdate_range(end=pd.Timestamp(end).normalize(), periods=n_days, tz=tz)
+    else:
+        dates = pd.bdate_range(start, periods=n_days, tz=tz)
+    close = base * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+    high = close * (1 + rng.uniform(0, 0.02, n_days))
+    low = close * (1 - rng.uniform(0, 0.02, n_days))
+    return pd.DataFrame({
+        "Open": (high + low) / 2,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": rng.uniform(1e5, 1e7, n_days),
+    }, index=dates)
+
+
+class FrameProvider(MarketDataProvider):
+    """
+    미리 만든 일봉을 돌려주는 제공자 (네트워크 없음)
+    - naive_many=True: daily_bars_many는 yf.download처럼 tz 없는 인덱스로 반환
+    - upto: 이 날짜까지의 봉만 공개 (새 봉이 생기는 상황 흉내)
+    """
+
+    name = "frames"
+
+    def __init__(self, frames: dict, naive_many: bool = True):
+        self.frames = frames
+        self.naive_many = naive_many
+        self.upto = None
+        self.calls = []
+
+    def _visible(self, symbol: str, start=None):
+        df = self.frames.get(symbol)
+        if df is None:
+            return clean_ohlcv(None)
+        if self.upto is not None:
+            df = df[df.index.tz_localize(None) <= pd.Timestamp(self.upto)]
+        if start is not None:
+            df = df[df.index.tz_localize(None) >= pd.Timestamp(start)]
+        return clean_ohlcv(df)
+
+    def daily_bars(self, symbol: str, period: str = None, start: str = None) -> pd.DataFrame:
+        self.calls.append(("daily_bars", symbol, start))
+        return self._visible(symbol, start)
+
+    def daily_bars_many(self, symbols, period: str = None, start: str = None) -> dict:
+        self.calls.append(("daily_bars_many", tuple(symbols), start))
+        out = {}
+        for sym in symbols:
+            df = self._visible(sym, start)
+            if self.naive_many and not df.empty:
+                df = df.tz_localize(None)
+            out[sym] = df
+        return out
+
+
+@pytest.fixture(scope="session")
+def ohlcv():
+    return make_ohlcv
+
+
+@pytest.fixture(scope="session")
+def frame_provider():
+    return FrameProvider
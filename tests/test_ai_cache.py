@@ -0,0 +1,123 @@
+import types
+
+import pytest
+
+from app_core import ai_cache
+from app_core.ai_cache import PersistentAICache
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(ai_cache, "time", types.SimpleNamespace(time=c.time))
+    return c
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "ai_cache.sqlite3")
+
+
+def test_set_get_roundtrip_and_stats(path, clock):
+    cache = PersistentAICache(path, ttl=60, max_entries=10)
+    value = {"state": "1차 구간 진입", "points": ["분할 접근", "손절 1.2%"]}
+    cache.set("k1", value, model="m")
+    assert cache.get("k1") == value
+    assert cache.get("missing") is None
+    assert cache.get("") is None
+
+    s = cache.stats()
+    assert s["entries"] == 1 and s["bytes"] > 0
+    assert (s["hits"], s["misses"]) == (1, 1)
+    assert s["hit_rate"] == pytest.approx(0.5)
+
+
+def test_none_value_and_empty_key_are_not_stored(path, clock):
+    cache = PersistentAICache(path, ttl=60, max_entries=10)
+    cache.set("k", None)
+    cache.set("", {"a": 1})
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_expiry(path, clock):
+    cache = PersistentAICache(path, ttl=60, max_entries=10)
+    cache.set("short", {"v": 1}, ttl=10)
+    cache.set("long", {"v": 2})
+
+    clock.now += 30
+    assert cache.get("short") is None
+    assert not cache.contains("short")
+    assert cache.get("long") == {"v": 2}
+
+    clock.now += 31
+    assert cache.get("long") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_evicts_least_recently_used(path, clock):
+    cache = PersistentAICache(path, ttl=3600, max_entries=3)
+    for k in ("a", "b", "c"):
+        cache.set(k, {"k": k})
+        clock.now += 1
+    # a를 다시 읽으면 가장 오래 안 쓴 항목은 b
+    assert cache.get("a") == {"k": "a"}
+    clock.now += 1
+    cache.set("d", {"k": "d"})
+
+    assert cache.get("b") is None
+    assert all(cache.get(k) is not None for k in ("a", "c", "d"))
+    s = cache.stats()
+    assert s["entries"] == 3
+    assert s["evictions"] == 1
+
+
+def test_contains_does_not_count_or_touch(path, clock):
+    cache = PersistentAICache(path, ttl=3600, max_entries=2)
+    cache.set("a", {"k": "a"})
+    clock.now += 1
+    cache.set("b", {"k": "b"})
+    clock.now += 1
+
+    assert cache.contains("a") and not cache.contains("zzz")
+    s = cache.stats()
+    assert (s["hits"], s["misses"]) == (0, 0)
+
+    # contains는 last_access를 바꾸지 않음 → a가 여전히 LRU
+    cache.set("c", {"k": "c"})
+    assert not cache.contains("a")
+    assert cache.contains("b") and cache.contains("c")
+
+
+def test_shared_file_between_instances(path, clock):
+    writer = PersistentAICache(path, ttl=60, max_entries=10)
+    reader = PersistentAICache(path, ttl=60, max_entries=10)
+    writer.set("k", {"v": "같은 파일"})
+    assert reader.get("k") == {"v": "같은 파일"}
+
+    assert reader.invalidate("k") == 1
+    assert writer.get("k") is None
+
+
+def test_invalidate_all(path, clock):
+    cache = PersistentAICache(path, ttl=60, max_entries=10)
+    for k in ("a", "b", "c"):
+        cache.set(k, {"k": k})
+    assert cache.invalidate("nope") == 0
+    assert cache.invalidate() == 3
+    assert cache.stats()["entries"] == 0
+
+
+def test_corrupt_value_is_a_miss(path, clock):
+    cache = PersistentAICache(path, ttl=60, max_entries=10)
+    cache.set("k", {"v": 1})
+    cache._conn().execute("UPDATE ai_cache SET value = ? WHERE key = ?", ("{not json", "k"))
+    assert cache.get("k") is None
+    assert not cache.contains("k")
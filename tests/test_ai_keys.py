@@ -0,0 +1,110 @@
+import importlib
+
+import numpy as np
+import pytest
+
+from app_core import ai, analysis
+from app_core.levels import get_mode_config, position_view
+
+
+@pytest.fixture(scope="module")
+def daily(ohlcv):
+    return analysis.add_indicators(ohlcv(260, seed=3, base=100.0))
+
+
+def _key(daily, price, **kw):
+    cfg = get_mode_config("스윙")
+    last = daily.iloc[-1]
+    pos = position_view(daily, last, cfg, "신규 진입 검토", price, 0.0)
+    return ai.make_cache_key("AAA", "신규 진입 검토", cfg["name"], 0.0, last, "중립", pos["state_name"], price, phase=pos["phase"], **kw)
+
+
+@pytest.mark.parametrize("text", ['{bad', '[1, 2]', '{"nope": 1}', '{"rsi_band": "x"}', '{"rsi_band": 0}', '{"rsi_band": NaN}'])
+def test_bad_bucket_env_falls_back_to_defaults(text, caplog):
+    with caplog.at_level("WARNING", logger="app_core.ai"):
+        assert ai._buckets_from_env(text) == ai.DEFAULT_KEY_BUCKETS
+    assert "CHAN_AI_KEY_BUCKETS" in caplog.text
+
+
+def test_bucket_env_overrides_and_import_survives_bad_values(monkeypatch):
+    assert ai._buckets_from_env('{"rsi_band": 10}')["rsi_band"] == 10.0
+    assert ai._buckets_from_env("") == ai.DEFAULT_KEY_BUCKETS
+    assert ai._key_mode_from_env("EXACT") == "exact"
+    assert ai._key_mode_from_env("fuzzy") == "semantic"
+
+    monkeypatch.setenv("CHAN_AI_KEY_BUCKETS", "{not json")
+    monkeypatch.setenv("CHAN_AI_KEY_MODE", "fuzzy")
+    try:
+        mod = importlib.reload(ai)
+        assert mod.KEY_BUCKETS == mod.DEFAULT_KEY_BUCKETS
+        assert mod.KEY_MODE == "semantic"
+    finally:
+        monkeypatch.delenv("CHAN_AI_KEY_BUCKETS")
+        monkeypatch.delenv("CHAN_AI_KEY_MODE")
+        importlib.reload(ai)
+
+
+def test_semantic_key_ignores_ticks_but_not_state(daily):
+    last = daily.iloc[-1]
+    close, atr = float(last["Close"]), float(last["ATR14"])
+    base = _key(daily, close)
+
+    # ATR × 0.25 단위 안의 움직임은 같은 키 (exact는 매번 다름)
+    assert _key(daily, close + atr * 0.05) == base
+    assert _key(daily, close + atr * 0.05, key_mode="exact") != _key(daily, close, key_mode="exact")
+    # 버킷 하나 이상 움직이면 새 키
+    assert _key(daily, close + atr * 0.6) != base
+    # 상태가 바뀌는 가격(손절선 아래)이면 항상 새 키
+    cfg = get_mode_config("스윙")
+    sl1 = position_view(daily, last, cfg, "신규 진입 검토", close, 0.0)["levels"]["sl1"]
+    assert _key(daily, sl1 * 0.9) != base
+
+
+def test_replay_reuse_semantic_beats_exact(daily):
+    last = daily.iloc[-1]
+    rng = np.random.default_rng(0)
+    ticks = float(last["Close"]) + np.cumsum(rng.normal(0, float(last["ATR14"]) * 0.005, 300))
+    out = ai.replay_key_reuse(daily, ticks, get_mode_config("스윙"), symbol="AAA")
+    assert out["ticks"] == 300
+    assert out["semantic_reuse_rate"] > 0.8 > out["exact_reuse_rate"]
+
+
+def test_key_metrics_counts_reuse():
+    m = ai.KeyMetrics(window=2)
+    for key, exact in [("a", "x"), ("a", "y"), ("b", "z"), ("a", "x")]:
+        m.observe(key, exact)
+    snap = m.snapshot()
+    assert snap["lookups"] == 4
+    assert snap["reuse_rate"] == pytest.approx(2 / 4)
+    # window=2: "x"는 y, z가 들어오며 밀려남
+    assert snap["exact_reuse_rate"] == 0.0
+
+
+
+def _request(daily, price):
+    # 스캐너 미리 생성(pregenerate_scan_ai)과 분석 화면이 쓰는 같은 경로
+    cfg = get_mode_config("스윙")
+    last = daily.iloc[-1]
+    pos = position_view(daily, last, cfg, "신규 진입 검토", price, 0.0)
+    return ai.interpretation_request("AAA", "신규 진입 검토", cfg["name"], 0.0, daily, price, pos, 1, "중립", "")
+
+
+def test_analysis_page_uses_the_pregenerated_key(daily, tmp_path, monkeypatch):
+    from app_core.ai_cache import PersistentAICache
+
+    monkeypatch.setattr(ai, "KEY_MODE", "exact")
+    cache = PersistentAICache(str(tmp_path / "ai.sqlite3"))
+    close = float(daily["Close"].iloc[-1])
+
+    stored, kwargs = _request(daily, close)
+    # 같은 입력이면 분석 화면 키 = 미리 생성한 키
+    assert _request(daily, close)[0] == stored
+
+    # 스캔 후 한 틱 움직이면 exact 키는 달라짐 → 아직 생성 전이면 지금 키, 캐시에 있으면 미리 생성한 키
+    live, _ = _request(daily, close * 1.0001)
+    assert live != stored
+    assert ai.pick_cache_key(live, stored, cache) == live
+    cache.set(stored, ai.template_interpretation(kwargs))
+    assert ai.pick_cache_key(live, stored, cache) == stored
+    assert ai.pick_cache_key(live, None, cache) == live
+    assert ai.pick_cache_key(stored, stored, cache) == stored
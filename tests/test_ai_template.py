@@ -0,0 +1,26 @@
+import pytest
+
+from app_core import ai, analysis
+from app_core.levels import get_mode_config, position_view
+
+
+@pytest.fixture(scope="module")
+def daily(ohlcv):
+    return analysis.add_indicators(ohlcv(260, seed=5, base=80.0))
+
+
+@pytest.mark.parametrize("holding_type,avg_price", [("신규 진입 검토", 0.0), ("보유 중", 70.0)])
+@pytest.mark.parametrize("move", [0.85, 0.97, 1.0, 1.15])
+def test_template_matches_the_llm_result_shape(daily, holding_type, avg_price, move):
+    cfg = get_mode_config("스윙")
+    last = daily.iloc[-1]
+    price = float(last["Close"]) * move
+    pos = position_view(daily, last, cfg, holding_type, price, avg_price)
+    _, kwargs = ai.interpretation_request("AAA", holding_type, cfg["name"], avg_price, daily, price, pos, 50, "중립", "")
+
+    out = ai.template_interpretation(kwargs, phase=pos["phase"])
+    parsed, err = ai.validate_result(out)
+    assert err is None and parsed is out
+    assert pos["state_name"] in out["summary_one_line"]
+    assert all(b["desc"].strip() for b in out["confusion_explain"])
+    assert "None" not in str(out)
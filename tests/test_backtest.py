@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from app_core import analysis
+from app_core.backtest import HOLDING_HELD, HOLDING_NEW, NO_PHASE, PHASES, level_arrays, phase_codes
+from app_core.levels import get_mode_config, position_view
+from app_core.panel import add_indicators_panel
+
+LEVEL_KEYS = ["buy_low", "buy_high", "tp0", "tp1", "tp2", "sl0", "sl1"]
+
+
+@pytest.fixture(scope="module")
+def frames(ohlcv):
+    return {f"S{i}": ohlcv(220, seed=40 + i) for i in range(4)}
+
+
+@pytest.fixture(scope="module")
+def panel(frames):
+    return add_indicators_panel(frames)
+
+
+@pytest.mark.parametrize("holding_type", [HOLDING_NEW, HOLDING_HELD])
+@pytest.mark.parametrize("mode", ["스윙", "장기"])
+def test_arrays_match_position_view(frames, panel, mode, holding_type):
+    # t일 배열 값 = t일까지의 일봉으로 분석 화면이 계산한 레벨/국면
+    cfg = get_mode_config(mode)
+    levels = level_arrays(panel, cfg, holding_type)
+    codes = phase_codes(panel["Close"], levels, holding_type)
+
+    seen = set()
+    checked = 0
+    for j, sym in enumerate(panel["symbols"]):
+        frame = frames[sym]
+        for t in range(60, len(frame), 5):
+            if not levels["ready"][t, j]:
+                continue
+            df = analysis.add_indicators(frame.iloc[: t + 1].copy())
+            last = df.iloc[-1]
+            pos = position_view(df, last, cfg, holding_type, float(last["Close"]), 0.0)
+            for k in LEVEL_KEYS:
+                assert levels[k][t, j] == pytest.approx(pos["levels"][k], rel=1e-9), (sym, t, k)
+            assert levels["recover_level"][t, j] == pytest.approx(pos["recover_level"], rel=1e-9), (sym, t)
+            assert PHASES[codes[t, j]] == pos["phase"], (sym, t)
+            seen.add(pos["phase"])
+            checked += 1
+
+    assert checked > 50
+    # 국면 분기가 한쪽으로만 쏠리지 않았는지 (비교가 의미 있도록)
+    assert len(seen) >= 3, seen
+
+
+def test_not_ready_rows_have_no_phase(panel):
+    cfg = get_mode_config("장기")
+    levels = level_arrays(panel, cfg)
+    codes = phase_codes(panel["Close"], levels)
+    assert not levels["ready"][: cfg["lookback_long"]].any()
+    assert (codes[~levels["ready"]] == NO_PHASE).all()
+    assert (codes[levels["ready"]] != NO_PHASE).all()
+    assert np.isfinite(levels["sl0"][levels["ready"]]).all()
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_core import analysis
+from app_core.indicators import INDICATOR_COLUMNS, IndicatorEngine, add_indicators_incremental
+
+
+def _with_flat_stretch(df):
+    # 거래 정지처럼 고가=저가=종가가 이어지는 구간 (STOCH 분모 0, RSI 0/0)
+    df = df.copy()
+    df.iloc[100:120, :4] = df["Close"].iloc[99]
+    return df
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_engine_matches_add_indicators(ohlcv, seed):
+    df = _with_flat_stretch(ohlcv(600, seed=seed))
+    expected = analysis.add_indicators(df.copy())
+    got = add_indicators_incremental(df)
+
+    assert list(got.index) == list(expected.index)
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(got[col].to_numpy(), expected[col].to_numpy(), rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_seed_then_update_equals_full_recompute(ohlcv):
+    df = ohlcv(300, seed=5)
+    eng = IndicatorEngine.from_history(df.iloc[:-3])
+    for _, bar in df.iloc[-3:].iterrows():
+        eng.update(bar.to_dict())
+    expected = analysis.add_indicators(df.copy()).iloc[-1]
+
+    assert eng.ready
+    row = eng.last_row()
+    for col in INDICATOR_COLUMNS:
+        assert row[col] == pytest.approx(expected[col], rel=1e-9), col
+
+
+def test_peek_does_not_commit_state(ohlcv):
+    df = ohlcv(200, seed=7)
+    eng = IndicatorEngine.from_history(df.iloc[:-1])
+    before = dict(eng.last)
+
+    # 장중 미완성 봉: 종가만 다른 마지막 봉
+    live = df.iloc[-1].to_dict()
+    live["Close"] *= 1.01
+    live["High"] = max(live["High"], live["Close"])
+    peeked = eng.peek(live)
+
+    assert eng.last == before
+    live_df = df.copy()
+    live_df.iloc[-1] = pd.Series(live)
+    expected = analysis.add_indicators(live_df).iloc[-1]
+    for col in INDICATOR_COLUMNS:
+        assert peeked[col] == pytest.approx(expected[col], rel=1e-9), col
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app_core.llm import LLMClient, LLMTimeout
+from app_core.llm_stub import interpretation_for, start_in_thread
+
+MESSAGES = [{"role": "user", "content": "DATA: " + json.dumps({"price_now": 101.5, "state": "관망", "levels": {"sl0": 95}})}]
+
+
+@pytest.fixture
+def stub():
+    server, base_url = start_in_thread(ttft=0.02, chunk_delay=0.0, chunk_chars=8)
+    yield server, base_url
+    server.shutdown()
+
+
+def test_stream_delivers_deltas_in_order(stub):
+    _, base_url = stub
+    client = LLMClient("stub", base_url=base_url, timeout=5)
+    deltas = []
+    result = client.chat(MESSAGES, "stub", stream=True, on_delta=deltas.append)
+
+    assert "".join(deltas).strip() == result.text
+    assert json.loads(result.text) == interpretation_for(json.loads(MESSAGES[0]["content"][5:]))
+    assert result.ttft is not None and result.completion_tokens
+
+
+def test_slow_stream_stops_at_the_deadline(stub):
+    server, base_url = stub
+    server.chunk_delay = 0.1  # 조각은 계속 오지만 전체는 마감보다 훨씬 김
+    server.chunk_chars = 2
+    client = LLMClient("stub", base_url=base_url, timeout=0.5)
+
+    t0 = time.monotonic()
+    with pytest.raises(LLMTimeout):
+        client.chat(MESSAGES, "stub", stream=True, on_delta=lambda d: None)
+    assert time.monotonic() - t0 < 1.0
+    assert client.metrics.snapshot()["timeouts"] == 1
+
+
+def test_transient_errors_are_retried(stub, monkeypatch):
+    monkeypatch.setattr("app_core.llm.RETRY_BASE_DELAY", 0.01)
+    server, base_url = stub
+    server.fail_rate = 0.5
+    client = LLMClient("stub", base_url=base_url, timeout=20, max_retries=8)
+    for _ in range(6):
+        assert client.chat(MESSAGES, "stub").text
+    snap = client.metrics.snapshot()
+    assert snap["calls"] == 6 and snap["errors"] == 0
+    assert snap["retries"] == server.failures
+
+
+def test_achat_returns_the_completion(stub):
+    _, base_url = stub
+    client = LLMClient("stub", base_url=base_url, timeout=5)
+
+    async def run():
+        return await asyncio.gather(*(client.achat(MESSAGES, "stub") for _ in range(3)))
+
+    results = asyncio.run(run())
+    expected = interpretation_for(json.loads(MESSAGES[0]["content"][5:]))
+    assert all(json.loads(r.text) == expected for r in results)
+    snap = client.metrics.snapshot()
+    assert snap["calls"] == 3 and snap["in_flight"] == 0
+
+
+def test_sync_and_async_share_one_concurrency_limit(stub):
+    server, base_url = stub
+    server.ttft = 0.1
+    client = LLMClient("stub", base_url=base_url, timeout=10, max_concurrency=2)
+
+    def sync_calls():
+        for _ in range(2):
+            client.chat(MESSAGES, "stub")
+
+    def async_calls():
+        async def run():
+            await asyncio.gather(*(client.achat(MESSAGES, "stub") for _ in range(3)))
+
+        asyncio.run(run())
+
+    threads = [threading.Thread(target=f) for f in (sync_calls, sync_calls, async_calls, async_calls)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    snap = client.metrics.snapshot()
+    assert snap["calls"] == 10 and snap["errors"] == 0
+    assert snap["peak_in_flight"] == 2
+
+
+def test_achat_times_out_waiting_for_a_slot(stub):
+    _, base_url = stub
+    client = LLMClient("stub", base_url=base_url, timeout=5, max_concurrency=1)
+    client._sem.acquire()  # 동기 호출 하나가 자리를 잡고 있는 상황
+    try:
+        t0 = time.monotonic()
+        with pytest.raises(LLMTimeout):
+            asyncio.run(client.achat(MESSAGES, "stub", timeout=0.2))
+        assert time.monotonic() - t0 < 1.0
+    finally:
+        client._sem.release()
+    # 자리가 새지 않았는지: 풀린 뒤에는 바로 호출 가능
+    assert asyncio.run(client.achat(MESSAGES, "stub")).text
+    assert client.metrics.snapshot()["timeouts"] == 1
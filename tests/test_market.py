@@ -0,0 +1,87 @@
+import pytest
+
+from app_core.cache import StaleWhileRevalidate
+from app_core.market import load_market_overview, overview_coverage, overview_is_usable, overview_symbols
+from app_core.providers import MarketDataProvider
+
+
+class QuoteProvider(MarketDataProvider):
+    """
+    시세를 돌려주는 제공자 – down=True면 yfinance 장애처럼 모든 조회가 None
+    """
+
+    name = "quotes"
+
+    def __init__(self):
+        self.down = False
+
+    def quote(self, symbol: str):
+        if self.down:
+            return None
+        return {
+            "symbol": symbol, "market_state": "REGULAR", "regular": 101.0, "prev_close": 100.0,
+            "regular_chg_pct": 1.0, "pre": None, "pre_chg_pct": None, "post": None, "post_chg_pct": None,
+        }
+
+    def fgi(self):
+        return None if self.down else 55.0
+
+
+def test_coverage_counts_filled_values():
+    provider = QuoteProvider()
+    filled, total = overview_coverage(load_market_overview(provider))
+    assert filled == total > 0
+
+    provider.down = True
+    empty = load_market_overview(provider)
+    assert overview_coverage(empty) == (0, total)
+    assert not overview_is_usable(empty)
+    assert not overview_is_usable({})
+
+
+def test_outage_keeps_the_last_good_snapshot():
+    provider = QuoteProvider()
+    swr = StaleWhileRevalidate(lambda: load_market_overview(provider), max_age=60.0, is_valid=overview_is_usable)
+    good, fetched_at = swr.get()
+    assert good["futures"]["nasdaq"]["last"] == pytest.approx(101.0)
+    assert swr.last_error is None
+
+    provider.down = True
+    swr._load()
+    value, again = swr.get()
+    assert value is good and again == fetched_at
+    assert isinstance(swr.last_error, ValueError)
+
+    provider.down = False
+    swr._load()
+    value, _ = swr.get()
+    assert value is not good and overview_is_usable(value)
+    assert swr.last_error is None
+
+
+def test_first_load_during_outage_is_kept_until_replaced():
+    provider = QuoteProvider()
+    provider.down = True
+    swr = StaleWhileRevalidate(lambda: load_market_overview(provider), max_age=60.0, is_valid=overview_is_usable)
+    value, fetched_at = swr.get()
+    # 보여줄 이전 값이 없으면 빈 개요라도 반환 (매 호출마다 동기 로드 반복 방지)
+    assert fetched_at is not None and not overview_is_usable(value)
+    assert swr.last_error is not None
+
+    provider.down = False
+    swr._load()
+    assert overview_is_usable(swr.get()[0])
+
+
+def test_partial_outage_threshold():
+    class Partial(QuoteProvider):
+        def __init__(self, ok):
+            super().__init__()
+            self.ok = set(ok)
+
+        def quote(self, symbol: str):
+            return super().quote(symbol) if symbol in self.ok else None
+
+    syms = overview_symbols()
+    assert not overview_is_usable(load_market_overview(Partial(syms[:3])))
+    assert overview_is_usable(load_market_overview(Partial(syms[: len(syms) - 3])))
@@ -0,0 +1,56 @@
+import numpy as np
+
+from app_core import market_history
+from app_core.market import build_us_market_overview, compute_market_score, compute_market_verdict_scores, overview_symbols
+from app_core.providers import normalize_quote
+from app_core.store import PriceStore
+
+
+def _overview_frames(ohlcv, n_days=60):
+    frames = {}
+    for i, sym in enumerate(overview_symbols()):
+        base = 45.0 if sym == "^TNX" else (105.0 if sym == "DX-Y.NYB" else 100.0)
+        frames[sym] = ohlcv(n_days, seed=i, base=base)
+    return frames
+
+
+def test_history_matches_scalar_market_score(ohlcv):
+    frames = _overview_frames(ohlcv)
+    table = market_history.closes_table(frames)
+    hist = market_history.market_history(table).iloc[1:]
+
+    for day in hist.index[::7]:
+        pos = table.index.get_loc(day)
+        quotes = {
+            sym: normalize_quote(sym, {
+                "marketState": "REGULAR",
+                "regularMarketPrice": float(table[sym].iloc[pos]),
+                "regularMarketPreviousClose": float(table[sym].iloc[pos - 1]),
+            })
+            for sym in table.columns
+        }
+        overview = build_us_market_overview(quotes)
+        score, label, _ = compute_market_score(overview)
+        verdict = compute_market_verdict_scores(overview)
+        row = hist.loc[day]
+        assert row["market_score"] == score
+        assert row["label"] == label
+        for key in ("macro", "etf", "index", "leader"):
+            assert np.isclose(row[key], verdict[key])
+        assert row["conclusion"] == verdict["conclusion"]
+
+
+def test_history_keeps_updating_when_store_mixes_tz(tmp_path, ohlcv, frame_provider):
+    # 개별 분석(Ticker.history, tz-aware)으로 저장된 종목 + 일괄 조회(yf.download, tz 없음)로 받은 새 봉
+    frames = _overview_frames(ohlcv)
+    provider = frame_provider(frames, naive_many=True)
+    store = PriceStore(root=str(tmp_path), provider=provider)
+    for sym, df in frames.items():
+        store.save(sym, df.iloc[:-1])
+
+    hist = market_history.load_market_history(store.get_daily_many, "max")
+
+    last_day = frames["^GSPC"].index[-1].tz_localize(None)
+    assert hist.index[-1] == last_day
+    assert all(len(store.load(sym)) == len(df) for sym, df in frames.items())
+    assert store.load("QQQ").index.tz is None
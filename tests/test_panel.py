@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from app_core import analysis
+from app_core.indicators import INDICATOR_COLUMNS
+from app_core.panel import add_indicators_panel, panel_frames, panel_last_rows
+
+
+@pytest.fixture(scope="module")
+def frames(ohlcv):
+    # 길이가 다른 종목 (오른쪽 정렬 + 앞쪽 NaN 패딩 경로), 거래 정지 구간, 지표 계산이 안 되는 짧은 종목
+    out = {f"S{i}": ohlcv(n, seed=i) for i, n in enumerate([300, 260, 120, 75])}
+    out["S1"].iloc[50:60, :4] = out["S1"]["Close"].iloc[49]
+    out["SHORT"] = ohlcv(30, seed=9)
+    return out
+
+
+def test_panel_frames_match_add_indicators(frames):
+    got = panel_frames(add_indicators_panel(frames))
+    for sym, df in frames.items():
+        expected = analysis.add_indicators(df.copy())
+        assert len(got[sym]) == len(expected), sym
+        if expected.empty:
+            continue
+        assert list(got[sym].index) == list(expected.index.tz_localize(None))
+        for col in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(got[sym][col].to_numpy(), expected[col].to_numpy(), rtol=1e-9, atol=1e-9, err_msg=f"{sym} {col}")
+
+
+def test_last_rows_match_add_indicators(frames):
+    last = panel_last_rows(add_indicators_panel(frames))
+    assert "SHORT" not in last
+    for sym in ("S0", "S1", "S2", "S3"):
+        expected = analysis.add_indicators(frames[sym].copy()).iloc[-1]
+        for col in INDICATOR_COLUMNS + ["Close"]:
+            assert last[sym][col] == pytest.approx(expected[col], rel=1e-9), (sym, col)
+
+
+def test_max_bars_keeps_the_latest_bars(frames):
+    # 지표 창(최대 50봉)보다 충분히 길게 자르면 마지막 값은 전체 계산과 거의 같음 (EMA 시작점만 다름)
+    last = panel_last_rows(add_indicators_panel(frames, max_bars=250))
+    expected = analysis.add_indicators(frames["S0"].copy()).iloc[-1]
+    for col in ("MA5", "MA20", "BBL", "BBU", "MA50", "ATR14", "STOCH_K"):
+        assert last["S0"][col] == pytest.approx(expected[col], rel=1e-9), col
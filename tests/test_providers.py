@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_core.providers import MarketDataProvider, ReplayProvider, clean_ohlcv, record_snapshot, slice_sessions
+
+
+def make_minutes(n_sessions: int = 6, seed: int = 0, prepost: bool = True):
+    """
+    프리/애프터 포함 1분봉 n_sessions 거래일 (거래소 시간대)
+    """
+    rng = np.random.default_rng(seed)
+    start, end = ("04:00", "19:59") if prepost else ("09:30", "15:59")
+    days = pd.bdate_range("2024-03-04", periods=n_sessions)
+    idx = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{d.date()} {start}", f"{d.date()} {end}", freq="1min").values for d in days
+    ])).tz_localize("America/New_York")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(idx))))
+    return pd.DataFrame({"Open": close, "High": close * 1.001, "Low": close * 0.999, "Close": close, "Volume": 1000.0}, index=idx)
+
+
+class LiveProvider(MarketDataProvider):
+    """
+    yfinance처럼 period만큼의 거래일을 돌려주는 기록 원본
+    """
+
+    name = "live"
+
+    def __init__(self, daily: pd.DataFrame):
+        self.daily = daily
+        self.minutes = {True: make_minutes(6, prepost=True), False: make_minutes(6, seed=1, prepost=False)}
+        self.calls = []
+
+    def daily_bars(self, symbol: str, period: str = None, start: str = None):
+        return clean_ohlcv(self.daily)
+
+    def intraday_bars(self, symbol: str, period: str = "1d", interval: str = "1m", prepost: bool = True):
+        self.calls.append((interval, period, prepost))
+        df = self.minutes[prepost]
+        if interval == "5m":
+            df = df.resample("5min").agg({"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+        return slice_sessions(clean_ohlcv(df), period)
+
+    def quote(self, symbol: str):
+        return {"symbol": symbol, "market_state": "POST", "regular": 101.0, "prev_close": 100.0}
+
+    def fx_rate(self, pair: str = "USDKRW=X"):
+        return 1350.0
+
+    def fgi(self):
+        return 42.0
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory, ohlcv):
+    root = str(tmp_path_factory.mktemp("replay"))
+    live = LiveProvider(ohlcv(300, seed=7))
+    record_snapshot(live, root, ["AAA"], quote_symbols=["QQQ"])
+    return live, ReplayProvider(root)
+
+
+def test_record_fetches_each_intraday_file_once(recorded):
+    live, _ = recorded
+    names = [(interval, prepost) for interval, _, prepost in live.calls]
+    assert len(names) == len(set(names))
+
+
+@pytest.mark.parametrize("period", ["1d", "2d", "5d"])
+@pytest.mark.parametrize("interval,prepost", [("1m", True), ("5m", False)])
+def test_replay_intraday_matches_live_period(recorded, period, interval, prepost):
+    live, replay = recorded
+    expected = live.intraday_bars("AAA", period=period, interval=interval, prepost=prepost)
+    got = replay.intraday_bars("AAA", period=period, interval=interval, prepost=prepost)
+    assert got.index.normalize().nunique() == int(period[:-1])
+    pd.testing.assert_frame_equal(got, expected, check_freq=False)
+
+
+def test_replay_two_sessions_spans_the_previous_day(recorded):
+    _, replay = recorded
+    one = replay.intraday_bars("AAA", period="1d")
+    two = replay.intraday_bars("AAA", period="2d")
+    assert len(two) == 2 * len(one)
+    assert two.index[-1] == one.index[-1]
+    assert replay.last_extended_price("AAA") == pytest.approx(float(one["Close"].iloc[-1]))
+
+
+def test_replay_daily_quotes_and_extras(recorded):
+    live, replay = recorded
+    daily = replay.daily_bars("AAA", period="max")
+    pd.testing.assert_frame_equal(daily, clean_ohlcv(live.daily), check_freq=False)
+    assert replay.quote("QQQ")["regular"] == 101.0
+    assert replay.quote("AAA") is not None and replay.quote("ZZZ") is None
+    assert replay.fx_rate() == 1350.0
+    assert replay.fgi() == 42.0
+    assert replay.intraday_bars("ZZZ").empty
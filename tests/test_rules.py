@@ -0,0 +1,125 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from app_core import analysis, scanner
+from app_core.cache import shared_cache
+from app_core.levels import all_mode_configs, calc_levels
+from app_core.rules import DEFAULT_RULES, RuleError, RuleSet, compile_expr, parse_rules, rules_for
+
+NS = {
+    "Close": np.array([10.0, 20.0, 30.0]),
+    "RSI14": np.array([40.0, 70.0, np.nan]),
+    "MA20": np.array([9.0, 21.0, 30.0]),
+}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Close * 2 - MA20", [11.0, 19.0, 30.0]),
+    ("-Close / 10", [-1.0, -2.0, -3.0]),
+    ("abs(MA20 - Close)", [1.0, 1.0, 0.0]),
+    ("max(Close, MA20, 25)", [25.0, 25.0, 30.0]),
+    ("min(Close, MA20)", [9.0, 20.0, 30.0]),
+])
+def test_arithmetic(text, expected):
+    np.testing.assert_allclose(compile_expr(text)(NS), expected)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Close > MA20", [True, False, False]),
+    ("9 < MA20 <= 21", [False, True, False]),
+    ("RSI14 < 60 or Close >= 30", [True, False, True]),
+    ("not (Close > MA20) and RSI14 > 50", [False, True, False]),
+    ("RSI14 <= 100", [True, True, False]),  # NaN은 어떤 비교도 통과하지 못함
+])
+def test_boolean(text, expected):
+    assert list(np.asarray(compile_expr(text)(NS), dtype=bool)) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "", "Close >", "Volume2 > 1", "__import__('os')", "Close.real > 1", "abs(Close, MA20)",
+    "max(Close)", "round(Close)", "Close if RSI14 else MA20", "[Close]", "Close ** 2", "True", "'a' < 'b'",
+])
+def test_rejects_unsupported_expressions(text):
+    with pytest.raises(RuleError):
+        compile_expr(text)
+
+
+def test_ruleset_parse_pickle_and_equality():
+    rules = parse_rules("RSI14 < 60   # 과열 제외\n\n# 전체 주석\nClose > MA20\n", "")
+    assert rules.filters == ("RSI14 < 60", "Close > MA20")
+    assert rules.score == DEFAULT_RULES.score
+    clone = pickle.loads(pickle.dumps(rules))
+    assert clone == rules and hash(clone) == hash(rules)
+    assert list(clone.mask(NS, 3)) == [True, False, False]
+    assert rules_for({"name": "x"}) is DEFAULT_RULES
+    assert rules_for({"rules": rules}) is rules
+    assert RuleSet(["Close > 0"], "1").scores(NS, 3).tolist() == [1.0, 1.0, 1.0]
+
+
+# ---- 기본 규칙 = 규칙 식 도입 전 스캐너 판정 ----
+def _baseline(sym, df, cfg):
+    # 규칙 식 도입 전 evaluate_indicators (조건/스코어 그대로)
+    if df.empty or len(df) < max(30, cfg["lookback_long"] + 5):
+        return None
+    last = df.iloc[-1]
+    price_close = float(last["Close"])
+    rsi = float(last["RSI14"])
+    buy_low, buy_high, tp0, tp1, tp2, sl0, sl1 = calc_levels(df, last, cfg)
+    if buy_low is None or buy_high is None or tp1 is None:
+        return None
+    dist_band_pct = abs(price_close - (buy_low + buy_high) / 2) / price_close * 100
+    if price_close < buy_low * 0.97 or price_close > buy_high * 1.05 or rsi > 65:
+        return None
+    bias = analysis.short_term_bias(last)
+    score = 2 if "상방" in bias else (1 if "중립" in bias else 0)
+    score += max(0, 3 - dist_band_pct)
+    score += max(0, 2 - abs(rsi - 50) / 10)
+    return {"symbol": sym, "score": score, "buy_low": buy_low, "buy_high": buy_high, "tp1": tp1, "sl0": buy_low * 0.97}
+
+
+@pytest.fixture(scope="module")
+def universe(ohlcv):
+    # 모드 구간은 '지금' 기준으로 잘리므로 오늘로 끝나는 일봉
+    return {f"S{i:02d}": ohlcv(300, seed=100 + i, end="today") for i in range(80)}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    shared_cache.invalidate()
+    yield
+    shared_cache.invalidate()
+
+
+@pytest.mark.parametrize("cfg", all_mode_configs(), ids=lambda c: c["name"])
+def test_default_rules_match_the_baseline_filter(universe, cfg):
+    passed = 0
+    for sym, df in universe.items():
+        view = analysis.add_indicators(scanner.mode_view(df, cfg))
+        got = scanner.evaluate_indicators(sym, view, cfg)
+        expected = _baseline(sym, view, cfg)
+        assert (got is None) == (expected is None), sym
+        if expected is not None:
+            passed += 1
+            for k in ("score", "buy_low", "buy_high", "tp1", "sl0"):
+                assert got[k] == pytest.approx(expected[k], rel=1e-9), (sym, k)
+    assert passed < len(universe)
+    if cfg["name"] != "단타":
+        # 단타(3mo ≈ 65봉)는 MA50 때문에 지표 행이 30개 미만 → 원래 판정도 항상 탈락
+        assert passed > 0
+
+
+def test_universe_scan_matches_per_symbol_scan(universe):
+    cfgs = all_mode_configs()
+    per_symbol = scanner.scan_candidates_modes(cfgs, list(universe), lambda s, p: universe[s], max_results=10)
+    shared_cache.invalidate()
+    batched = scanner.scan_universe_modes(
+        cfgs, list(universe), lambda syms, p: {s: universe[s] for s in syms}, max_results=10, max_batch=25,
+    )
+    assert any(per_symbol.values())
+    for cfg in cfgs:
+        a, b = per_symbol[cfg["name"]], batched[cfg["name"]]
+        assert [x["symbol"] for x in a] == [x["symbol"] for x in b], cfg["name"]
+        for x, y in zip(a, b):
+            assert x["score"] == pytest.approx(y["score"], rel=1e-9)
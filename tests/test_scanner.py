@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from app_core import scanner
+from app_core.cache import shared_cache
+from app_core.levels import all_mode_configs
+
+
+class _Rerun(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    shared_cache.invalidate()
+    yield
+    shared_cache.invalidate()
+
+
+@pytest.fixture
+def slow_fetch(ohlcv):
+    frames = {f"S{i:02d}": ohlcv(300, seed=i) for i in range(40)}
+    calls = []
+
+    def fetch(sym, period):
+        calls.append(sym)
+        time.sleep(0.02)
+        return frames[sym]
+
+    return frames, fetch, calls
+
+
+def test_progress_exception_stops_the_scan(slow_fetch):
+    # Streamlit rerun(중단 버튼)은 다음 st 호출, 즉 진행 콜백 안에서 예외로 나타남
+    frames, fetch, calls = slow_fetch
+
+    def on_progress(items, done, total):
+        if done == 3:
+            raise _Rerun()
+
+    t0 = time.perf_counter()
+    with pytest.raises(_Rerun):
+        scanner.scan_candidates_modes(all_mode_configs(), list(frames), fetch, io_workers=2, on_progress=on_progress)
+    assert time.perf_counter() - t0 < 0.5
+    time.sleep(0.1)
+    n = len(calls)
+    time.sleep(0.1)
+    assert len(calls) == n < len(frames)
+
+
+def test_cancel_event_returns_partial_top_k(slow_fetch):
+    frames, fetch, calls = slow_fetch
+    cancel = threading.Event()
+    seen = []
+
+    def on_progress(items, done, total):
+        seen.append(done)
+        if done == 5:
+            cancel.set()
+
+    stats = {}
+    out = scanner.scan_candidates_modes(
+        all_mode_configs(), list(frames), fetch, io_workers=2, on_progress=on_progress, cancel_event=cancel, stats=stats,
+    )
+    assert stats["cancelled"] and stats["evaluated"] < len(frames)
+    assert set(out) == {cfg["name"] for cfg in all_mode_configs()}
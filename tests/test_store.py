@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from app_core.store import PriceStore, longest_period, slice_period
+
+
+@pytest.fixture
+def frames(ohlcv):
+    return {"AAA": ohlcv(40, seed=1), "BBB": ohlcv(40, seed=2)}
+
+
+def test_update_fetches_only_the_tail(tmp_path, frames, frame_provider):
+    provider = frame_provider(frames)
+    store = PriceStore(root=str(tmp_path), provider=provider)
+    provider.upto = frames["AAA"].index[29].tz_localize(None)
+    assert len(store.update("AAA")) == 30
+
+    provider.upto = None
+    provider.calls.clear()
+    df = store.update("AAA")
+    assert len(df) == 40
+    # 마지막 저장 봉부터 다시 받음 (장중 미완성 봉 덮어쓰기)
+    assert provider.calls == [("daily_bars", "AAA", frames["AAA"].index[29].strftime("%Y-%m-%d"))]
+    pd.testing.assert_frame_equal(store.load("AAA"), df, check_freq=False)
+
+
+def test_adjusted_history_is_refetched(tmp_path, frames, frame_provider):
+    provider = frame_provider(frames)
+    store = PriceStore(root=str(tmp_path), provider=provider)
+    stale = frames["AAA"].iloc[:30].copy()
+    stale[["Open", "High", "Low", "Close"]] *= 2  # 분할 전 가격
+    store.save("AAA", stale)
+
+    df = store.update("AAA")
+    assert len(df) == 40
+    assert df["Close"].iloc[0] == pytest.approx(frames["AAA"]["Close"].iloc[0])
+
+
+@pytest.mark.parametrize("stored_tz, naive_many", [("America/New_York", True), (None, False)])
+def test_update_many_merges_across_tz_conventions(tmp_path, frames, frame_provider, stored_tz, naive_many):
+    provider = frame_provider(frames, naive_many=naive_many)
+    store = PriceStore(root=str(tmp_path), provider=provider)
+    for sym, df in frames.items():
+        head = df.iloc[:30]
+        store.save(sym, head if stored_tz else head.tz_localize(None))
+
+    out = store.update_many(list(frames))
+    for sym in frames:
+        assert len(out[sym]) == 40
+        assert out[sym].index.tz is None
+        assert len(store.load(sym)) == 40
+
+
+def test_single_and_batched_updates_agree(tmp_path, frames, frame_provider):
+    a = PriceStore(root=str(tmp_path / "a"), provider=frame_provider(frames))
+    b = PriceStore(root=str(tmp_path / "b"), provider=frame_provider(frames))
+    many = b.update_many(list(frames))
+    for sym in frames:
+        pd.testing.assert_frame_equal(a.update(sym), many[sym], check_freq=False)
+
+
+def test_slice_period_and_longest_period(frames):
+    df = frames["AAA"].tz_localize(None)
+    end = df.index[-1]
+    assert slice_period(df, "1mo", end=end).index[0] >= end.normalize() - pd.DateOffset(months=1)
+    assert slice_period(df, "max") is df
+    assert longest_period(["3mo", "1y", "6mo"]) == "1y"
+    assert longest_period(["ytd", "6mo"]) == "ytd"
+    with pytest.raises(ValueError):
+        slice_period(df, "7w", end=end)
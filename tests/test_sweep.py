@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from app_core.backtest import HOLDING_HELD, HOLDING_NEW
+from app_core.levels import get_mode_config
+from app_core.sweep import DEFAULT_ENTRY_PHASES, DEFAULT_SPACES, STOP_PARAMS, grid_configs, inactive_params, run_sweep
+
+METRICS = ["events", "tp1_hit", "tp1_before_sl0", "sl0_hit", "sl1_hit"]
+
+
+@pytest.fixture(scope="module")
+def frames(ohlcv):
+    return {f"S{i:02d}": ohlcv(500, seed=i) for i in range(12)}
+
+
+def _sweep(frames, space, holding, workers=1):
+    configs = grid_configs(get_mode_config("스윙"), space)
+    table = run_sweep(frames, configs, params=list(space), holding_type=holding,
+                      entry_phase=DEFAULT_ENTRY_PHASES[holding], workers=workers, min_events=0)
+    return table.sort_values(list(space)).reset_index(drop=True)
+
+
+def test_stop_params_only_matter_when_held(frames):
+    space = {"atr_mult": [1.0, 1.6], "sl1_ratio": [0.95, 0.97]}
+    assert inactive_params(space, HOLDING_NEW) == list(space)
+    assert inactive_params(space, HOLDING_HELD) == []
+
+    new = _sweep(frames, space, HOLDING_NEW)
+    assert len(new[METRICS].drop_duplicates()) == 1
+    held = _sweep(frames, space, HOLDING_HELD)
+    assert len(held[METRICS].drop_duplicates()) > 1
+
+
+@pytest.mark.parametrize("holding", [HOLDING_NEW, HOLDING_HELD])
+def test_default_spaces_have_no_dead_axes(holding):
+    assert inactive_params(DEFAULT_SPACES[holding], holding) == []
+    if holding == HOLDING_NEW:
+        assert not set(DEFAULT_SPACES[holding]) & set(STOP_PARAMS)
+
+
+def test_process_pool_matches_sequential(frames):
+    space = {"lookback_short": [10, 20], "breakout_mult": [1.05, 1.12]}
+    seq = _sweep(frames, space, HOLDING_NEW, workers=1).drop(columns="sec")
+    par = _sweep(frames, space, HOLDING_NEW, workers=2).drop(columns="sec")
+    pd.testing.assert_frame_equal(seq, par)
@@ -0,0 +1,39 @@
+import pytest
+
+from app_core.universe import list_universes, load_universe
+
+
+@pytest.fixture
+def root(tmp_path):
+    d = tmp_path / "universes"
+    d.mkdir()
+    (d / "popular.txt").write_text("nvda\n# 주석\nbrk.b  # 점 표기\nNVDA\n", encoding="utf-8")
+    (d / "sp.csv").write_text("Name,Symbol\nApple,AAPL\nMeta,META\n", encoding="utf-8")
+    return d
+
+
+def test_names_resolve_inside_the_universe_dir(root):
+    assert list_universes(str(root)) == ["popular", "sp"]
+    assert load_universe("popular", str(root)) == ["NVDA", "BRK-B"]
+    assert load_universe("sp", str(root)) == ["AAPL", "META"]
+
+
+def test_cwd_entry_with_the_same_name_does_not_shadow(root, tmp_path, monkeypatch):
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "popular").mkdir()          # 같은 이름의 폴더
+    (work / "sp").write_text("ZZZ\n")  # 같은 이름의 파일
+    monkeypatch.chdir(work)
+    assert load_universe("popular", str(root)) == ["NVDA", "BRK-B"]
+    assert load_universe("sp", str(root)) == ["AAPL", "META"]
+
+
+def test_paths_are_read_directly(root, tmp_path, monkeypatch):
+    (tmp_path / "mine.txt").write_text("tsla\n", encoding="utf-8")
+    assert load_universe(str(tmp_path / "mine.txt"), str(root)) == ["TSLA"]
+    monkeypatch.chdir(tmp_path)
+    assert load_universe("mine.txt", str(root)) == ["TSLA"]
+    with pytest.raises(FileNotFoundError):
+        load_universe("missing", str(root))
+    with pytest.raises(FileNotFoundError):
+        load_universe("universes", str(tmp_path))